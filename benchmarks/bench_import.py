@@ -0,0 +1,124 @@
+"""启动导入耗时基准
+
+每个场景在新的解释器中以 `python -X importtime` 运行若干次，取中位数，报告总导入耗时、
+解释器总耗时和自身耗时最多的模块，并检查不应被导入的模块（如只运行Docker监控时
+不应加载微信的依赖）。超出预算或导入了禁止的模块时退出码为1，可放在CI中防止启动变慢。
+
+用法：
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --scenarios docker,wechat --repeat 9
+    python benchmarks/bench_import.py --budget package=30,docker=1500,wechat=1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# 场景名 -> (执行的语句, 不应被导入的顶层模块)
+SCENARIOS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "package": ("import mcp4agent", ("fastmcp", "docker", "requests", "diskcache", "numpy")),
+    "wechat": ("import mcp4agent.asgi as a; a.create_app(['wechat'])", ("docker", "docker_status", "numpy")),
+    "docker": ("import mcp4agent.asgi as a; a.create_app(['docker'])", ("wechat_mcp", "diskcache", "numpy")),
+    "combined": ("import mcp4agent.asgi as a; a.create_app()", ("numpy",)),
+}
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """解析 -X importtime 的输出，返回 模块 -> (自身微秒, 累计微秒)"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def run_once(statement: str) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env, capture_output=True, text=True, check=False
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return wall, parse_importtime(proc.stderr)
+
+
+def measure(name: str, repeat: int, top: int) -> Dict:
+    statement, forbidden = SCENARIOS[name]
+    # 第一次运行用于生成字节码缓存，不计入结果
+    run_once(statement)
+    runs = [run_once(statement) for _ in range(repeat)]
+    totals = [sum(self_us for self_us, _ in modules.values()) / 1000 for _, modules in runs]
+    median = sorted(range(repeat), key=lambda i: totals[i])[repeat // 2]
+    modules = runs[median][1]
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    loaded = {module.split(".")[0] for module in modules}
+    return {
+        "name": name,
+        "import_ms": round(statistics.median(totals), 1),
+        "wall_ms": round(statistics.median(wall for wall, _ in runs) * 1000, 1),
+        "modules": len(modules),
+        "forbidden": sorted(loaded & set(forbidden)),
+        "slowest": [{"module": module, "self_ms": round(s / 1000, 1)} for module, (s, _) in slowest],
+    }
+
+
+def parse_budget(value: str) -> Dict[str, float]:
+    budget = {}
+    for item in filter(None, value.split(",")):
+        name, _, ms = item.partition("=")
+        budget[name.strip()] = float(ms)
+    return budget
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="运行的场景，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=5, help="每个场景的运行次数，取中位数")
+    parser.add_argument("--top", type=int, default=8, help="列出自身耗时最多的模块数")
+    parser.add_argument("--budget", type=parse_budget, default={},
+                        help="导入耗时预算（毫秒），格式 场景=毫秒，逗号分隔")
+    parser.add_argument("--json", action="store_true", help="输出JSON")
+    args = parser.parse_args()
+
+    names = [n for n in args.scenarios.split(",") if n]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"未知场景: {', '.join(unknown)}（可选: {', '.join(SCENARIOS)}）")
+
+    results: List[Dict] = [measure(name, max(1, args.repeat), args.top) for name in names]
+    failed = False
+    for result in results:
+        limit = args.budget.get(result["name"])
+        result["budget_ms"] = limit
+        result["ok"] = not result["forbidden"] and (limit is None or result["import_ms"] <= limit)
+        failed |= not result["ok"]
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(f"{'场景':<10} {'导入(ms)':>10} {'进程(ms)':>10} {'模块数':>8} {'预算(ms)':>10}  结果")
+        for r in results:
+            budget = f"{r['budget_ms']:g}" if r["budget_ms"] is not None else "-"
+            status = "✅" if r["ok"] else "❌" + (f" 导入了 {', '.join(r['forbidden'])}" if r["forbidden"] else " 超出预算")
+            print(f"{r['name']:<10} {r['import_ms']:>10.1f} {r['wall_ms']:>10.1f} {r['modules']:>8} {budget:>10}  {status}")
+        for r in results:
+            print(f"\n{r['name']} 自身耗时最多的模块：")
+            for item in r["slowest"]:
+                print(f"  {item['self_ms']:>8.1f} ms  {item['module']}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
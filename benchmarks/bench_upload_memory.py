@@ -0,0 +1,124 @@
+"""base64图片上传内存基准
+
+对比旧路径（整体解码 -> 临时文件 -> requests files= 上传）与流式路径
+（Base64Stream -> MultipartStream）的Python内存峰值，请求发往本地接收服务。
+
+用法：
+    python benchmarks/bench_upload_memory.py --size-mb 8
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+
+class SinkHandler(BaseHTTPRequestHandler):
+    """丢弃请求体的最小微信替身：只实现token和素材上传"""
+
+    def do_GET(self):
+        self._reply({"access_token": "bench-token", "expires_in": 7200})
+
+    def do_POST(self):
+        remaining = int(self.headers.get("Content-Length", 0))
+        while remaining:
+            chunk = self.rfile.read(min(remaining, 64 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        self._reply({"media_id": f"bench-{time.time_ns()}"})
+
+    def _reply(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_upload(base_url: str, image_base64: str):
+    """改造前 upload_image 工具的做法"""
+    image_data = base64.b64decode(image_base64)
+    fd, path = tempfile.mkstemp(suffix=".jpg")
+    os.write(fd, image_data)
+    os.close(fd)
+    try:
+        with open(path, "rb") as f:
+            requests.post(f"{base_url}/cgi-bin/material/add_material", files={"media": f}, timeout=30)
+    finally:
+        os.remove(path)
+
+
+def streaming_upload(api, image_base64: str):
+    from wechat_mcp.multipart import Base64Stream
+
+    media_id = api.upload_image(Base64Stream(image_base64))
+    assert media_id, "upload failed"
+
+
+def measure(func, *args) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"peak_mb": round(peak / 1024 / 1024, 2), "seconds": round(elapsed, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=8, help="图片大小（MB）")
+    parser.add_argument("--json", action="store_true", help="输出JSON")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SinkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    os.environ["WECHAT_API_BASE"] = base_url
+    os.environ["WECHAT_TOKEN_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-wechat-")
+    os.environ["WECHAT_TOKEN_AUTO_REFRESH"] = "0"
+    from wechat_mcp.api import WeChatAPI
+
+    api = WeChatAPI("bench-app", "bench-secret")
+    api._get_token()  # 预热token和连接，不计入测量
+
+    # 每次使用不同内容，避免命中media_id缓存
+    raw = os.urandom(int(args.size_mb * 1024 * 1024))
+    legacy_b64 = base64.b64encode(b"\xff\xd8\xff" + raw).decode()
+    streaming_b64 = base64.b64encode(b"\xff\xd8\xfe" + raw).decode()
+    del raw
+
+    results = {
+        "image_mb": args.size_mb,
+        "base64_mb": round(len(legacy_b64) / 1024 / 1024, 2),
+        "legacy": measure(legacy_upload, base_url, legacy_b64),
+        "streaming": measure(streaming_upload, api, streaming_b64),
+    }
+    server.shutdown()
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"图片 {results['image_mb']} MB（base64 {results['base64_mb']} MB，不计入峰值）")
+    for name in ("legacy", "streaming"):
+        r = results[name]
+        print(f"  {name:<10} 峰值 {r['peak_mb']:>8.2f} MB   耗时 {r['seconds']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
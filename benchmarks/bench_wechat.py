@@ -0,0 +1,326 @@
+"""微信接口与MCP工具吞吐/延迟基准
+
+请求发往本地替身服务（fake_wechat.FakeWeChat），分别在两层按不同并发度运行各场景：
+    api    直接调用 WeChatAPI（线程池并发）
+    tools  通过 FastMCP 内存客户端调用工具（asyncio并发）
+
+每个场景报告 p50/p95/p99 延迟、吞吐量，以及单独串行测得的每次调用内存分配峰值
+和残留内存。结果可输出为JSON，并与之前保存的结果比较。
+
+用法：
+    python benchmarks/bench_wechat.py --concurrency 1,8,32 --calls 200
+    python benchmarks/bench_wechat.py --layer api --output bench.json
+    python benchmarks/bench_wechat.py --baseline bench.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from fake_wechat import FakeWeChat, parse_error
+
+# 最小的合法JPEG头，后面拼接计数器保证每张图片内容不同
+JPEG_HEAD = b"\xff\xd8\xff\xe0" + b"\x00" * 60
+_counter = itertools.count()
+
+
+def unique_image(size: int = 4096) -> bytes:
+    tag = str(next(_counter)).encode()
+    return JPEG_HEAD + tag + b"\x00" * max(0, size - len(JPEG_HEAD) - len(tag))
+
+
+def percentile(values: List[float], p: float) -> float:
+    """最近秩百分位，values已排序"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(round(p / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def summarize(latencies: List[float], errors: int, wall: float) -> Dict:
+    latencies = sorted(latencies)
+    calls = len(latencies)
+    return {
+        "calls": calls,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / calls * 1000, 3) if calls else 0.0,
+        "max_ms": round(latencies[-1] * 1000, 3) if calls else 0.0,
+        "throughput_rps": round(calls / wall, 1) if wall else 0.0,
+    }
+
+
+# ============ api层 ============
+
+def api_scenarios(api) -> Dict[str, Callable[[], bool]]:
+    """场景名 -> 无参调用，返回是否成功"""
+    cached_image = unique_image()
+    api.upload_image(cached_image)
+    draft_id = api.create_draft("bench publish", "<p>publish</p>", upload_inline_images=False)
+
+    def publish():
+        data = api.submit_publish(draft_id)
+        return bool(data.get("publish_id")) and "publish_status" in api.get_publish_status(data["publish_id"])
+
+    return {
+        "token": lambda: bool(api._get_token()),
+        "upload_image": lambda: bool(api.upload_image(unique_image())),
+        "upload_image_cached": lambda: bool(api.upload_image(cached_image)),
+        "upload_content_image": lambda: bool(api.upload_content_image(unique_image())),
+        "create_draft": lambda: bool(api.create_draft("bench", "<p>bench</p>", upload_inline_images=False)),
+        "list_drafts": lambda: api.list_drafts(0, 20) is not None,
+        "publish": publish,
+    }
+
+
+def run_sync(func: Callable[[], bool], calls: int, concurrency: int) -> Dict:
+    def timed(_):
+        start = time.perf_counter()
+        try:
+            ok = func()
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(timed, range(calls)))
+        wall = time.perf_counter() - start
+    return summarize([r[0] for r in results], sum(not r[1] for r in results), wall)
+
+
+def measure_alloc_sync(func: Callable[[], bool], calls: int) -> Dict:
+    """串行调用，统计每次调用的分配峰值和调用后残留的内存"""
+    func()  # 预热，排除首次导入和缓存初始化
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    peaks = 0
+    for _ in range(calls):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        peaks += tracemalloc.get_traced_memory()[1] - before
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return {
+        "alloc_peak_kb_per_call": round(peaks / calls / 1024, 2),
+        "retained_bytes_per_call": round(retained / calls, 1),
+    }
+
+
+# ============ tools层 ============
+
+def tool_scenarios() -> Dict[str, Callable[[], tuple]]:
+    """场景名 -> 无参函数，返回 (工具名, 参数)"""
+    return {
+        "tool_create_draft": lambda: ("create_draft", {"title": "bench", "content": "<p>bench</p>"}),
+        "tool_upload_image": lambda: ("upload_image", {"image_base64": base64.b64encode(unique_image()).decode()}),
+        "tool_list_drafts": lambda: ("list_drafts", {"count": 20}),
+        "tool_search_drafts": lambda: ("search_drafts", {"query": "bench", "limit": 20}),
+        "tool_publish_status": lambda: ("publish_status", {"limit": 10}),
+    }
+
+
+async def call_tool(client, make_call) -> bool:
+    name, arguments = make_call()
+    try:
+        result = await client.call_tool(name, arguments)
+    except Exception:
+        return False
+    return not any("❌" in getattr(block, "text", "") for block in result.content)
+
+
+async def run_async(client, make_call, calls: int, concurrency: int) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def timed():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            ok = await call_tool(client, make_call)
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed() for _ in range(calls)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def measure_alloc_async(client, make_call, calls: int) -> Dict:
+    await call_tool(client, make_call)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    peaks = 0
+    for _ in range(calls):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await call_tool(client, make_call)
+        peaks += tracemalloc.get_traced_memory()[1] - before
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return {
+        "alloc_peak_kb_per_call": round(peaks / calls / 1024, 2),
+        "retained_bytes_per_call": round(retained / calls, 1),
+    }
+
+
+# ============ 运行与比较 ============
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict], baseline_path: str, threshold: float) -> List[str]:
+    """与基线比较p95和吞吐量，返回超出阈值的退化项"""
+    with open(baseline_path) as f:
+        baseline = {
+            (r["layer"], r["name"], r["concurrency"]): r for r in json.load(f)["results"]
+        }
+    regressions = []
+    for r in results:
+        old = baseline.get((r["layer"], r["name"], r["concurrency"]))
+        if not old:
+            continue
+        key = f"{r['layer']}/{r['name']}@{r['concurrency']}"
+        if old["p95_ms"] and r["p95_ms"] > old["p95_ms"] * (1 + threshold):
+            regressions.append(f"{key} p95 {old['p95_ms']}ms -> {r['p95_ms']}ms")
+        if old["throughput_rps"] and r["throughput_rps"] < old["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{key} throughput {old['throughput_rps']} -> {r['throughput_rps']} rps")
+    return regressions
+
+
+def selected(names, wanted) -> list:
+    return [name for name in names if not wanted or name in wanted]
+
+
+async def run_tools(fake, args, levels, wanted) -> List[Dict]:
+    from fastmcp import Client
+    from wechat_mcp.server import app
+
+    results = []
+    scenarios = tool_scenarios()
+    async with Client(app) as client:
+        for name in selected(scenarios, wanted):
+            alloc = await measure_alloc_async(client, scenarios[name], args.alloc_calls)
+            for concurrency in levels:
+                fake.reset_stats()
+                stats = await run_async(client, scenarios[name], args.calls, concurrency)
+                results.append({
+                    "layer": "tools", "name": name, "concurrency": concurrency,
+                    **stats, **alloc, "server_requests": sum(fake.requests.values()),
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,8,32", help="并发度列表，逗号分隔")
+    parser.add_argument("--calls", type=int, default=200, help="每个场景每个并发度的调用次数")
+    parser.add_argument("--layer", choices=("api", "tools", "all"), default="all")
+    parser.add_argument("--scenarios", default="", help="只运行这些场景，逗号分隔")
+    parser.add_argument("--alloc-calls", type=int, default=50, help="测量内存分配的串行调用次数")
+    parser.add_argument("--latency", type=float, default=0.002, help="替身服务固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="替身服务随机延迟上限（秒）")
+    parser.add_argument("--error", action="append", default=[], type=parse_error,
+                        help="注入错误码，格式 path=errcode:概率，可重复")
+    parser.add_argument("--rate-limit", type=float, help="替身服务每个接口每秒请求数上限")
+    parser.add_argument("--client-rate-limits", action="store_true",
+                        help="保留客户端默认限流（默认放开，只测量客户端开销）")
+    parser.add_argument("--json", action="store_true", help="输出JSON")
+    parser.add_argument("--output", help="把JSON结果写入文件")
+    parser.add_argument("--baseline", help="与之前保存的JSON结果比较")
+    parser.add_argument("--threshold", type=float, default=0.1, help="判定退化的相对阈值")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+    wanted = set(filter(None, args.scenarios.split(",")))
+
+    fake = FakeWeChat(
+        latency=args.latency,
+        jitter=args.jitter,
+        errors=dict(args.error),
+        rate_limit=args.rate_limit
+    ).start()
+    os.environ["WECHAT_API_BASE"] = fake.base_url
+    os.environ["WECHAT_TOKEN_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-wechat-")
+    os.environ["WECHAT_TOKEN_AUTO_REFRESH"] = "0"
+    os.environ["WECHAT_APP_ID"] = "bench-app"
+    os.environ["WECHAT_APP_SECRET"] = "bench-secret"
+    os.environ["WECHAT_HTTP_POOL_SIZE"] = str(max(levels + [16]))
+    if not args.client_rate_limits:
+        os.environ["WECHAT_RATE_LIMITS"] = "material=1e6:1000000,draft=1e6:1000000,publish=1e6:1000000,default=1e6:1000000"
+    from wechat_mcp.api import get_wechat_api
+
+    results = []
+    if args.layer in ("api", "all"):
+        scenarios = api_scenarios(get_wechat_api())
+        for name in selected(scenarios, wanted):
+            alloc = measure_alloc_sync(scenarios[name], args.alloc_calls)
+            for concurrency in levels:
+                fake.reset_stats()
+                stats = run_sync(scenarios[name], args.calls, concurrency)
+                results.append({
+                    "layer": "api", "name": name, "concurrency": concurrency,
+                    **stats, **alloc, "server_requests": sum(fake.requests.values()),
+                })
+    if args.layer in ("tools", "all"):
+        results += asyncio.run(run_tools(fake, args, levels, wanted))
+    fake.stop()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "calls": args.calls,
+            "client_rate_limits": args.client_rate_limits,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    regressions = compare(results, args.baseline, args.threshold) if args.baseline else []
+
+    if args.json:
+        json.dump({**report, "regressions": regressions}, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"{'layer':<6} {'scenario':<22} {'conc':>4} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} "
+              f"{'rps':>8} {'err':>4} {'allocKB':>8}")
+        for r in results:
+            print(f"{r['layer']:<6} {r['name']:<22} {r['concurrency']:>4} {r['p50_ms']:>8.2f} "
+                  f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['throughput_rps']:>8.1f} "
+                  f"{r['errors']:>4} {r['alloc_peak_kb_per_call']:>8.1f}")
+        for line in regressions:
+            print(f"退化: {line}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""本地Docker守护进程替身
+
+在unix socket或TCP端口上实现 docker-py 用到的接口：_ping、version、containers/json
+（label/name/status/id 过滤和 limit）、containers/{id}/json、images/{id}/json、
+containers/{id}/stats（流式和单次）、containers/{id}/logs（多路复用格式，支持
+tail/since/until/stdout/stderr/timestamps）、containers/{id}/restart 和 events。
+可配置延迟，用于多主机、慢主机和基准测试，不需要真实的Docker。
+
+用法：
+    # 作为独立服务运行，再把 DOCKER_MCP_HOST 指向它
+    python benchmarks/fake_docker.py --socket /tmp/fake-docker.sock --containers 50
+
+    # 在代码中使用
+    with FakeDocker("/tmp/fake-docker.sock", containers=10) as fake:
+        os.environ["DOCKER_MCP_HOST"] = fake.base_url
+"""
+import argparse
+import json
+import os
+import re
+import socketserver
+import struct
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+API_VERSION = "1.43"
+
+# 重启时依次发出的事件
+RESTART_EVENTS = ("kill", "die", "stop", "start", "restart")
+
+
+def make_container(index: int, project: str = "demo", image: str = "nginx:latest") -> Dict:
+    """构造一个 /containers/json 格式的运行中容器"""
+    container_id = f"{index:04d}" + "a" * 60
+    return {
+        "Id": container_id,
+        "Names": [f"/web{index}"],
+        "Image": image,
+        "ImageID": "sha256:" + "b" * 64,
+        "State": "running",
+        "Status": "Up 1 hour",
+        "Labels": {"com.docker.compose.project": project, "tier": "web"},
+        "Ports": [{"PrivatePort": 80, "PublicPort": 8000 + index, "Type": "tcp", "IP": "0.0.0.0"}],
+        "Created": 1700000000 + index,
+    }
+
+
+class FakeDocker:
+    """
+    Docker守护进程替身
+
+    Args:
+        socket_path: unix socket路径；为空时监听TCP
+        containers: 初始容器数
+        host, port: TCP监听地址（socket_path为空时使用），port=0 时自动分配
+        latency: 每个请求的固定延迟（秒），模拟慢主机
+        stats_interval: stats流的推送间隔（秒）
+        log_lines: 每个容器的初始日志行数
+        restart_delay: 重启一个容器耗时（秒）
+        health_delay: 带 healthcheck 标签的容器重启后多久发出健康检查事件
+    """
+
+    def __init__(
+        self,
+        socket_path: str = None,
+        containers: int = 3,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        stats_interval: float = 1.0,
+        log_lines: int = 200,
+        restart_delay: float = 0.0,
+        health_delay: float = 0.2
+    ):
+        self.latency = latency
+        self.stats_interval = stats_interval
+        self.restart_delay = restart_delay
+        self.health_delay = health_delay
+
+        self.containers: Dict[str, Dict] = {}
+        for i in range(containers):
+            c = make_container(i, project="demo" if i % 2 == 0 else "other")
+            self.containers[c["Id"]] = c
+        started = time.time() - 60
+        # 容器ID -> [(流 1=stdout 2=stderr, 文本, 时间戳)]
+        self.logs: Dict[str, List[Tuple[int, str, float]]] = {
+            cid: [(1, f"line {k} of {c['Names'][0][1:]}\n", started + k * 0.001) for k in range(log_lines)]
+            for cid, c in self.containers.items()
+        }
+        self.requests: Counter = Counter()
+        self.events: List[Dict] = []
+        self._events_cond = threading.Condition()
+        self._lock = threading.Lock()
+
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self.socket_path = socket_path
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self._server = _UnixServer(socket_path, handler)
+        else:
+            self._server = ThreadingHTTPServer((host, port), handler)
+            self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        if self.socket_path:
+            return f"unix://{self.socket_path}"
+        host, port = self._server.server_address[:2]
+        return f"tcp://{host}:{port}"
+
+    def start(self) -> "FakeDocker":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-docker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def __enter__(self) -> "FakeDocker":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests.clear()
+
+    def find(self, ref: str) -> Optional[Dict]:
+        """按ID前缀或名称查找容器"""
+        for cid, c in self.containers.items():
+            if cid.startswith(ref) or ("/" + ref) in c["Names"]:
+                return c
+        return None
+
+    def emit(self, action: str, container: Dict, **attributes):
+        """向订阅events的客户端发出一个容器事件"""
+        attributes.setdefault("name", container["Names"][0][1:])
+        event = {
+            "Type": "container", "Action": action, "status": action, "id": container["Id"],
+            "Actor": {"ID": container["Id"], "Attributes": attributes},
+            "time": int(time.time()), "timeNano": time.time_ns(),
+        }
+        with self._events_cond:
+            self.events.append(event)
+            self._events_cond.notify_all()
+
+    def restart(self, container: Dict):
+        time.sleep(self.restart_delay)
+        for action in RESTART_EVENTS:
+            self.emit(action, container)
+        health = container["Labels"].get("healthcheck")
+        if health:
+            timer = threading.Timer(self.health_delay, self.emit, ("health_status: " + health, container))
+            timer.daemon = True
+            timer.start()
+
+    # ============ 请求处理 ============
+
+    def list_containers(self, query: Dict[str, List[str]]) -> List[Dict]:
+        items = list(self.containers.values())
+        filters = json.loads(query["filters"][0]) if "filters" in query else {}
+        if not _flag(query, "all") and not filters.get("status"):
+            items = [c for c in items if c["State"] == "running"]
+        for label in filters.get("label", []):
+            key, has_value, value = label.partition("=")
+            items = [c for c in items if key in c["Labels"] and (not has_value or c["Labels"][key] == value)]
+        for name in filters.get("name", []):
+            items = [c for c in items if any(re.search(name, n) for n in c["Names"])]
+        for status in filters.get("status", []):
+            items = [c for c in items if c["State"] == status]
+        for cid in filters.get("id", []):
+            items = [c for c in items if c["Id"].startswith(cid)]
+        items.sort(key=lambda c: c["Created"], reverse=True)
+        limit = int(query.get("limit", ["0"])[0] or 0)
+        return items[:limit] if limit > 0 else items
+
+    def inspect(self, container: Dict) -> Dict:
+        health = container["Labels"].get("healthcheck")
+        return {
+            "Id": container["Id"],
+            "Name": container["Names"][0],
+            "Image": container["ImageID"],
+            "Created": "2024-01-01T00:00:00Z",
+            "Config": {
+                "Image": container["Image"], "Labels": container["Labels"], "Tty": False,
+                "Healthcheck": container.get("Healthcheck", {"Test": ["CMD", "true"]} if health else None),
+            },
+            "State": {
+                "Status": container["State"], "Running": container["State"] == "running",
+                "Health": {"Status": health} if health else None,
+            },
+        }
+
+    def stats_sample(self, container: Dict, k: int) -> Dict:
+        """第k个采样：CPU、网络和磁盘累计值随k线性增长，负载与容器序号成正比"""
+        weight = 1 + int(container["Id"][:4])
+        return {
+            "read": time.strftime("%Y-%m-%dT%H:%M:%S.000000000Z", time.gmtime()),
+            "cpu_stats": {
+                "cpu_usage": {"total_usage": 10 ** 8 * k * weight}, "system_cpu_usage": 10 ** 10 * k, "online_cpus": 4,
+            },
+            "precpu_stats": {
+                "cpu_usage": {"total_usage": 10 ** 8 * (k - 1) * weight}, "system_cpu_usage": 10 ** 10 * (k - 1),
+            },
+            "memory_stats": {"usage": 10 * 2 ** 20 * weight, "limit": 2 ** 32},
+            "networks": {"eth0": {"rx_bytes": 1000 * k * weight, "tx_bytes": 500 * k * weight}},
+            "blkio_stats": {"io_service_bytes_recursive": [
+                {"op": "read", "value": 4096 * k * weight}, {"op": "write", "value": 8192 * k * weight},
+            ]},
+        }
+
+    def log_frames(self, container: Dict, query: Dict[str, List[str]]) -> List[bytes]:
+        entries = self.logs.get(container["Id"], [])
+        since = float(query.get("since", ["0"])[0] or 0)
+        until = float(query.get("until", ["0"])[0] or 0)
+        if since > 0:
+            entries = [e for e in entries if e[2] >= since]
+        if until > 0:
+            entries = [e for e in entries if e[2] <= until]
+        tail = query.get("tail", ["all"])[0]
+        if tail != "all":
+            entries = entries[-int(tail):] if int(tail) else []
+        wanted = {1: _flag(query, "stdout"), 2: _flag(query, "stderr")}
+        frames = []
+        for stream, text, ts in entries:
+            if not wanted[stream]:
+                continue
+            if _flag(query, "timestamps"):
+                text = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(ts)) + f".{int(ts % 1 * 1e9):09d}Z " + text
+            data = text.encode("utf-8")
+            frames.append(struct.pack(">BxxxL", stream, len(data)) + data)
+        return frames
+
+
+def _flag(query: Dict[str, List[str]], name: str) -> bool:
+    return query.get(name, ["0"])[0] in ("1", "true", "True")
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # 并发测试时连接数可能超过默认的5个排队
+    request_queue_size = 256
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: FakeDocker = None
+
+    def setup(self):
+        # unix socket 不支持 TCP_NODELAY
+        self.disable_nagle_algorithm = not isinstance(self.server, _UnixServer)
+        super().setup()
+
+    def address_string(self) -> str:
+        return "fake-docker"
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _json(self, data, code: int = 200):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Api-Version", API_VERSION)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _start_chunked(self, content_type: str = "application/json"):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _not_found(self):
+        self._json({"message": "No such container"}, 404)
+
+    def _dispatch(self, method: str):
+        fake = self.fake
+        url = urlparse(self.path)
+        path = re.sub(r"^/v[\d.]+", "", url.path)
+        query = parse_qs(url.query)
+        endpoint = re.sub(r"/containers/[^/]+/", "/containers/{id}/", path)
+        with fake._lock:
+            fake.requests[f"{method} {endpoint}"] += 1
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        try:
+            if path == "/_ping":
+                self.send_response(200)
+                self.send_header("Api-Version", API_VERSION)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"OK")
+            elif path == "/version":
+                self._json({"ApiVersion": API_VERSION, "MinAPIVersion": "1.12", "Version": "24.0.0", "Os": "linux"})
+            elif path == "/containers/json":
+                self._json(fake.list_containers(query))
+            elif path == "/events":
+                self._events()
+            elif path.startswith("/images/"):
+                self._json({"Id": "sha256:" + "b" * 64, "RepoTags": ["nginx:latest"]})
+            else:
+                match = re.match(r"/containers/([^/]+)/(\w+)$", path)
+                container = fake.find(match.group(1)) if match else None
+                if container is None:
+                    return self._not_found()
+                action = match.group(2)
+                if action == "json":
+                    self._json(fake.inspect(container))
+                elif action == "stats":
+                    self._stats(container, query)
+                elif action == "logs":
+                    self._start_chunked("application/vnd.docker.raw-stream")
+                    for frame in fake.log_frames(container, query):
+                        self._chunk(frame)
+                    self._chunk(b"")
+                elif action == "restart" and method == "POST":
+                    fake.restart(container)
+                    self.send_response(204)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                else:
+                    self._json({"message": f"not implemented: {method} {path}"}, 404)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _stats(self, container: Dict, query: Dict[str, List[str]]):
+        fake = self.fake
+        if query.get("stream", ["1"])[0] in ("0", "false", "False"):
+            return self._json(fake.stats_sample(container, int(time.time())))
+        self._start_chunked()
+        k = 1
+        while True:
+            k += 1
+            self._chunk(json.dumps(fake.stats_sample(container, k)).encode("utf-8") + b"\n")
+            time.sleep(fake.stats_interval)
+
+    def _events(self):
+        fake = self.fake
+        self._start_chunked()
+        seen = len(fake.events)
+        while True:
+            with fake._events_cond:
+                fake._events_cond.wait_for(lambda: len(fake.events) > seen, timeout=1)
+                new = fake.events[seen:]
+                seen = len(fake.events)
+            for event in new:
+                self._chunk(json.dumps(event).encode("utf-8") + b"\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", help="unix socket路径（默认监听TCP）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2375)
+    parser.add_argument("--containers", type=int, default=3, help="容器数")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的固定延迟（秒）")
+    parser.add_argument("--stats-interval", type=float, default=1.0, help="stats流推送间隔（秒）")
+    args = parser.parse_args()
+
+    fake = FakeDocker(
+        args.socket,
+        containers=args.containers,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        stats_interval=args.stats_interval
+    )
+    print(f"fake Docker daemon listening on {fake.base_url}")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""本地微信接口替身
+
+实现 cgi-bin/token、material/add_material、media/upload、media/uploadimg、
+draft/add|batchget|delete 和 freepublish/submit|get，可配置延迟、错误码和限流，
+用于基准测试和本地调试，不访问 api.weixin.qq.com。
+
+用法：
+    # 作为独立服务运行，再把 WECHAT_API_BASE 指向它
+    python benchmarks/fake_wechat.py --port 8900 --latency 0.02 --error draft/add=45009:0.05
+
+    # 在代码中使用
+    with FakeWeChat(latency=0.01) as fake:
+        os.environ["WECHAT_API_BASE"] = fake.base_url
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PREFIX = "/cgi-bin/"
+
+
+class _Bucket:
+    """每个接口一个令牌桶，超出时返回45011"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class FakeWeChat:
+    """
+    微信接口替身服务
+
+    Args:
+        host, port: 监听地址，port=0 时自动分配
+        latency: 每个请求的固定延迟（秒）
+        jitter: 在latency基础上追加 [0, jitter) 的随机延迟
+        errors: 接口路径 -> (errcode, 概率)，如 {"draft/add": (45009, 0.1)}
+        rate_limit: 每个接口每秒允许的请求数，超出返回45011（默认不限）
+        publish_delay: freepublish/submit 之后多少秒 freepublish/get 返回发布成功
+        token_ttl: 下发token的 expires_in
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        errors: Dict[str, Tuple[int, float]] = None,
+        rate_limit: float = None,
+        publish_delay: float = 0.0,
+        token_ttl: int = 7200
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.errors = dict(errors or {})
+        self.rate_limit = rate_limit
+        self.publish_delay = publish_delay
+        self.token_ttl = token_ttl
+
+        self.requests: Counter = Counter()
+        self.drafts: "OrderedDict[str, Dict]" = OrderedDict()
+        self.publishes: Dict[str, Dict] = {}
+        self._tokens = set()
+        self._buckets: Dict[str, _Bucket] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeWeChat":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-wechat", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeWeChat":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def expire_tokens(self):
+        """让已下发的token全部失效，下一次调用返回40001"""
+        with self._lock:
+            self._tokens.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests.clear()
+
+    # ============ 请求处理 ============
+
+    def _next_id(self, prefix: str) -> str:
+        return f"{prefix}{next(self._ids)}"
+
+    def handle(self, path: str, query: Dict[str, str], body: bytes) -> Dict:
+        with self._lock:
+            self.requests[path] += 1
+
+        delay = self.latency + (random.random() * self.jitter if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if path == "token":
+            return self._token(query)
+
+        with self._lock:
+            if query.get("access_token") not in self._tokens:
+                return {"errcode": 40001, "errmsg": "invalid credential"}
+            if self.rate_limit:
+                bucket = self._buckets.setdefault(path, _Bucket(self.rate_limit))
+                if not bucket.take():
+                    return {"errcode": 45011, "errmsg": "api minute-quota reach limit"}
+
+        errcode, probability = self.errors.get(path, (0, 0))
+        if errcode and random.random() < probability:
+            return {"errcode": errcode, "errmsg": "fake error"}
+
+        handler = getattr(self, "_" + path.replace("/", "_"), None)
+        if handler is None:
+            return {"errcode": 48001, "errmsg": "api unauthorized"}
+        data = json.loads(body) if body and not path.startswith(("material/", "media/")) else {}
+        return handler(data)
+
+    def _token(self, query: Dict[str, str]) -> Dict:
+        if not query.get("appid") or not query.get("secret"):
+            return {"errcode": 41002, "errmsg": "appid missing"}
+        token = self._next_id("fake-token-")
+        with self._lock:
+            self._tokens.add(token)
+        return {"access_token": token, "expires_in": self.token_ttl}
+
+    def _material_add_material(self, data: Dict) -> Dict:
+        media_id = self._next_id("fake-media-")
+        return {"media_id": media_id, "url": f"http://mmbiz.qpic.cn/fake/{media_id}"}
+
+    def _media_upload(self, data: Dict) -> Dict:
+        return {"type": "image", "media_id": self._next_id("fake-temp-"), "created_at": int(time.time())}
+
+    def _media_uploadimg(self, data: Dict) -> Dict:
+        return {"url": f"http://mmbiz.qpic.cn/fake/{self._next_id('img-')}"}
+
+    def _draft_add(self, data: Dict) -> Dict:
+        media_id = self._next_id("fake-draft-")
+        with self._lock:
+            self.drafts[media_id] = {
+                "media_id": media_id,
+                "content": {"news_item": data.get("articles", [])},
+                "update_time": int(time.time()),
+            }
+            self.drafts.move_to_end(media_id, last=False)
+        return {"media_id": media_id}
+
+    def _draft_batchget(self, data: Dict) -> Dict:
+        offset, count = data.get("offset", 0), min(data.get("count", 20), 20)
+        with self._lock:
+            items = list(itertools.islice(self.drafts.values(), offset, offset + count))
+            total = len(self.drafts)
+        if data.get("no_content"):
+            items = [
+                {**item, "content": {"news_item": [
+                    {k: v for k, v in article.items() if k != "content"}
+                    for article in item["content"]["news_item"]
+                ]}}
+                for item in items
+            ]
+        return {"total_count": total, "item_count": len(items), "item": items}
+
+    def _draft_delete(self, data: Dict) -> Dict:
+        with self._lock:
+            found = self.drafts.pop(data.get("media_id"), None)
+        return {"errcode": 0, "errmsg": "ok"} if found else {"errcode": 40007, "errmsg": "invalid media_id"}
+
+    def _freepublish_submit(self, data: Dict) -> Dict:
+        with self._lock:
+            if data.get("media_id") not in self.drafts:
+                return {"errcode": 40007, "errmsg": "invalid media_id"}
+        publish_id = self._next_id("fake-publish-")
+        with self._lock:
+            self.publishes[publish_id] = {"media_id": data["media_id"], "submitted_at": time.time()}
+        return {"errcode": 0, "errmsg": "ok", "publish_id": publish_id, "msg_data_id": publish_id}
+
+    def _freepublish_get(self, data: Dict) -> Dict:
+        publish_id = data.get("publish_id")
+        job = self.publishes.get(publish_id)
+        if job is None:
+            return {"errcode": 40007, "errmsg": "invalid publish_id"}
+        if time.time() - job["submitted_at"] < self.publish_delay:
+            return {"publish_id": publish_id, "publish_status": 1}
+        return {
+            "publish_id": publish_id,
+            "publish_status": 0,
+            "article_id": f"article-{publish_id}",
+            "article_detail": {
+                "count": 1,
+                "item": [{"idx": 1, "article_url": f"http://mp.weixin.qq.com/s/{publish_id}"}],
+            },
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 头和正文分两次写出，不关闭Nagle会与客户端的延迟ACK叠加出约40ms的等待
+    disable_nagle_algorithm = True
+    fake: FakeWeChat = None
+
+    def do_GET(self):
+        self._dispatch(b"")
+
+    def do_POST(self):
+        self._dispatch(self._read_body())
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if not size:
+                    self.rfile.readline()
+                    return b"".join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _dispatch(self, body: bytes):
+        url = urlparse(self.path)
+        if not url.path.startswith(PREFIX):
+            self.send_error(404)
+            return
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        data = self.fake.handle(url.path[len(PREFIX):], query, body)
+
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def parse_error(value: str) -> Tuple[str, Tuple[int, float]]:
+    """draft/add=45009:0.1 -> ("draft/add", (45009, 0.1))"""
+    path, _, spec = value.partition("=")
+    errcode, _, probability = spec.partition(":")
+    return path.strip(), (int(errcode), float(probability or 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0, help="固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="追加的随机延迟上限（秒）")
+    parser.add_argument("--error", action="append", default=[], type=parse_error,
+                        help="注入错误码，格式 path=errcode:概率，可重复")
+    parser.add_argument("--rate-limit", type=float, help="每个接口每秒请求数上限")
+    parser.add_argument("--publish-delay", type=float, default=0.0, help="发布完成所需秒数")
+    args = parser.parse_args()
+
+    fake = FakeWeChat(
+        args.host,
+        args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        errors=dict(args.error),
+        rate_limit=args.rate_limit,
+        publish_delay=args.publish_delay
+    )
+    print(f"fake WeChat API listening on {fake.base_url}")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
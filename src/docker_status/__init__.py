@@ -1,13 +1,86 @@
 """Docker容器监控工具 - FastMCP 2.x"""
 __version__ = "0.2.0"
 
-from .server import docker_app, list_containers, get_container_stats, get_container_logs, restart_container
+import importlib
+
+from .config import Config, config
+
+# 导出名称 -> 所在模块，首次访问时才导入（fastmcp、docker、numpy等依赖随之加载）
+_EXPORTS = {
+    "docker_app": ".server",
+    "list_containers": ".server",
+    "get_container_stats": ".server",
+    "top_containers": ".server",
+    "container_history": ".server",
+    "get_container_logs": ".server",
+    "search_logs": ".server",
+    "restart_container": ".server",
+    "restart_containers": ".server",
+    "DockerConnection": ".client",
+    "AsyncDockerClient": ".client",
+    "get_docker": ".client",
+    "get_async_docker": ".client",
+    "HostError": ".hosts",
+    "get_hosts": ".hosts",
+    "fan_out": ".hosts",
+    "MetricsHistory": ".history",
+    "get_metrics_history": ".history",
+    "LogIndex": ".log_index",
+    "get_log_index": ".log_index",
+    "ContainerInventory": ".inventory",
+    "get_inventory": ".inventory",
+    "StatsCollector": ".stats",
+    "StatsRing": ".stats",
+    "get_stats_collector": ".stats",
+    "ToolLimiter": ".concurrency",
+    "get_limiter": ".concurrency",
+    "limiter_stats": ".concurrency",
+}
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     "__version__",
     "docker_app",
     "list_containers",
     "get_container_stats",
+    "top_containers",
+    "container_history",
     "get_container_logs",
+    "search_logs",
     "restart_container",
+    "restart_containers",
+    "DockerConnection",
+    "AsyncDockerClient",
+    "get_docker",
+    "get_async_docker",
+    "HostError",
+    "get_hosts",
+    "fan_out",
+    "MetricsHistory",
+    "get_metrics_history",
+    "LogIndex",
+    "get_log_index",
+    "ContainerInventory",
+    "get_inventory",
+    "StatsCollector",
+    "StatsRing",
+    "get_stats_collector",
+    "ToolLimiter",
+    "get_limiter",
+    "limiter_stats",
+    "Config",
+    "config",
 ]
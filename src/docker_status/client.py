@@ -0,0 +1,176 @@
+"""Docker客户端模块 - 每个守护进程一个共享客户端，断线自动重连"""
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import docker
+import requests
+
+from .config import config
+
+# 连接层面的失败（守护进程重启、socket不可用），重建客户端后可以重试
+CONNECTION_ERRORS = (requests.exceptions.ConnectionError,)
+
+
+class DockerConnection:
+    """
+    一个Docker守护进程的共享客户端
+
+    客户端只在首次使用和重连时创建（包括API版本协商），之后所有调用共用它的
+    连接池。距上次成功调用超过 DOCKER_MCP_HEALTH_CHECK_INTERVAL 秒时先ping一次；
+    调用遇到连接错误时重建客户端并重试一次，守护进程重启对调用方透明。
+    """
+
+    def __init__(self, base_url: str = None, pool_size: int = None, timeout: float = None):
+        """
+        Args:
+            base_url: 守护进程地址，如 unix:///var/run/docker.sock（默认读取环境变量）
+            pool_size: 连接池大小（默认 DOCKER_MCP_POOL_SIZE）
+            timeout: 调用超时秒数（默认 DOCKER_MCP_TIMEOUT）
+        """
+        self.base_url = base_url or config.docker_host or None
+        self.pool_size = pool_size or config.pool_size
+        self.timeout = timeout or config.timeout
+        self.reconnects = 0
+        self._client: Optional[docker.DockerClient] = None
+        self._lock = threading.Lock()
+        self._last_ok = 0.0
+
+    def _connect(self) -> docker.DockerClient:
+        kwargs = {"timeout": int(self.timeout), "max_pool_size": self.pool_size}
+        if self.base_url:
+            return docker.DockerClient(base_url=self.base_url, **kwargs)
+        return docker.from_env(**kwargs)
+
+    @property
+    def client(self) -> docker.DockerClient:
+        """共享客户端，需要时创建或在健康检查失败后重建"""
+        client = self._client
+        if client is not None and time.monotonic() - self._last_ok < config.health_check_interval:
+            return client
+
+        with self._lock:
+            if self._client is not None and self._client is client:
+                try:
+                    self._client.ping()
+                    self._last_ok = time.monotonic()
+                    return self._client
+                except Exception:
+                    self._close_client()
+            if self._client is None:
+                self._client = self._connect()
+                self._last_ok = time.monotonic()
+            return self._client
+
+    def owns(self, client: docker.DockerClient) -> bool:
+        """client是否为本连接当前的共享客户端（不会为此建立连接）"""
+        return client is not None and client is self._client
+
+    def reconnect(self, stale: docker.DockerClient = None):
+        """丢弃当前客户端，下次使用时重建；stale已被其他线程替换时不做处理"""
+        with self._lock:
+            if stale is None or self._client is stale:
+                self._close_client()
+
+    def _close_client(self):
+        if self._client is not None:
+            self.reconnects += 1
+            try:
+                self._client.close()
+            except Exception:
+                pass
+            self._client = None
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        以共享客户端调用 func(client, *args, **kwargs)
+
+        遇到连接错误时重建客户端重试一次，仍失败则抛出。
+        """
+        client = self.client
+        try:
+            result = func(client, *args, **kwargs)
+        except CONNECTION_ERRORS:
+            self.reconnect(client)
+            result = func(self.client, *args, **kwargs)
+        self._last_ok = time.monotonic()
+        return result
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+class AsyncDockerClient:
+    """
+    DockerConnection的异步版本
+
+    调用放到与连接池同样大小的线程池执行，并发的工具调用各自占用一个连接，
+    不会阻塞服务器事件循环，也不会在同一个socket上排队。
+    """
+
+    def __init__(self, connection: DockerConnection = None, max_workers: int = None):
+        self.connection = connection or DockerConnection()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.connection.pool_size,
+            thread_name_prefix="docker-api"
+        )
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """在线程池中执行 func(client, *args, **kwargs)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(self.connection.call, func, *args, **kwargs)
+        )
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.connection.close()
+
+
+# 守护进程地址 -> 共享客户端
+_connections: Dict[Optional[str], DockerConnection] = {}
+_async_clients: Dict[Optional[str], AsyncDockerClient] = {}
+_guard = threading.Lock()
+
+
+def _normalize(base_url: Optional[str]) -> Optional[str]:
+    """与默认守护进程相同的地址使用同一个连接"""
+    return None if base_url == (config.docker_host or None) else base_url
+
+
+def get_docker(base_url: str = None) -> DockerConnection:
+    """获取守护进程对应的共享DockerConnection（默认按环境变量连接）"""
+    base_url = _normalize(base_url)
+    with _guard:
+        connection = _connections.get(base_url)
+        if connection is None:
+            connection = _connections[base_url] = DockerConnection(base_url)
+        return connection
+
+
+def get_async_docker(base_url: str = None) -> AsyncDockerClient:
+    """获取守护进程对应的AsyncDockerClient（与get_docker共享连接）"""
+    connection = get_docker(base_url)
+    base_url = _normalize(base_url)
+    with _guard:
+        client = _async_clients.get(base_url)
+        if client is None:
+            client = _async_clients[base_url] = AsyncDockerClient(connection)
+        return client
+
+
+def close_all():
+    """关闭所有共享客户端的线程池和连接（服务退出时调用）"""
+    with _guard:
+        for client in _async_clients.values():
+            client.close()
+        for connection in _connections.values():
+            connection.close()
+        _async_clients.clear()
+        _connections.clear()
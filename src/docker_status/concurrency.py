@@ -0,0 +1,28 @@
+"""工具并发限制 - 按 DOCKER_MCP_TOOL_LIMITS 为每个工具创建并发闸门，实现见 mcp4agent.concurrency"""
+from mcp4agent.concurrency import LimiterRegistry, Limits, ToolBusy, ToolLimiter, parse_tool_limits
+
+from .config import config
+
+# 工具名 -> 默认并发数；总和小于 DOCKER_MCP_POOL_SIZE，慢工具占满时
+# list_containers、get_container_stats 仍有空闲线程
+DEFAULT_LIMITS = {
+    "get_container_logs": 4,
+    "search_logs": 2,
+    "container_history": 2,
+    "top_containers": 1,
+    "restart_container": 2,
+    "restart_containers": 1,
+}
+
+
+def _limits() -> Limits:
+    return parse_tool_limits(config.tool_limits, DEFAULT_LIMITS, config.tool_max_wait)
+
+
+_registry = LimiterRegistry(_limits, lambda: config.tool_max_wait)
+
+get_limiter = _registry.get
+limiter_stats = _registry.stats
+limited = _registry.limited
+
+__all__ = ["ToolBusy", "ToolLimiter", "get_limiter", "limiter_stats", "limited"]
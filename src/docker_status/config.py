@@ -0,0 +1,163 @@
+"""配置管理模块"""
+import os
+import re
+from typing import Dict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class Config:
+    """Docker监控配置"""
+
+    @property
+    def docker_host(self) -> str:
+        """Docker守护进程地址，为空时按 DOCKER_HOST 等环境变量连接"""
+        return os.getenv("DOCKER_MCP_HOST", "")
+
+    @property
+    def hosts(self) -> Dict[str, str]:
+        """
+        多个守护进程，格式 "名称=地址,名称=地址"，如 "web1=ssh://ops@10.0.0.1,db=tcp://10.0.0.2:2375"
+        
+        为空时只连接 DOCKER_MCP_HOST（或 DOCKER_HOST）指向的守护进程。
+        """
+        hosts = {}
+        for item in os.getenv("DOCKER_MCP_HOSTS", "").split(","):
+            item = item.strip()
+            if not item:
+                continue
+            name, sep, url = item.partition("=")
+            if not sep:
+                url = name
+                name = re.sub(r"^\w+://", "", url).split("/")[0].rsplit(":", 1)[0] or url
+            hosts[name.strip()] = url.strip()
+        return hosts
+
+    @property
+    def host_timeout(self) -> float:
+        """多主机查询时每个主机的超时秒数，超时的主机标记后跳过"""
+        return float(os.getenv("DOCKER_MCP_HOST_TIMEOUT", "10"))
+
+    @property
+    def pool_size(self) -> int:
+        """到守护进程的连接池大小，也是并发调用的线程数"""
+        return int(os.getenv("DOCKER_MCP_POOL_SIZE", "16"))
+
+    @property
+    def timeout(self) -> float:
+        """单次API调用超时（秒）"""
+        return float(os.getenv("DOCKER_MCP_TIMEOUT", "60"))
+
+    @property
+    def health_check_interval(self) -> float:
+        """距上次成功调用超过该秒数时，先ping一次守护进程，失败则重连"""
+        return float(os.getenv("DOCKER_MCP_HEALTH_CHECK_INTERVAL", "30"))
+
+    @property
+    def stats_collector(self) -> bool:
+        """是否在后台订阅容器stats流（关闭后每次查询阻塞采样）"""
+        return os.getenv("DOCKER_MCP_STATS_COLLECTOR", "1").lower() in ("1", "true", "yes")
+
+    @property
+    def stats_buffer_size(self) -> int:
+        """每个容器保留的采样数（约每秒一个）"""
+        return int(os.getenv("DOCKER_MCP_STATS_BUFFER_SIZE", "300"))
+
+    @property
+    def stats_max_containers(self) -> int:
+        """同时订阅stats的容器数上限"""
+        return int(os.getenv("DOCKER_MCP_STATS_MAX_CONTAINERS", "256"))
+
+    @property
+    def stats_discovery_interval(self) -> float:
+        """重新列出运行中容器、为新容器建立订阅的间隔秒数"""
+        return float(os.getenv("DOCKER_MCP_STATS_DISCOVERY_INTERVAL", "10"))
+
+    @property
+    def inventory(self) -> bool:
+        """是否维护由事件流更新的容器清单（关闭后每次查询都访问守护进程）"""
+        return os.getenv("DOCKER_MCP_INVENTORY", "1").lower() in ("1", "true", "yes")
+
+    @property
+    def logs_max_bytes(self) -> int:
+        """get_container_logs单次返回的字节数上限（调用方的max_bytes不能超过它）"""
+        return int(os.getenv("DOCKER_MCP_LOGS_MAX_BYTES", str(1024 * 1024)))
+
+    @property
+    def cache_dir(self) -> str:
+        """本地数据目录（日志索引、指标历史）"""
+        default_cache = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".cache", "docker-mcp")
+        return os.getenv("DOCKER_MCP_CACHE_DIR", default_cache)
+
+    @property
+    def log_index(self) -> bool:
+        """是否在后台采集容器日志并建立全文索引（search_logs 依赖它）"""
+        return os.getenv("DOCKER_MCP_LOG_INDEX", "1").lower() in ("1", "true", "yes")
+
+    @property
+    def log_index_interval(self) -> float:
+        """后台读取各容器新日志的间隔秒数"""
+        return float(os.getenv("DOCKER_MCP_LOG_INDEX_INTERVAL", "5"))
+
+    @property
+    def log_index_workers(self) -> int:
+        """并发读取日志的容器数"""
+        return int(os.getenv("DOCKER_MCP_LOG_INDEX_WORKERS", "4"))
+
+    @property
+    def log_retention_hours(self) -> float:
+        """日志索引保留的小时数"""
+        return float(os.getenv("DOCKER_MCP_LOG_RETENTION_HOURS", "24"))
+
+    @property
+    def log_index_max_mb(self) -> float:
+        """日志索引文件的大小上限（MB），超过时删除最旧的日志"""
+        return float(os.getenv("DOCKER_MCP_LOG_INDEX_MAX_MB", "512"))
+
+    @property
+    def history(self) -> bool:
+        """是否记录容器指标历史（需要启用后台统计采集）"""
+        return os.getenv("DOCKER_MCP_HISTORY", "1").lower() in ("1", "true", "yes")
+
+    @property
+    def history_interval(self) -> float:
+        """原始精度的记录间隔秒数"""
+        return float(os.getenv("DOCKER_MCP_HISTORY_INTERVAL", "10"))
+
+    @property
+    def history_raw_hours(self) -> float:
+        """原始精度保留的小时数"""
+        return float(os.getenv("DOCKER_MCP_HISTORY_RAW_HOURS", "24"))
+
+    @property
+    def history_minute_days(self) -> float:
+        """分钟精度保留的天数"""
+        return float(os.getenv("DOCKER_MCP_HISTORY_MINUTE_DAYS", "7"))
+
+    @property
+    def history_hour_days(self) -> float:
+        """小时精度保留的天数"""
+        return float(os.getenv("DOCKER_MCP_HISTORY_HOUR_DAYS", "90"))
+
+    @property
+    def top_workers(self) -> int:
+        """top_containers并发采样的线程数（也是采样连接池大小）"""
+        return int(os.getenv("DOCKER_MCP_TOP_WORKERS", "64"))
+
+    @property
+    def tool_limits(self) -> str:
+        """
+        各工具同时执行的调用数和最长排队秒数，格式 "get_container_logs=4:30,top_containers=1"（并发数:排队秒数）
+        
+        覆盖默认值（见 concurrency.DEFAULT_LIMITS）；并发数为0表示不限制，未列出的工具不限制。
+        """
+        return os.getenv("DOCKER_MCP_TOOL_LIMITS", "")
+
+    @property
+    def tool_max_wait(self) -> float:
+        """受限工具排队的默认最长秒数，超过后返回繁忙"""
+        return float(os.getenv("DOCKER_MCP_TOOL_MAX_WAIT", "30"))
+
+
+config = Config()
@@ -0,0 +1,271 @@
+"""容器指标历史模块 - 原始/分钟/小时三级精度，numpy内存映射列式文件存储"""
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import config
+from .stats import get_stats_collector
+
+# 记录的指标
+METRICS = (
+    "cpu_percent", "memory_usage", "memory_percent",
+    "net_rx_rate", "net_tx_rate", "block_read_rate", "block_write_rate",
+)
+
+# 精度，从细到粗；raw的点间隔为 DOCKER_MCP_HISTORY_INTERVAL
+RESOLUTIONS = ("raw", "1m", "1h")
+
+
+class Series:
+    """
+    一个容器一种精度的定长时间序列
+
+    时间列（float64）和数值列（float32，形状为 列数 x 容量）分别是一个内存映射文件，
+    写满后覆盖最旧的点。查询只读取需要的页，常驻内存与保存的时长无关。
+    """
+
+    def __init__(self, path: Path, capacity: int, columns: int):
+        self.capacity = capacity
+        time_path = path.with_suffix(".time")
+        values_path = path.with_suffix(".values")
+        exists = time_path.exists() and values_path.exists()
+        if exists and time_path.stat().st_size != capacity * 8:
+            # 保留时长配置变化后重新开始
+            exists = False
+        mode = "r+" if exists else "w+"
+        self.times = np.memmap(time_path, dtype=np.float64, mode=mode, shape=(capacity,))
+        self.values = np.memmap(values_path, dtype=np.float32, mode=mode, shape=(columns, capacity))
+        self._next = int(np.argmax(self.times)) + 1 if exists and self.times.any() else 0
+        self._next %= capacity
+
+    def latest(self) -> float:
+        """最新一个点的时间，没有数据时为0"""
+        return float(self.times[(self._next - 1) % self.capacity])
+
+    def append(self, timestamps: np.ndarray, rows: np.ndarray):
+        """追加若干个点（按时间顺序），rows形状为 列数 x 点数"""
+        for k in range(len(timestamps)):
+            self.times[self._next] = timestamps[k]
+            self.values[:, self._next] = rows[:, k]
+            self._next = (self._next + 1) % self.capacity
+
+    def select(self, since: float, until: float = None) -> Tuple[np.ndarray, np.ndarray]:
+        """时间在 [since, until) 内的点，按时间排序"""
+        mask = self.times >= max(since, 1.0)
+        if until is not None:
+            mask &= self.times < until
+        index = np.flatnonzero(mask)
+        index = index[np.argsort(self.times[index], kind="stable")]
+        return self.times[index], self.values[:, index]
+
+    def flush(self):
+        self.times.flush()
+        self.values.flush()
+
+
+def rollup(times: np.ndarray, values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    把已排序的点按period秒分桶聚合
+
+    values 为原始点（列数 = len(METRICS)）或下一级的汇总（min/avg/max 各 len(METRICS) 列）。
+
+    Returns:
+        (桶起始时间, 形状为 3*len(METRICS) x 桶数 的 min/avg/max)
+    """
+    n = len(METRICS)
+    if values.shape[0] == n:
+        low, mean, high = values, values, values
+    else:
+        low, mean, high = values[:n], values[n:2 * n], values[2 * n:]
+    buckets = np.floor(times / period) * period
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    counts = np.diff(np.r_[starts, len(times)])
+    result = np.vstack((
+        np.minimum.reduceat(low, starts, axis=1),
+        np.add.reduceat(mean, starts, axis=1) / counts,
+        np.maximum.reduceat(high, starts, axis=1),
+    ))
+    return buckets[starts], result
+
+
+def summarize(times: np.ndarray, values: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """
+    按指标计算 min/avg/max/p95，以及窗口首尾各十分之一的平均值（看趋势）
+
+    汇总精度的数据：min取各桶最小值、max取各桶最大值，avg和p95按各桶平均值计算。
+    """
+    n = len(METRICS)
+    if values.shape[0] == n:
+        low, mean, high = values, values, values
+    else:
+        low, mean, high = values[:n], values[n:2 * n], values[2 * n:]
+    mean = mean.astype(np.float64)
+    edge = max(1, len(times) // 10)
+    stats = {
+        "min": low.min(axis=1),
+        "avg": mean.mean(axis=1),
+        "max": high.max(axis=1),
+        "p95": np.percentile(mean, 95, axis=1),
+        "first": mean[:, :edge].mean(axis=1),
+        "last": mean[:, -edge:].mean(axis=1),
+    }
+    return {metric: {k: float(v[i]) for k, v in stats.items()} for i, metric in enumerate(METRICS)}
+
+
+class MetricsHistory:
+    """
+    容器指标历史
+
+    每隔 DOCKER_MCP_HISTORY_INTERVAL 秒从后台统计采集的缓冲区取各容器在这段时间
+    内的平均值写入原始精度；每过一分钟/一小时，把刚结束的时间段汇总为min/avg/max
+    写入下一级精度。各级按各自的保留时长覆盖最旧的数据。
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = Path(directory or config.cache_dir) / "history"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.interval = config.history_interval
+        self.retention = {
+            "raw": config.history_raw_hours * 3600,
+            "1m": config.history_minute_days * 86400,
+            "1h": config.history_hour_days * 86400,
+        }
+        self._series: Dict[str, Dict[str, Series]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._stopping = False
+
+    def _open(self, container_id: str, create: bool = False) -> Optional[Dict[str, Series]]:
+        with self._lock:
+            series = self._series.get(container_id)
+            if series is not None:
+                return series
+            path = self.directory / container_id
+            if not path.exists() and not create:
+                return None
+            path.mkdir(exist_ok=True)
+            n = len(METRICS)
+            series = self._series[container_id] = {
+                "raw": Series(path / "raw", int(self.retention["raw"] // self.interval), n),
+                "1m": Series(path / "1m", int(self.retention["1m"] // 60), 3 * n),
+                "1h": Series(path / "1h", int(self.retention["1h"] // 3600), 3 * n),
+            }
+            return series
+
+    # ============ 查询 ============
+
+    def resolution_for(self, window: float) -> str:
+        """能覆盖window秒的最细精度"""
+        for resolution in RESOLUTIONS:
+            if window <= self.retention[resolution]:
+                return resolution
+        return "1h"
+
+    def query(
+        self,
+        container_id: str,
+        window: float,
+        resolution: str = None,
+        until: float = None
+    ) -> Optional[Tuple[str, int, Dict[str, Dict[str, float]]]]:
+        """
+        容器最近window秒（截至until）的指标统计
+
+        Returns:
+            (使用的精度, 点数, 各指标的统计)；没有数据时返回None
+        """
+        series = self._open(container_id)
+        if series is None:
+            return None
+        resolution = resolution or self.resolution_for(window)
+        until = until or time.time()
+        times, values = series[resolution].select(until - window, until)
+        if not len(times):
+            return None
+        return resolution, len(times), summarize(times, values)
+
+    # ============ 记录 ============
+
+    def start(self):
+        """启动后台记录线程"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="docker-history", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    def _run(self):
+        collector = get_stats_collector()
+        pruned = time.time()
+        while not self._stopping:
+            try:
+                self.record(collector)
+                if time.time() - pruned > 3600:
+                    self.prune(collector.containers())
+                    pruned = time.time()
+            except Exception as e:
+                print(f"指标历史记录失败: {e}")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def record(self, collector) -> int:
+        """记录一个原始点并补齐已结束的分钟/小时汇总，返回记录的容器数"""
+        now = time.time()
+        recorded = 0
+        for container_id in collector.containers():
+            stats = collector.get(container_id, self.interval)
+            if not stats or stats["time"] < now - 2 * self.interval:
+                continue
+            series = self._open(container_id, create=True)
+            series["raw"].append(np.array([stats["time"]]), np.array([[stats[m]] for m in METRICS]))
+            self._rollup(series["raw"], series["1m"], 60, now)
+            self._rollup(series["1m"], series["1h"], 3600, now)
+            for s in series.values():
+                s.flush()
+            recorded += 1
+        return recorded
+
+    @staticmethod
+    def _rollup(source: Series, target: Series, period: int, now: float):
+        """把source中已结束、尚未汇总的时间段汇总写入target"""
+        current = np.floor(now / period) * period
+        start = target.latest() + period if target.latest() else 0.0
+        if start >= current:
+            return
+        times, values = source.select(start, current)
+        if len(times):
+            target.append(*rollup(times, values, period))
+
+    def prune(self, keep: List[str]):
+        """删除不在keep中、且超过小时精度保留时长没有更新的容器目录"""
+        cutoff = time.time() - self.retention["1h"]
+        for path in self.directory.iterdir():
+            stamp = path / "raw.time"
+            if path.name in keep or (stamp.exists() and stamp.stat().st_mtime > cutoff):
+                continue
+            with self._lock:
+                self._series.pop(path.name, None)
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# 全局历史
+_history: Optional[MetricsHistory] = None
+_history_guard = threading.Lock()
+
+
+def get_metrics_history() -> MetricsHistory:
+    """获取全局MetricsHistory实例，首次调用时开始记录"""
+    global _history
+    with _history_guard:
+        if _history is None:
+            _history = MetricsHistory()
+            _history.start()
+        return _history
@@ -0,0 +1,82 @@
+"""多主机模块 - 并发访问多个Docker守护进程，每个主机单独超时"""
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .client import get_async_docker
+from .config import config
+
+# 未配置 DOCKER_MCP_HOSTS 时唯一主机的名称
+DEFAULT_HOST = "local"
+
+
+def get_hosts() -> Dict[str, Optional[str]]:
+    """主机名称 -> 守护进程地址（None 表示按环境变量连接）"""
+    return config.hosts or {DEFAULT_HOST: None}
+
+
+def is_multi_host() -> bool:
+    return len(get_hosts()) > 1
+
+
+def default_host() -> Optional[str]:
+    """
+    指向默认守护进程（DOCKER_MCP_HOST，未设置时按环境变量）的主机名
+
+    容器清单和后台统计只覆盖默认守护进程；DOCKER_MCP_HOSTS 中没有主机指向它时返回None。
+    """
+    default = config.docker_host or None
+    for name, url in get_hosts().items():
+        # None 表示按默认配置连接
+        if (url or default) == default:
+            return name
+    return None
+
+
+class HostError(Exception):
+    """一个主机查询失败或超时，error为原始异常（超时时为None）"""
+
+    def __init__(self, host: str, message: str, error: Exception = None):
+        super().__init__(message)
+        self.host = host
+        self.error = error
+
+
+async def fan_out(
+    func: Callable[..., Any],
+    *args,
+    host: str = None,
+    timeout: float = None
+) -> List[Tuple[str, Any]]:
+    """
+    在每个主机上并发执行 func(client, *args)
+
+    每个主机使用自己的连接池和线程池，单独计时；超时或出错的主机结果为HostError，
+    不影响其他主机。
+
+    Args:
+        host: 只在该主机上执行（可选）
+        timeout: 每个主机的超时秒数（默认多主机时为 DOCKER_MCP_HOST_TIMEOUT，单主机不限时）
+
+    Returns:
+        [(主机名, 结果或HostError)]，按配置顺序
+
+    Raises:
+        ValueError: host不在配置中
+    """
+    hosts = get_hosts()
+    if host is not None:
+        if host not in hosts:
+            raise ValueError(f"未配置的主机: {host}（可选: {', '.join(hosts)}）")
+        hosts = {host: hosts[host]}
+    if timeout is None and is_multi_host():
+        timeout = config.host_timeout
+
+    async def run(name: str, base_url: Optional[str]) -> Tuple[str, Any]:
+        try:
+            return name, await asyncio.wait_for(get_async_docker(base_url).run(func, *args), timeout)
+        except asyncio.TimeoutError:
+            return name, HostError(name, f"{timeout:g}秒内未响应")
+        except Exception as e:
+            return name, HostError(name, str(e), e)
+
+    return list(await asyncio.gather(*(run(name, url) for name, url in hosts.items())))
@@ -0,0 +1,50 @@
+"""镜像名称缓存 - 镜像ID到标签的共享备忘"""
+import threading
+from typing import Dict, List
+
+import docker
+from docker.errors import NotFound
+
+# 镜像ID是内容哈希，ID不变时标签很少变化；只在容器列表给不出镜像名时查询
+_tags: Dict[str, List[str]] = {}
+_lock = threading.Lock()
+
+# 备忘的镜像数上限，超过后整体清空重新积累
+MAX_IMAGES = 4096
+
+
+def image_tags(client: docker.DockerClient, image_id: str) -> List[str]:
+    """镜像的标签列表，同一镜像ID只向守护进程查询一次"""
+    tags = _tags.get(image_id)
+    if tags is not None:
+        return tags
+    try:
+        tags = client.api.inspect_image(image_id).get("RepoTags") or []
+    except NotFound:
+        tags = []
+    with _lock:
+        if len(_tags) >= MAX_IMAGES:
+            _tags.clear()
+        _tags[image_id] = tags
+    return tags
+
+
+def image_name(client: docker.DockerClient, summary: Dict) -> str:
+    """
+    容器列表条目的镜像名
+
+    /containers/json 的 Image 字段通常就是创建容器时的镜像名；镜像被重新打标签后
+    该字段变为镜像ID，此时查询（并备忘）镜像的标签。
+    """
+    image = summary.get("Image") or ""
+    if image and not image.startswith("sha256:"):
+        return image
+    image_id = summary.get("ImageID") or image
+    tags = image_tags(client, image_id) if image_id else []
+    return tags[0] if tags else image_id.replace("sha256:", "")[:12]
+
+
+def clear_image_tags():
+    """清空镜像标签备忘（镜像重新打标签后调用）"""
+    with _lock:
+        _tags.clear()
@@ -0,0 +1,201 @@
+"""容器清单缓存 - 全量同步一次，之后由Docker事件流保持最新"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .client import DockerConnection
+from .config import config
+
+# 会改变容器清单内容的事件；health_status 事件的 Action 形如 "health_status: healthy"
+REFRESH_ACTIONS = (
+    "create", "start", "restart", "stop", "die", "kill", "pause", "unpause",
+    "rename", "update", "oom", "health_status",
+)
+REMOVE_ACTIONS = ("destroy",)
+
+
+class ContainerInventory:
+    """
+    容器清单（所有容器的 /containers/json 条目）
+
+    首次使用时全量列出一次，之后订阅 container 类型的事件，只重新获取发生变化的
+    容器。名称/ID解析和列表查询都只读内存中的字典，不访问守护进程。事件流中断时
+    清单标记为过期，重连后从中断前的时间点订阅并做一次全量同步。
+    """
+
+    def __init__(self, base_url: str = None):
+        self._connection = DockerConnection(base_url, pool_size=2, timeout=config.timeout)
+        self._containers: Dict[str, Dict] = {}
+        self._names: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._synced = threading.Event()
+        self._connected = False
+        self._stream = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.synced_at = 0.0
+        self.last_event_at = 0.0
+        self.resyncs = 0
+
+    # ============ 查询 ============
+
+    @property
+    def stale(self) -> bool:
+        """事件流未连接时清单可能已过期"""
+        return not (self._connected and self._synced.is_set())
+
+    def age(self) -> float:
+        """清单可能落后的秒数：事件流连接中为0，否则为距最后一次确认同步的时间"""
+        if not self.stale:
+            return 0.0
+        known = max(self.synced_at, self.last_event_at)
+        return time.time() - known if known else float("inf")
+
+    def wait_synced(self, timeout: float) -> bool:
+        """等待首次全量同步完成并订阅上事件流"""
+        return self._synced.wait(timeout)
+
+    def resolve(self, ref: str) -> Optional[Dict]:
+        """按完整ID、名称或ID前缀查找容器，返回 /containers/json 条目"""
+        ref = ref.lstrip("/")
+        container = self._containers.get(ref)
+        if container is not None:
+            return container
+        container_id = self._names.get(ref)
+        if container_id is not None:
+            return self._containers.get(container_id)
+        matches = [c for cid, c in list(self._containers.items()) if cid.startswith(ref)]
+        return matches[0] if len(matches) == 1 else None
+
+    def list(
+        self,
+        all_containers: bool = False,
+        labels: List[str] = None,
+        status: str = None,
+        name: str = None
+    ) -> List[Dict]:
+        """
+        按与守护进程相同的语义过滤容器，按创建时间从新到旧排序
+
+        Args:
+            all_containers: 是否包含未运行的容器
+            labels: 标签条件，"key" 或 "key=value"
+            status: 容器状态
+            name: 名称包含的字符串
+        """
+        containers = list(self._containers.values())
+        if status:
+            containers = [c for c in containers if c.get("State") == status]
+        elif not all_containers:
+            containers = [c for c in containers if c.get("State") == "running"]
+        for label in labels or ():
+            key, has_value, value = label.partition("=")
+            containers = [
+                c for c in containers
+                if key in (c.get("Labels") or {}) and (not has_value or c["Labels"][key] == value)
+            ]
+        if name:
+            containers = [c for c in containers if any(name in n for n in c.get("Names") or ())]
+        containers.sort(key=lambda c: c.get("Created", 0), reverse=True)
+        return containers
+
+    # ============ 同步 ============
+
+    def start(self):
+        """启动后台同步线程"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="docker-inventory", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        stream = self._stream
+        if stream is not None:
+            stream.close()
+
+    def _run(self):
+        delay = 1.0
+        while not self._stopping:
+            since = int(time.time()) - 1
+            try:
+                self._resync()
+                self._stream = self._connection.call(
+                    lambda client: client.api.events(since=since, filters={"type": "container"}, decode=True)
+                )
+                self._connected = True
+                self._synced.set()
+                delay = 1.0
+                for event in self._stream:
+                    self._apply(event)
+            except Exception as e:
+                if not self._stopping:
+                    print(f"容器事件流中断: {e}")
+            finally:
+                self._connected = False
+                self._stream = None
+            if self._stopping:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _resync(self):
+        """全量列出所有容器，替换清单"""
+        containers = self._connection.call(lambda client: client.api.containers(all=True))
+        with self._lock:
+            self._containers = {c["Id"]: c for c in containers}
+            self._names = {n.lstrip("/"): c["Id"] for c in containers for n in c.get("Names") or ()}
+        self.synced_at = time.time()
+        self.resyncs += 1
+
+    def _apply(self, event: Dict):
+        action = event.get("Action") or event.get("status") or ""
+        container_id = event.get("id") or event.get("Actor", {}).get("ID")
+        if not container_id:
+            return
+        self.last_event_at = time.time()
+        if action in REMOVE_ACTIONS:
+            self._remove(container_id)
+        elif action.split(":")[0] in REFRESH_ACTIONS:
+            self._refresh(container_id)
+
+    def _refresh(self, container_id: str):
+        """重新获取一个容器的清单条目"""
+        found = self._connection.call(
+            lambda client: client.api.containers(all=True, filters={"id": container_id})
+        )
+        if not found:
+            self._remove(container_id)
+            return
+        container = found[0]
+        with self._lock:
+            self._drop_names(container_id)
+            self._containers[container_id] = container
+            for n in container.get("Names") or ():
+                self._names[n.lstrip("/")] = container_id
+
+    def _remove(self, container_id: str):
+        with self._lock:
+            self._drop_names(container_id)
+            self._containers.pop(container_id, None)
+
+    def _drop_names(self, container_id: str):
+        old = self._containers.get(container_id)
+        for n in (old or {}).get("Names") or ():
+            if self._names.get(n.lstrip("/")) == container_id:
+                del self._names[n.lstrip("/")]
+
+
+# 全局清单
+_inventory: Optional[ContainerInventory] = None
+_inventory_guard = threading.Lock()
+
+
+def get_inventory() -> ContainerInventory:
+    """获取全局ContainerInventory实例，首次调用时开始同步"""
+    global _inventory
+    with _inventory_guard:
+        if _inventory is None:
+            _inventory = ContainerInventory(config.docker_host or None)
+            _inventory.start()
+        return _inventory
@@ -0,0 +1,305 @@
+"""容器日志索引模块 - 后台增量采集所有容器日志，写入SQLite FTS5全文索引"""
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .client import DockerConnection
+from .config import config
+from .logs import iter_lines, parse_timestamp
+
+# 每个事务写入的行数
+BATCH_SIZE = 2000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS containers (
+    id INTEGER PRIMARY KEY,
+    container_id TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    since REAL NOT NULL DEFAULT 0,
+    since_lines INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    container INTEGER NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_ts ON entries (ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    message, content='entries', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, message) VALUES (new.id, new.message);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, message) VALUES ('delete', old.id, old.message);
+END;
+"""
+
+
+class LogIndex:
+    """
+    容器日志全文索引
+
+    后台线程每隔 DOCKER_MCP_LOG_INDEX_INTERVAL 秒读取一次所有运行中容器的新日志：
+    每个容器记录已索引的最后一行的时间戳和该时间戳上已索引的行数，下次从该时间点
+    读取并跳过这些行，不会重复索引，也不会丢掉之后写入的同一时间戳的行。首次采集回溯保留期内的日志。超过保留期或索引文件超过大小上限时
+    删除最旧的日志。
+    """
+
+    def __init__(self, directory: str = None, base_url: str = None):
+        """
+        Args:
+            directory: 索引所在目录（默认 DOCKER_MCP_CACHE_DIR）
+            base_url: 守护进程地址（默认读取环境变量）
+        """
+        self.path = Path(directory or config.cache_dir) / "logs.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age = config.log_retention_hours * 3600
+        self.max_bytes = config.log_index_max_mb * 1024 * 1024
+        self._connection = DockerConnection(base_url, pool_size=config.log_index_workers)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
+        self._writer.executescript(_SCHEMA)
+        # 容器ID -> (行号, 检查点时间戳, 该时间戳上已索引的行数)
+        self._checkpoints: Dict[str, Tuple[int, float, int]] = {
+            container_id: (rowid, since, since_lines)
+            for rowid, container_id, since, since_lines in self._writer.execute(
+                "SELECT id, container_id, since, since_lines FROM containers"
+            )
+        }
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._first_pass = threading.Event()
+        self._stopping = False
+        self.indexed_at = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        # 仅对新建的数据库生效，删除旧日志后可以归还空间
+        db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _reader(self) -> sqlite3.Connection:
+        """每个查询线程一个只读连接，WAL模式下不阻塞写入"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        return db
+
+    # ============ 查询 ============
+
+    def wait_ready(self, timeout: float) -> bool:
+        """等待第一轮采集完成"""
+        return self._first_pass.wait(timeout)
+
+    def search(
+        self,
+        query: str,
+        since: float = None,
+        until: float = None,
+        container_ids: List[str] = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        """
+        全文搜索日志，按时间从新到旧返回
+
+        Args:
+            query: FTS5查询，如 "timeout"、"connection refused"（短语）、"error AND db"；
+                   语法无效时按短语搜索
+            since, until: 时间范围（Unix时间戳）
+            container_ids: 只搜索这些容器（完整ID）
+            limit: 返回条数
+
+        Returns:
+            [{time, container_id, name, message}]
+        """
+        sql = (
+            "SELECT e.ts, c.container_id, c.name, e.message FROM entries_fts f "
+            "JOIN entries e ON e.id = f.rowid JOIN containers c ON c.id = e.container "
+            "WHERE entries_fts MATCH ?"
+        )
+        params: list = []
+        if since:
+            sql += " AND e.ts >= ?"
+            params.append(since)
+        if until:
+            sql += " AND e.ts <= ?"
+            params.append(until)
+        if container_ids is not None:
+            sql += f" AND c.container_id IN ({','.join('?' * len(container_ids))})"
+            params.extend(container_ids)
+        sql += " ORDER BY e.ts DESC LIMIT ?"
+        params.append(limit)
+
+        db = self._reader()
+        try:
+            rows = db.execute(sql, [query] + params).fetchall()
+        except sqlite3.OperationalError:
+            phrase = '"' + query.replace('"', '""') + '"'
+            rows = db.execute(sql, [phrase] + params).fetchall()
+        return [{"time": ts, "container_id": cid, "name": name, "message": message} for ts, cid, name, message in rows]
+
+    def stats(self) -> Dict:
+        """索引的行数、容器数、文件大小和最后采集时间"""
+        db = self._reader()
+        lines = db.execute("SELECT count(*) FROM entries").fetchone()[0]
+        return {
+            "lines": lines,
+            "containers": len(self._checkpoints),
+            "bytes": self._size(db),
+            "indexed_at": self.indexed_at,
+        }
+
+    @staticmethod
+    def _size(db: sqlite3.Connection) -> int:
+        pages = db.execute("PRAGMA page_count").fetchone()[0] - db.execute("PRAGMA freelist_count").fetchone()[0]
+        return pages * db.execute("PRAGMA page_size").fetchone()[0]
+
+    # ============ 采集 ============
+
+    def start(self):
+        """启动后台采集线程"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="docker-log-index", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=config.log_index_workers, thread_name_prefix="docker-log-read") as pool:
+            while not self._stopping:
+                try:
+                    self.ingest(pool)
+                    self.enforce_retention()
+                except Exception as e:
+                    print(f"日志索引采集失败: {e}")
+                self._first_pass.set()
+                self._wakeup.wait(config.log_index_interval)
+                self._wakeup.clear()
+
+    def ingest(self, pool: ThreadPoolExecutor) -> int:
+        """读取所有运行中容器自检查点以来的日志，返回新索引的行数"""
+        running = self._connection.call(lambda client: client.api.containers())
+        now = time.time()
+        futures = []
+        for c in running:
+            container_id = c["Id"]
+            names = c.get("Names") or []
+            name = names[0].lstrip("/") if names else container_id[:12]
+            futures.append((container_id, pool.submit(self._ingest_container, container_id, name, now)))
+
+        total = 0
+        for container_id, future in futures:
+            try:
+                total += future.result()
+            except Exception as e:
+                print(f"容器 {container_id[:12]} 日志采集失败: {e}")
+        self.indexed_at = now
+        return total
+
+    def _ingest_container(self, container_id: str, name: str, until: float) -> int:
+        """流式读取一个容器 (检查点, until] 之间的日志，每BATCH_SIZE行写入一次"""
+        _, since, skip = self._checkpoints.get(container_id, (None, 0.0, 0))
+        if since < until - self.max_age:
+            since, skip = until - self.max_age, 0
+        stream = self._connection.call(
+            lambda client: client.api.logs(container_id, stream=True, timestamps=True, since=since, until=until)
+        )
+        batch: List[Tuple[float, str]] = []
+        total = 0
+        try:
+            for raw in iter_lines(stream):
+                stamp, _, message = raw.partition(b" ")
+                try:
+                    ts = parse_timestamp(stamp.decode("ascii"))
+                except ValueError:
+                    continue
+                # docker的since包含等于该时间的行，其中前skip行上一轮已经索引
+                if ts < since:
+                    continue
+                if ts == since and skip > 0:
+                    skip -= 1
+                    continue
+                batch.append((ts, message.decode("utf-8", errors="replace")))
+                if len(batch) >= BATCH_SIZE:
+                    total += self._write(container_id, name, batch)
+                    batch = []
+        finally:
+            stream.close()
+        return total + self._write(container_id, name, batch)
+
+    def _write(self, container_id: str, name: str, entries: List[Tuple[float, str]]) -> int:
+        """写入一批日志并推进检查点（同一事务）"""
+        with self._write_lock:
+            db = self._writer
+            rowid, since, since_lines = self._checkpoints.get(container_id, (None, 0.0, 0))
+            db.execute("BEGIN")
+            try:
+                if rowid is None:
+                    rowid = db.execute(
+                        "INSERT INTO containers (container_id, name) VALUES (?, ?)", (container_id, name)
+                    ).lastrowid
+                db.executemany(
+                    "INSERT INTO entries (ts, container, message) VALUES (?, ?, ?)",
+                    [(ts, rowid, message) for ts, message in entries]
+                )
+                if entries and entries[-1][0] >= since:
+                    last = entries[-1][0]
+                    if last > since:
+                        since, since_lines = last, 0
+                    since_lines += sum(1 for ts, _ in entries if ts == last)
+                db.execute(
+                    "UPDATE containers SET name = ?, since = ?, since_lines = ? WHERE id = ?",
+                    (name, since, since_lines, rowid)
+                )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            self._checkpoints[container_id] = (rowid, since, since_lines)
+        return len(entries)
+
+    def enforce_retention(self):
+        """删除超过保留期的日志；索引仍超过大小上限时，再按时间删除最旧的日志"""
+        with self._write_lock:
+            self._enforce_retention(self._writer)
+
+    def _enforce_retention(self, db: sqlite3.Connection):
+        db.execute("DELETE FROM entries WHERE ts < ?", (time.time() - self.max_age,))
+        size = self._size(db)
+        if size > self.max_bytes:
+            # 按超出比例删除，多删10%留出余量；删除后合并FTS段才能真正释放空间
+            count = db.execute("SELECT count(*) FROM entries").fetchone()[0]
+            excess = (size - self.max_bytes * 0.9) / size
+            db.execute(
+                "DELETE FROM entries WHERE id IN (SELECT id FROM entries ORDER BY ts LIMIT ?)",
+                (max(1, int(count * excess)),)
+            )
+            db.execute("INSERT INTO entries_fts (entries_fts) VALUES ('optimize')")
+        # execute只执行一步（释放一页），executescript才会执行到底
+        db.executescript("PRAGMA incremental_vacuum;")
+
+
+# 全局索引
+_index: Optional[LogIndex] = None
+_index_guard = threading.Lock()
+
+
+def get_log_index() -> LogIndex:
+    """获取全局LogIndex实例，首次调用时开始采集"""
+    global _index
+    with _index_guard:
+        if _index is None:
+            _index = LogIndex(base_url=config.docker_host or None)
+            _index.start()
+        return _index
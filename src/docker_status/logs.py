@@ -0,0 +1,178 @@
+"""容器日志模块 - 流式读取，按行过滤，内存占用与日志总量无关"""
+import re
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, Iterator, List, Pattern, Tuple
+
+import docker
+
+# 单行超过该字节数时截断，保证缓冲区大小有上限
+MAX_LINE_BYTES = 16 * 1024
+
+# 相对时间单位 -> 秒
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_RELATIVE = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+
+# ISO/RFC3339时间的秒小数部分和时区
+_FRACTION = re.compile(r"^(.*T\d{2}:\d{2}:\d{2})(?:[.,](\d+))?(Z|z|[+-]\d{2}:?\d{2})?$")
+
+
+def _fromisoformat(value: str) -> datetime:
+    """
+    datetime.fromisoformat 的宽松版本
+
+    Python 3.10 只接受3或6位秒小数且不认识 "Z"，Docker的时间戳是纳秒精度，
+    这里把小数部分补齐或截断为6位。
+    """
+    match = _FRACTION.match(value)
+    if match:
+        base, fraction, zone = match.groups()
+        value = base
+        if fraction:
+            value += "." + fraction[:6].ljust(6, "0")
+        if zone:
+            value += "+00:00" if zone in ("Z", "z") else zone
+    return datetime.fromisoformat(value)
+
+
+def parse_time(value: str, now: float = None) -> float:
+    """
+    解析日志时间参数
+
+    支持Unix时间戳（"1700000000"）、ISO时间（"2024-01-01T08:00:00"，无时区按本地时间）
+    和相对时间（"30s"、"10m"、"2h"、"1d"，表示多久以前）。
+
+    Raises:
+        ValueError: 无法解析
+    """
+    value = value.strip()
+    match = _RELATIVE.match(value)
+    if match:
+        return (now or time.time()) - float(match.group(1)) * _UNITS[match.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    return _fromisoformat(value).timestamp()
+
+
+def parse_timestamp(value: str) -> float:
+    """解析Docker日志的RFC3339时间戳（如 2024-01-01T00:00:00.123456789Z），精确到微秒"""
+    return _fromisoformat(value).timestamp()
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    把日志数据块拼接成行（不含换行符）
+
+    只缓存当前不完整的一行；超过 MAX_LINE_BYTES 的行截断输出，其余部分丢弃到下一个换行。
+    """
+    partial = b""
+    skipping = False
+    for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                if not skipping:
+                    partial += chunk[start:]
+                    if len(partial) > MAX_LINE_BYTES:
+                        yield partial[:MAX_LINE_BYTES]
+                        partial = b""
+                        skipping = True
+                break
+            if skipping:
+                skipping = False
+            else:
+                yield (partial + chunk[start:end])[:MAX_LINE_BYTES]
+            partial = b""
+            start = end + 1
+    if partial and not skipping:
+        yield partial
+
+
+class LogResult:
+    """一次日志读取的结果"""
+
+    def __init__(self, lines: List[str], scanned: int, truncated: bool):
+        self.lines = lines
+        self.scanned = scanned      # 从守护进程读取的行数
+        self.truncated = truncated  # 是否因字节上限截断
+
+
+def read_logs(
+    client: docker.DockerClient,
+    container_id: str,
+    lines: int,
+    tail: bool = True,
+    since: float = None,
+    until: float = None,
+    pattern: Pattern = None,
+    stdout: bool = True,
+    stderr: bool = True,
+    max_bytes: int = 65536,
+    timestamps: bool = False
+) -> LogResult:
+    """
+    流式读取容器日志
+
+    tail=True 取最后lines行：不过滤时由守护进程只返回最后lines行；指定pattern时
+    扫描整个时间窗口，只保留最近lines个匹配行。tail=False 从头读取，凑够lines行
+    或达到字节上限后立即关闭连接。无论哪种方式，内存中最多保存lines行、max_bytes字节。
+
+    Args:
+        client: Docker客户端
+        container_id: 完整容器ID
+        lines: 返回的行数
+        tail: 是否取最后的行（否则从头部开始）
+        since, until: 时间窗口（Unix时间戳）
+        pattern: 只保留匹配的行
+        stdout, stderr: 读取哪些输出流
+        max_bytes: 返回内容的字节上限
+        timestamps: 是否在每行前加时间戳
+    """
+    kwargs: Dict = {"stdout": stdout, "stderr": stderr, "timestamps": timestamps, "stream": True}
+    if since:
+        kwargs["since"] = since
+    if until:
+        kwargs["until"] = until
+    if tail and pattern is None:
+        kwargs["tail"] = lines
+
+    stream = client.api.logs(container_id, **kwargs)
+    kept: Deque[Tuple[str, int]] = deque()
+    size = 0
+    scanned = 0
+    truncated = False
+    try:
+        for raw in iter_lines(stream):
+            scanned += 1
+            line = raw.decode("utf-8", errors="replace")
+            if pattern is not None and not pattern.search(line):
+                continue
+            kept.append((line, len(raw) + 1))
+            size += len(raw) + 1
+            if tail:
+                # 只保留最近的lines行和max_bytes字节
+                if len(kept) > lines:
+                    size -= kept.popleft()[1]
+                while size > max_bytes and len(kept) > 1:
+                    size -= kept.popleft()[1]
+                    truncated = True
+            elif len(kept) >= lines:
+                break
+            elif size >= max_bytes:
+                truncated = True
+                break
+    finally:
+        stream.close()
+
+    if size > max_bytes:
+        truncated = True
+        if len(kept) > 1:
+            kept.pop()
+        else:
+            # 单行就超过上限时截断这一行
+            kept[0] = (kept[0][0][:max_bytes], max_bytes)
+    return LogResult([line for line, _ in kept], scanned, truncated)
@@ -0,0 +1,209 @@
+"""批量重启模块 - 分波并发重启，通过事件流等待容器就绪"""
+import fnmatch
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .client import DockerConnection
+
+# compose 给容器打的项目标签
+COMPOSE_PROJECT_LABEL = "com.docker.compose.project"
+
+
+def select_targets(
+    containers: List[Dict],
+    label: str = None,
+    name: str = None,
+    project: str = None
+) -> List[Dict]:
+    """
+    从 /containers/json 条目中选出要重启的容器，多个条件同时满足
+
+    Args:
+        label: 标签条件，"key" 或 "key=value"，多个用逗号分隔
+        name: 名称通配符，如 "web-*"
+        project: compose项目名
+    """
+    conditions = [item.strip() for item in label.split(",") if item.strip()] if label else []
+    if project:
+        conditions.append(f"{COMPOSE_PROJECT_LABEL}={project}")
+    selected = []
+    for c in containers:
+        labels = c.get("Labels") or {}
+        matched = True
+        for condition in conditions:
+            key, has_value, value = condition.partition("=")
+            if key not in labels or (has_value and labels[key] != value):
+                matched = False
+                break
+        names = [n.lstrip("/") for n in c.get("Names") or ()]
+        if matched and name and not any(fnmatch.fnmatchcase(n, name) for n in names):
+            matched = False
+        if matched:
+            selected.append(c)
+    selected.sort(key=lambda c: (c.get("Names") or [c["Id"]])[0])
+    return selected
+
+
+def has_healthcheck(inspect: Dict) -> bool:
+    """
+    容器是否配置了健康检查
+
+    Healthcheck 缺失、Test 为空或为 ["NONE"]（显式禁用镜像的健康检查）时视为没有，
+    这些容器不会发出 health_status 事件，只等待启动。
+    """
+    test = (inspect["Config"].get("Healthcheck") or {}).get("Test") or []
+    return bool(test) and test[0] != "NONE"
+
+
+class ReadinessWatcher:
+    """
+    订阅目标容器的事件，记录每个容器重启后何时启动、何时通过健康检查
+
+    arm() 之后收到的 start 事件视为重启完成；有健康检查的容器还要等到
+    health_status: healthy（或 unhealthy 时判定失败）。
+    """
+
+    def __init__(self, connection: DockerConnection, container_ids: List[str]):
+        self._connection = connection
+        self._ids = container_ids
+        self._cond = threading.Condition()
+        self._armed: Dict[str, bool] = {}
+        self._started: Dict[str, float] = {}
+        self._health: Dict[str, tuple] = {}
+        self._stream = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        self._stream = self._connection.call(
+            lambda client: client.api.events(filters={"type": "container", "container": self._ids}, decode=True)
+        )
+        self._thread = threading.Thread(target=self._run, name="docker-restart-events", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stream.close()
+
+    def _run(self):
+        try:
+            for event in self._stream:
+                action = event.get("Action") or event.get("status") or ""
+                container_id = event.get("id") or event.get("Actor", {}).get("ID")
+                now = time.monotonic()
+                with self._cond:
+                    if not self._armed.get(container_id):
+                        continue
+                    if action == "start":
+                        self._started[container_id] = now
+                    elif action.startswith("health_status") and container_id in self._started:
+                        self._health[container_id] = (action.split(":", 1)[-1].strip(), now)
+                    else:
+                        continue
+                    self._cond.notify_all()
+        except Exception:
+            pass
+        finally:
+            with self._cond:
+                self._cond.notify_all()
+
+    def arm(self, container_id: str):
+        """开始关注容器（在发出重启请求之前调用）"""
+        with self._cond:
+            self._armed[container_id] = True
+            self._started.pop(container_id, None)
+            self._health.pop(container_id, None)
+
+    def wait(self, container_id: str, healthcheck: bool, deadline: float) -> tuple:
+        """
+        等待容器就绪
+
+        Returns:
+            (状态, 就绪时间)；状态为 running/healthy/unhealthy/timeout
+        """
+        with self._cond:
+            while True:
+                if healthcheck:
+                    health = self._health.get(container_id)
+                    if health and health[0] in ("healthy", "unhealthy"):
+                        return health
+                elif container_id in self._started:
+                    return "running", self._started[container_id]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return "timeout", time.monotonic()
+                self._cond.wait(remaining)
+
+
+def rolling_restart(
+    connection: DockerConnection,
+    targets: List[Dict],
+    wave_size: int = 0,
+    stop_timeout: int = 10,
+    health_timeout: float = 60
+) -> Dict:
+    """
+    分波重启容器
+
+    每一波内并发重启，等这一波全部运行（有健康检查的容器为healthy）后再开始下一波；
+    有容器失败时停止后续波次。
+
+    Args:
+        connection: Docker连接
+        targets: 要重启的容器（/containers/json 条目）
+        wave_size: 每波的容器数，0表示全部一次重启
+        stop_timeout: 停止容器的等待秒数
+        health_timeout: 每波等待就绪的秒数
+
+    Returns:
+        {"waves": 波数, "elapsed": 总耗时, "results": [{id, name, wave, restart, ready, status, error}]}
+    """
+    wave_size = wave_size if wave_size > 0 else len(targets)
+    waves = [targets[i:i + wave_size] for i in range(0, len(targets), wave_size)]
+    ids = [c["Id"] for c in targets]
+    results = {
+        c["Id"]: {
+            "id": c["Id"], "name": (c.get("Names") or [c["Id"][:12]])[0].lstrip("/"),
+            "wave": 0, "restart": None, "ready": None, "status": "skipped", "error": None,
+        }
+        for c in targets
+    }
+    begin = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=min(wave_size, 64) or 1, thread_name_prefix="docker-restart") as pool:
+        # 是否配置了健康检查决定等待的事件
+        healthchecks = dict(zip(ids, pool.map(
+            lambda cid: has_healthcheck(connection.call(lambda client: client.api.inspect_container(cid))),
+            ids
+        )))
+
+        with ReadinessWatcher(connection, ids) as watcher:
+            for number, wave in enumerate(waves, 1):
+                def restart(container: Dict):
+                    container_id = container["Id"]
+                    result = results[container_id]
+                    result["wave"] = number
+                    watcher.arm(container_id)
+                    started = time.monotonic()
+                    try:
+                        connection.call(lambda client: client.api.restart(container_id, timeout=stop_timeout))
+                    except Exception as e:
+                        result["status"], result["error"] = "error", str(e)
+                        return
+                    result["restart"] = time.monotonic() - started
+                    status, ready_at = watcher.wait(
+                        container_id, healthchecks[container_id], started + stop_timeout + health_timeout
+                    )
+                    result["status"] = status
+                    result["ready"] = ready_at - started
+
+                list(pool.map(restart, wave))
+                if any(results[c["Id"]]["status"] not in ("running", "healthy") for c in wave):
+                    break
+
+    return {
+        "waves": len(waves),
+        "elapsed": time.monotonic() - begin,
+        "results": [results[cid] for cid in ids],
+    }
@@ -1,100 +1,439 @@
 """Docker容器监控工具 - FastMCP 2.x"""
+import re
+import sys
+import time
 import docker
 from docker.errors import DockerException, NotFound
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Pattern, Tuple
 from fastmcp import FastMCP
 
+from .client import get_docker, get_async_docker, close_all, CONNECTION_ERRORS
+from .config import config
+from .hosts import HostError, default_host, fan_out, is_multi_host
+from .concurrency import limited
+from .stats import get_stats_collector, parse_stats, FIELDS
+from .images import image_name
+from .logs import parse_time, read_logs
+from .log_index import get_log_index
+from .restart import rolling_restart, select_targets
+from .inventory import ContainerInventory, get_inventory
+
 # 创建Docker监控的FastMCP实例
 docker_app = FastMCP("docker-mcp")
 
 
 def get_client() -> docker.DockerClient:
-    """获取Docker客户端"""
-    return docker.from_env()
+    """获取共享的Docker客户端"""
+    return get_docker().client
+
+
+def shutdown():
+    """停止后台采集、索引和记录线程，关闭到守护进程的连接（服务退出时调用）"""
+    # 只处理已经导入的模块，避免退出时才加载numpy等依赖
+    services = (("history", "_history"), ("log_index", "_index"), ("inventory", "_inventory"), ("stats", "_collector"))
+    for module, attr in services:
+        service = getattr(sys.modules.get(f"{__package__}.{module}"), attr, None)
+        if service is not None:
+            service.stop()
+    close_all()
+
+
+def _start_background():
+    """第一次工具调用时启动后台统计采集、指标历史记录和日志索引（只覆盖默认守护进程）"""
+    if default_host() is None:
+        return
+    if config.stats_collector:
+        get_stats_collector()
+        if config.history:
+            # 指标历史依赖numpy，第一次工具调用时才导入
+            from .history import get_metrics_history
+            get_metrics_history()
+    if config.log_index:
+        get_log_index()
+
+
+async def _run(func: Callable[..., str], *args) -> str:
+    """在线程池中以共享客户端执行工具实现，连接失败时返回错误信息"""
+    _start_background()
+    try:
+        return await get_async_docker().run(func, *args)
+    except (DockerException,) + CONNECTION_ERRORS as e:
+        return f"❌ Docker连接失败: {str(e)}"
+
+
+async def _run_on_hosts(func: Callable[..., Any], *args, host: str = None) -> Tuple[List[Tuple[str, Any]], List[str]]:
+    """
+    在各主机上并发执行工具实现
+    
+    Returns:
+        ([(主机名, 结果)], [失败说明])；抛出NotFound的主机视为没有该容器，不算失败
+    
+    Raises:
+        ValueError: host不在配置中
+    """
+    _start_background()
+    results, failures = [], []
+    for name, result in await fan_out(func, *args, host=host):
+        if not isinstance(result, HostError):
+            results.append((name, result))
+        elif isinstance(result.error, NotFound):
+            continue
+        elif is_multi_host():
+            failures.append(f"⚠️ 主机 {name}: {result}")
+        elif isinstance(result.error, DockerException) and not isinstance(result.error, CONNECTION_ERRORS):
+            failures.append(f"❌ Docker错误: {result}")
+        else:
+            failures.append(f"❌ Docker连接失败: {result}")
+    return results, failures
+
+
+def _join_hosts(results: List[Tuple[str, str]], failures: List[str], missing: str) -> str:
+    """合并各主机的输出，多主机时每段前标注主机名；没有任何结果时使用missing"""
+    multi = is_multi_host()
+    parts = [f"[主机 {name}] {text}" if multi else text for name, text in results]
+    if not parts and (multi or not failures):
+        parts.append(missing)
+    return "\n\n".join(parts + failures)
+
+
+def _is_default_host(client: docker.DockerClient) -> bool:
+    """
+    client是否连接默认守护进程；容器清单和后台统计只覆盖默认守护进程
+
+    按配置判断，不会为此连接默认守护进程（多主机时本机可能没有Docker）。unix socket 的
+    base_url 都相同，指向默认守护进程时再按共享客户端判断。
+    """
+    return default_host() is not None and get_docker().owns(client)
+
+
+# 首次使用清单时最多等待首次同步的秒数；之后不再等待，未同步时直接访问守护进程
+_INVENTORY_FIRST_WAIT = 5.0
+_inventory_waited = False
+
+
+def _inventory(client: docker.DockerClient = None) -> Optional[ContainerInventory]:
+    """可用的容器清单；未启用、首次同步未完成或事件流中断时返回None，调用方改为访问守护进程"""
+    global _inventory_waited
+    if not config.inventory or (client is not None and not _is_default_host(client)):
+        return None
+    inventory = get_inventory()
+    timeout = 0 if _inventory_waited else _INVENTORY_FIRST_WAIT
+    _inventory_waited = True
+    if inventory.wait_synced(timeout) and not inventory.stale:
+        return inventory
+    return None
+
+
+def _resolve(client: docker.DockerClient, container_id: str) -> Dict[str, Any]:
+    """
+    按ID或名称查找容器，返回 /containers/json 格式的条目
+    
+    优先查清单，清单中没有时询问守护进程，容器不存在时抛出NotFound。
+    """
+    inventory = _inventory(client)
+    container = inventory.resolve(container_id) if inventory else None
+    if container is not None:
+        return container
+    info = client.api.inspect_container(container_id)
+    return {"Id": info["Id"], "Names": [info["Name"]], "State": info["State"].get("Status")}
+
+
+def _container_name(container: Dict[str, Any]) -> str:
+    names = container.get("Names") or []
+    return names[0].lstrip("/") if names else container["Id"][:12]
+
+
+# /containers/json 支持的容器状态过滤值
+CONTAINER_STATUSES = ("created", "restarting", "running", "removing", "paused", "exited", "dead")
 
 
 @docker_app.tool()
-def list_containers(all_containers: bool = False) -> str:
+@limited
+async def list_containers(
+    all_containers: bool = False,
+    label: str = None,
+    status: str = None,
+    name: str = None,
+    offset: int = 0,
+    limit: int = 50,
+    host: str = None
+) -> str:
     """
     列出所有Docker容器及其状态
     
+    过滤在守护进程端完成，按创建时间从新到旧分页返回。配置了多个主机时并发查询
+    所有主机并合并结果，未响应的主机单独标出。
+    
     Args:
         all_containers: 是否显示所有容器（包括已停止的），默认只显示运行中的
+        label: 按标签过滤（可选），如 "tier=web"，多个用逗号分隔
+        status: 按状态过滤（可选），如 running/exited/paused
+        name: 按名称过滤（可选，包含该字符串即匹配）
+        offset: 跳过的容器数，默认0
+        limit: 返回的容器数，默认50
+        host: 只查询该主机（可选，多主机时有效）
     
     Returns:
         容器列表信息
     """
+    if status and status not in CONTAINER_STATUSES:
+        return f"❌ 不支持的状态: {status}（可选: {', '.join(CONTAINER_STATUSES)}）"
+    offset, limit = max(0, offset), max(1, limit)
     try:
-        client = get_client()
-        containers = client.containers.list(all=all_containers)
-        
-        if not containers:
-            return "📦 暂无容器"
-        
-        result = "🐳 Docker容器列表：\n\n"
+        results, failures = await _run_on_hosts(
+            _list_containers, all_containers, label, status, name, offset + limit, host=host
+        )
+    except ValueError as e:
+        return f"❌ {e}"
+    if failures and not results:
+        return "\n".join(failures)
+    
+    # 各主机都已按创建时间排序，合并后全局分页
+    rows = [dict(row, host=host_name) for host_name, host_rows in results for row in host_rows]
+    rows.sort(key=lambda row: row["created"], reverse=True)
+    has_more = len(rows) > offset + limit
+    rows = rows[offset:offset + limit]
+    
+    if not rows:
+        result = "📦 暂无容器" if not offset else f"📦 offset={offset} 之后没有更多容器"
+    else:
+        multi = is_multi_host()
+        result = f"🐳 Docker容器列表（第 {offset + 1}-{offset + len(rows)} 个）：\n\n"
+        result += f"{'主机':<12} " if multi else ""
         result += f"{'ID':<15} {'名称':<25} {'镜像':<30} {'状态':<15} {'端口'}\n"
-        result += "-" * 100 + "\n"
-        
-        for c in containers:
-            short_id = c.short_id[:12]
-            name = c.name[:24]
-            image = c.image.tags[0] if c.image.tags else c.image.short_id[:28]
-            status = c.status
-            ports = ", ".join(p for p in c.ports) if c.ports else "-"
-            
-            result += f"{short_id:<15} {name:<25} {image:<30} {status:<15} {ports}\n"
-        
-        return result
-        
-    except DockerException as e:
-        return f"❌ Docker连接失败: {str(e)}"
+        result += "-" * (113 if multi else 100) + "\n"
+        for row in rows:
+            result += f"{row['host'][:11]:<12} " if multi else ""
+            result += f"{row['id'][:12]:<15} {row['name'][:24]:<25} {row['image'][:28]:<30} {row['state']:<15} {row['ports']}\n"
+        if has_more:
+            result += f"\n还有更多容器，使用 offset={offset + limit} 查看下一页\n"
+    if failures:
+        result += "\n" + "\n".join(failures) + "\n"
+    return result
+
+
+def _format_ports(ports: List[Dict[str, Any]]) -> str:
+    formatted = []
+    for p in ports or ():
+        port = f"{p.get('PrivatePort')}/{p.get('Type', 'tcp')}"
+        if p.get("PublicPort"):
+            port = f"{p.get('IP', '0.0.0.0')}:{p['PublicPort']}->{port}"
+        if port not in formatted:
+            formatted.append(port)
+    return ", ".join(formatted) if formatted else "-"
+
+
+def _list_containers(
+    client: docker.DockerClient,
+    all_containers: bool,
+    label: Optional[str],
+    status: Optional[str],
+    name: Optional[str],
+    count: int
+) -> List[Dict[str, Any]]:
+    """按创建时间从新到旧取最多count+1个容器（多一个用于判断是否还有下一页）"""
+    labels = [item.strip() for item in label.split(",") if item.strip()] if label else []
+    inventory = _inventory(client)
+    if inventory:
+        containers = inventory.list(all_containers, labels, status, name)[:count + 1]
+    else:
+        filters: Dict[str, List[str]] = {}
+        if labels:
+            filters["label"] = labels
+        if name:
+            filters["name"] = [name]
+        if status:
+            filters["status"] = [status]
+        elif not all_containers:
+            # 指定limit时守护进程会包含已停止的容器，显式只取运行中的
+            filters["status"] = ["running"]
+        containers = client.api.containers(all=True, filters=filters, limit=count + 1)
+    return [
+        {
+            "id": c["Id"],
+            "name": _container_name(c),
+            "image": image_name(client, c),
+            "state": c.get("State", ""),
+            "ports": _format_ports(c.get("Ports")),
+            "created": c.get("Created", 0),
+        }
+        for c in containers
+    ]
 
 
 @docker_app.tool()
-def get_container_stats(container_id: str) -> str:
+@limited
+async def get_container_stats(container_id: str, window: int = 0, host: str = None) -> str:
     """
-    获取容器的CPU、内存、网络使用情况
+    获取容器的CPU、内存、网络、磁盘IO使用情况
+    
+    运行中的容器由后台持续采样，直接返回最新数据，不需要等待采样。配置了多个主机时
+    在所有主机上并发查找该容器。
     
     Args:
         container_id: 容器ID或名称
+        window: 取最近多少秒的平均值（可选，默认0为最新采样）
+        host: 只查询该主机（可选，多主机时有效）
     
     Returns:
         容器资源使用统计
     """
     try:
-        client = get_client()
-        container = client.containers.get(container_id)
+        results, failures = await _run_on_hosts(_get_container_stats, container_id, window, host=host)
+    except ValueError as e:
+        return f"❌ {e}"
+    return _join_hosts(results, failures, f"❌ 容器未找到: {container_id}")
+
+
+def _get_container_stats(client: docker.DockerClient, container_id: str, window: int) -> str:
+    """容器不存在时抛出NotFound"""
+    container = _resolve(client, container_id)
+    full_id, name = container["Id"], _container_name(container)
+    
+    stats = None
+    if config.stats_collector and container.get("State") == "running" and _is_default_host(client):
+        collector = get_stats_collector()
+        stats = collector.get(full_id, window)
+        if stats is None and collector.watch(full_id) and collector.wait(full_id, 3):
+            stats = collector.get(full_id, window)
+    if stats is None:
+        # 未启用后台采集或采集尚未就绪：阻塞采样一次
+        row, _ = parse_stats(client.api.stats(full_id, stream=False))
+        stats = dict(zip(FIELDS, row), samples=1)
+        stats["memory_percent"] = stats["memory_usage"] / stats["memory_limit"] * 100.0 if stats["memory_limit"] else 0.0
+    
+    # 格式化输出
+    result = f"📊 容器 {full_id[:12]} ({name}) 资源统计"
+    if window > 0:
+        result += f"（最近{window}秒平均，{stats['samples']}个采样）"
+    result += "：\n\n"
+    result += f"🖥️  CPU使用率: {stats['cpu_percent']:.2f}%\n"
+    result += f"💾 内存使用: {stats['memory_usage'] / 1024 / 1024:.2f} MB / {stats['memory_limit'] / 1024 / 1024:.2f} MB ({stats['memory_percent']:.2f}%)\n"
+    result += f"🌐 网络: 接收 {stats['net_rx'] / 1024:.2f} KB, 发送 {stats['net_tx'] / 1024:.2f} KB"
+    if "net_rx_rate" in stats:
+        result += f"（{stats['net_rx_rate'] / 1024:.2f} / {stats['net_tx_rate'] / 1024:.2f} KB/s）"
+    result += "\n"
+    result += f"💽 磁盘IO: 读取 {stats['block_read'] / 1024 / 1024:.2f} MB, 写入 {stats['block_write'] / 1024 / 1024:.2f} MB"
+    if "block_read_rate" in stats:
+        result += f"（{stats['block_read_rate'] / 1024:.2f} / {stats['block_write_rate'] / 1024:.2f} KB/s）"
+    result += "\n"
+    
+    return result
+
+
+@docker_app.tool()
+@limited
+async def top_containers(by: str = "cpu", limit: int = 10) -> str:
+    """
+    按资源占用列出排名靠前的运行中容器
+    
+    所有容器并发采样、批量计算，耗时约为一次采样。
+    
+    Args:
+        by: 排序依据 cpu/memory/net/block（默认cpu）
+        limit: 返回的容器数（默认10）
+    
+    Returns:
+        容器资源排行
+    """
+    from .top import METRICS
+    if by not in METRICS:
+        return f"❌ 不支持的排序依据: {by}（可选: {', '.join(METRICS)}）"
+    return await _run(_top_containers, by, max(1, limit))
+
+
+def _top_containers(client: docker.DockerClient, by: str, limit: int) -> str:
+    from .top import METRICS, top_containers as rank_containers
+    try:
+        inventory = _inventory(client)
+        running = inventory.list() if inventory else client.api.containers()
+        names = {c["Id"]: _container_name(c) for c in running}
+        if not names:
+            return "📦 暂无运行中的容器"
         
-        stats = container.stats(stream=False)
+        ids, metrics = rank_containers(list(names), by, limit)
+        if not ids:
+            return "❌ 未能获取容器统计数据"
         
-        # 计算CPU使用率
-        cpu_delta = stats["cpu_stats"]["cpu_usage"]["total_usage"] - \
-                    stats["precpu_stats"]["cpu_usage"]["total_usage"]
-        system_delta = stats["cpu_stats"]["system_cpu_usage"] - \
-                       stats["precpu_stats"]["system_cpu_usage"]
-        cpu_count = stats["cpu_stats"].get("online_cpus", 1)
+        result = f"🏆 {METRICS[by]}排行（{len(ids)}/{len(names)}个运行中的容器）：\n\n"
+        result += f"{'ID':<15} {'名称':<25} {'CPU':>8} {'内存':>18} {'网络 收/发 KB/s':>22} {'磁盘 读/写 KB/s':>22}\n"
+        result += "-" * 115 + "\n"
+        for container_id, row in zip(ids, metrics):
+            cpu, usage, _, mem_percent, rx, tx, read, write = row
+            memory = f"{usage / 1024 / 1024:.1f}MB ({mem_percent:.1f}%)"
+            net = f"{rx / 1024:.1f} / {tx / 1024:.1f}"
+            block = f"{read / 1024:.1f} / {write / 1024:.1f}"
+            result += f"{container_id[:12]:<15} {names[container_id][:24]:<25} {cpu:>7.2f}% {memory:>18} {net:>22} {block:>22}\n"
         
-        if system_delta > 0 and cpu_delta > 0:
-            cpu_percent = (cpu_delta / system_delta) * cpu_count * 100.0
-        else:
-            cpu_percent = 0.0
+        return result
         
-        # 计算内存使用率
-        memory_usage = stats["memory_stats"]["usage"]
-        memory_limit = stats["memory_stats"]["limit"]
-        memory_percent = (memory_usage / memory_limit) * 100.0
+    except DockerException as e:
+        return f"❌ Docker错误: {str(e)}"
+
+
+@docker_app.tool()
+@limited
+async def container_history(container_id: str, window: str = "1h", resolution: str = None) -> str:
+    """
+    查看容器一段时间内的资源使用统计（最小/平均/最大/P95）
+    
+    指标由后台按原始、1分钟、1小时三级精度持续记录。
+    
+    Args:
+        container_id: 容器ID或名称
+        window: 统计最近多长时间，如 "30m"、"6h"、"7d"，默认 "1h"
+        resolution: 使用的精度 raw/1m/1h（可选，默认按window自动选择）
+    
+    Returns:
+        各项指标的统计和首尾变化
+    """
+    if not (config.stats_collector and config.history):
+        return "❌ 指标历史需要启用 DOCKER_MCP_STATS_COLLECTOR 和 DOCKER_MCP_HISTORY"
+    from .history import RESOLUTIONS
+    if resolution and resolution not in RESOLUTIONS:
+        return f"❌ 不支持的精度: {resolution}（可选: {', '.join(RESOLUTIONS)}）"
+    try:
+        seconds = time.time() - parse_time(window)
+    except ValueError:
+        seconds = 0
+    if seconds <= 0:
+        return f"❌ 无法解析时间窗口: {window}"
+    return await _run(_container_history, container_id, window, seconds, resolution)
+
+
+def _container_history(
+    client: docker.DockerClient,
+    container_id: str,
+    window: str,
+    seconds: float,
+    resolution: Optional[str]
+) -> str:
+    from .history import get_metrics_history
+    try:
+        container = _resolve(client, container_id)
+        full_id, name = container["Id"], _container_name(container)
         
-        # 格式化输出
-        result = f"📊 容器 {container.short_id} ({container.name}) 资源统计：\n\n"
-        result += f"🖥️  CPU使用率: {cpu_percent:.2f}%\n"
-        result += f"💾 内存使用: {memory_usage / 1024 / 1024:.2f} MB / {memory_limit / 1024 / 1024:.2f} MB ({memory_percent:.2f}%)\n"
+        found = get_metrics_history().query(full_id, seconds, resolution)
+        if found is None:
+            return f"📈 容器 {full_id[:12]} ({name}) 最近{window}没有记录的指标"
+        used, points, stats = found
         
-        # 网络IO
-        networks = stats.get("networks", {})
-        if networks:
-            rx_bytes = sum(n["rx_bytes"] for n in networks.values())
-            tx_bytes = sum(n["tx_bytes"] for n in networks.values())
-            result += f"🌐 网络: 接收 {rx_bytes / 1024:.2f} KB, 发送 {tx_bytes / 1024:.2f} KB\n"
+        rows = (
+            ("🖥️  CPU使用率 (%)", "cpu_percent", 1),
+            ("💾 内存使用 (MB)", "memory_usage", 1024 * 1024),
+            ("💾 内存使用率 (%)", "memory_percent", 1),
+            ("🌐 网络接收 (KB/s)", "net_rx_rate", 1024),
+            ("🌐 网络发送 (KB/s)", "net_tx_rate", 1024),
+            ("💽 磁盘读取 (KB/s)", "block_read_rate", 1024),
+            ("💽 磁盘写入 (KB/s)", "block_write_rate", 1024),
+        )
+        result = f"📈 容器 {full_id[:12]} ({name}) 最近{window}资源统计（{used}精度，{points}个点）：\n\n"
+        result += f"{'指标':<18} {'最小':>10} {'平均':>10} {'最大':>10} {'P95':>10} {'开始→结束':>22}\n"
+        result += "-" * 86 + "\n"
+        for label, metric, scale in rows:
+            s = {k: v / scale for k, v in stats[metric].items()}
+            trend = f"{s['first']:.2f} → {s['last']:.2f}"
+            result += f"{label:<18} {s['min']:>10.2f} {s['avg']:>10.2f} {s['max']:>10.2f} {s['p95']:>10.2f} {trend:>22}\n"
         
         return result
         
@@ -105,50 +444,168 @@ def get_container_stats(container_id: str) -> str:
 
 
 @docker_app.tool()
-def get_container_logs(container_id: str, lines: int = 50, tail: bool = False) -> str:
+@limited
+async def get_container_logs(
+    container_id: str,
+    lines: int = 50,
+    tail: bool = True,
+    since: str = None,
+    until: str = None,
+    grep: str = None,
+    stdout: bool = True,
+    stderr: bool = True,
+    max_bytes: int = 65536,
+    timestamps: bool = False,
+    host: str = None
+) -> str:
     """
     获取容器的日志输出
     
+    日志以流的方式读取并逐行过滤，返回内容不超过max_bytes字节。配置了多个主机时
+    在所有主机上并发查找该容器。
+    
     Args:
         container_id: 容器ID或名称
         lines: 日志行数，默认50
-        tail: 是否从尾部开始查看，默认False（从头部）
+        tail: 是否取最后的日志，默认True；False时从头部开始
+        since: 起始时间（可选），Unix时间戳、ISO时间或相对时间如 "10m"、"2h"
+        until: 结束时间（可选），格式同since
+        grep: 只返回匹配该正则表达式的行（可选）
+        stdout: 是否包含标准输出，默认True
+        stderr: 是否包含标准错误，默认True
+        max_bytes: 返回内容的字节上限，默认65536
+        timestamps: 是否显示每行的时间戳，默认False
+        host: 只查询该主机（可选，多主机时有效）
     
     Returns:
         容器日志
     """
     try:
-        client = get_client()
-        container = client.containers.get(container_id)
-        
-        logs = container.logs(
-            stream=False,
-            tail="all" if tail else lines,
-            timestamps=False
+        since_ts = parse_time(since) if since else None
+        until_ts = parse_time(until) if until else None
+    except ValueError:
+        return f"❌ 无法解析时间: since={since}, until={until}"
+    try:
+        pattern = re.compile(grep) if grep else None
+    except re.error as e:
+        return f"❌ 无效的正则表达式: {e}"
+    if not (stdout or stderr):
+        return "❌ stdout和stderr至少选择一个"
+    max_bytes = max(1, min(max_bytes, config.logs_max_bytes))
+    try:
+        results, failures = await _run_on_hosts(
+            _get_container_logs, container_id, max(1, lines), tail,
+            since_ts, until_ts, pattern, stdout, stderr, max_bytes, timestamps, host=host
         )
+    except ValueError as e:
+        return f"❌ {e}"
+    return _join_hosts(results, failures, f"❌ 容器未找到: {container_id}")
+
+
+def _get_container_logs(
+    client: docker.DockerClient,
+    container_id: str,
+    lines: int,
+    tail: bool,
+    since: Optional[float],
+    until: Optional[float],
+    pattern: Optional[Pattern],
+    stdout: bool,
+    stderr: bool,
+    max_bytes: int,
+    timestamps: bool
+) -> str:
+    """容器不存在时抛出NotFound"""
+    container = _resolve(client, container_id)
+    
+    logs = read_logs(
+        client, container["Id"], lines, tail=tail, since=since, until=until, pattern=pattern,
+        stdout=stdout, stderr=stderr, max_bytes=max_bytes, timestamps=timestamps
+    )
+    
+    position = "最后" if tail else "最前"
+    result = f"📋 容器 {_container_name(container)} 日志（{position}{len(logs.lines)}行"
+    if pattern is not None:
+        result += f"，匹配 /{pattern.pattern}/，共扫描{logs.scanned}行"
+    result += "）：\n\n"
+    result += "\n".join(logs.lines)
+    if logs.truncated:
+        result += f"\n\n⚠️ 已达到 {max_bytes} 字节上限，部分日志未返回"
+    
+    return result
+
+
+@docker_app.tool()
+@limited
+async def search_logs(
+    query: str,
+    container: str = None,
+    since: str = "1h",
+    until: str = None,
+    limit: int = 50
+) -> str:
+    """
+    在所有容器的日志中全文搜索
+    
+    日志由后台持续采集到本地索引，搜索不访问守护进程。
+    
+    Args:
+        query: 搜索词，如 "timeout"、"connection refused"（双引号为短语）、"error AND db"
+        container: 只搜索这些容器（可选），名称或ID，多个用逗号分隔
+        since: 起始时间，Unix时间戳、ISO时间或相对时间，默认 "1h"
+        until: 结束时间（可选），格式同since
+        limit: 返回的条数，默认50
+    
+    Returns:
+        匹配的日志行（从新到旧）
+    """
+    try:
+        since_ts = parse_time(since) if since else None
+        until_ts = parse_time(until) if until else None
+    except ValueError:
+        return f"❌ 无法解析时间: since={since}, until={until}"
+    return await _run(_search_logs, query, container, since_ts, until_ts, max(1, limit))
+
+
+def _search_logs(
+    client: docker.DockerClient,
+    query: str,
+    container: Optional[str],
+    since: Optional[float],
+    until: Optional[float],
+    limit: int
+) -> str:
+    if not config.log_index:
+        return "❌ 日志索引未启用（DOCKER_MCP_LOG_INDEX=0）"
+    try:
+        container_ids = None
+        if container:
+            container_ids = [_resolve(client, ref.strip())["Id"] for ref in container.split(",") if ref.strip()]
         
-        # 解码日志
-        if isinstance(logs, bytes):
-            logs = logs.decode("utf-8", errors="replace")
+        index = get_log_index()
+        ready = index.wait_ready(0)
+        entries = index.search(query, since=since, until=until, container_ids=container_ids, limit=limit)
         
-        # 截取指定行数
-        log_lines = logs.split("\n")
-        if not tail and len(log_lines) > lines:
-            log_lines = log_lines[-lines:]
+        note = "" if ready else "（首次采集尚未完成，结果可能不全）"
+        if not entries:
+            return f"🔍 没有匹配 {query} 的日志{note}"
         
-        result = f"📋 容器 {container.name} 日志（最近{lines}行）：\n\n"
-        result += "\n".join(log_lines)
+        result = f"🔍 匹配 {query} 的日志（{len(entries)}条，从新到旧）{note}：\n\n"
+        for entry in entries:
+            moment = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["time"]))
+            result += f"[{moment}] {entry['name']}: {entry['message']}\n"
         
         return result
         
     except NotFound:
-        return f"❌ 容器未找到: {container_id}"
+        return f"❌ 容器未找到: {container}"
     except DockerException as e:
         return f"❌ Docker错误: {str(e)}"
 
 
 @docker_app.tool()
-def restart_container(container_id: str) -> str:
+@limited
+async def restart_container(container_id: str) -> str:
     """
     重启Docker容器
     
@@ -158,15 +615,92 @@ def restart_container(container_id: str) -> str:
     Returns:
         操作结果消息
     """
+    return await _run(_restart_container, container_id)
+
+
+def _restart_container(client: docker.DockerClient, container_id: str) -> str:
     try:
-        client = get_client()
-        container = client.containers.get(container_id)
+        container = _resolve(client, container_id)
         
-        container.restart(timeout=10)
+        client.api.restart(container["Id"], timeout=10)
         
-        return f"✅ 容器 {container.short_id} ({container.name}) 已重启"
+        return f"✅ 容器 {container['Id'][:12]} ({_container_name(container)}) 已重启"
         
     except NotFound:
         return f"❌ 容器未找到: {container_id}"
     except DockerException as e:
         return f"❌ Docker错误: {str(e)}"
+
+
+@docker_app.tool()
+@limited
+async def restart_containers(
+    label: str = None,
+    name: str = None,
+    project: str = None,
+    wave_size: int = 0,
+    stop_timeout: int = 10,
+    health_timeout: int = 60
+) -> str:
+    """
+    批量重启运行中的容器，支持分波滚动重启
+    
+    每一波并发重启，等这一波的容器重新运行（配置了健康检查的等到healthy）后再开始
+    下一波，有容器失败时停止后续波次。
+    
+    Args:
+        label: 按标签选择（可选），如 "tier=web"，多个用逗号分隔
+        name: 按名称通配符选择（可选），如 "api-*"
+        project: 按compose项目选择（可选）
+        wave_size: 每波重启的容器数，默认0为全部同时重启
+        stop_timeout: 停止容器时等待的秒数，默认10
+        health_timeout: 每波等待容器就绪的秒数，默认60
+    
+    Returns:
+        每个容器的重启耗时、就绪耗时和结果
+    """
+    if not (label or name or project):
+        return "❌ 请至少指定 label、name、project 中的一个条件"
+    return await _run(
+        _restart_containers, label, name, project, max(0, wave_size), max(0, stop_timeout), max(1, health_timeout)
+    )
+
+
+def _restart_containers(
+    client: docker.DockerClient,
+    label: Optional[str],
+    name: Optional[str],
+    project: Optional[str],
+    wave_size: int,
+    stop_timeout: int,
+    health_timeout: int
+) -> str:
+    try:
+        inventory = _inventory(client)
+        running = inventory.list() if inventory else client.api.containers()
+        targets = select_targets(running, label=label, name=name, project=project)
+        if not targets:
+            return "📦 没有符合条件的运行中容器"
+        
+        report = rolling_restart(get_docker(), targets, wave_size, stop_timeout, health_timeout)
+        
+        results = report["results"]
+        succeeded = sum(1 for r in results if r["status"] in ("running", "healthy"))
+        result = f"🔄 批量重启 {len(results)} 个容器（{report['waves']}波，成功{succeeded}个，总耗时{report['elapsed']:.1f}秒）：\n\n"
+        result += f"{'波次':<6} {'ID':<15} {'名称':<25} {'重启(秒)':>10} {'就绪(秒)':>10}  {'结果'}\n"
+        result += "-" * 90 + "\n"
+        labels = {
+            "running": "✅ 运行中", "healthy": "✅ 健康", "unhealthy": "❌ 健康检查失败",
+            "timeout": "❌ 等待就绪超时", "error": "❌ 重启失败", "skipped": "⏭️ 未执行",
+        }
+        for r in results:
+            restart = f"{r['restart']:.2f}" if r["restart"] is not None else "-"
+            ready = f"{r['ready']:.2f}" if r["ready"] is not None else "-"
+            status = labels[r["status"]] + (f": {r['error']}" if r["error"] else "")
+            wave = str(r["wave"]) if r["wave"] else "-"
+            result += f"{wave:<6} {r['id'][:12]:<15} {r['name'][:24]:<25} {restart:>10} {ready:>10}  {status}\n"
+        
+        return result
+        
+    except DockerException as e:
+        return f"❌ Docker错误: {str(e)}"
@@ -0,0 +1,287 @@
+"""容器资源统计模块 - 后台订阅stats流，采样存入定长环形缓冲区"""
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .client import DockerConnection
+from .config import config
+
+# 环形缓冲区的列；网络和磁盘IO保存累计字节数，速率由相邻采样相减得到
+FIELDS = ("time", "cpu_percent", "memory_usage", "memory_limit", "net_rx", "net_tx", "block_read", "block_write")
+# 累计值列 -> 速率字段名
+RATE_FIELDS = {
+    "net_rx": "net_rx_rate",
+    "net_tx": "net_tx_rate",
+    "block_read": "block_read_rate",
+    "block_write": "block_write_rate",
+}
+
+# 已停止容器的stats流会持续返回读取时间为零值的空采样
+_ZERO_TIME = "0001-01-01T00:00:00Z"
+
+
+# stats_counters 返回的累计计数
+COUNTERS = (
+    "time", "cpu_total", "system_total", "cpu_count", "memory_usage", "memory_limit",
+    "net_rx", "net_tx", "block_read", "block_write",
+)
+
+
+def stats_counters(raw: Dict) -> Tuple[float, ...]:
+    """Docker stats JSON中的累计计数，按COUNTERS排列（time为本地接收时间）"""
+    cpu_stats = raw.get("cpu_stats", {})
+    cpu_usage = cpu_stats.get("cpu_usage", {})
+    memory = raw.get("memory_stats", {})
+    networks = (raw.get("networks") or {}).values()
+    blkio = raw.get("blkio_stats", {}).get("io_service_bytes_recursive") or ()
+    return (
+        time.time(),
+        float(cpu_usage.get("total_usage", 0)),
+        float(cpu_stats.get("system_cpu_usage", 0)),
+        float(cpu_stats.get("online_cpus") or len(cpu_usage.get("percpu_usage") or ()) or 1),
+        float(memory.get("usage", 0)),
+        float(memory.get("limit", 0)),
+        float(sum(n.get("rx_bytes", 0) for n in networks)),
+        float(sum(n.get("tx_bytes", 0) for n in networks)),
+        float(_blkio_bytes(blkio, "read")),
+        float(_blkio_bytes(blkio, "write")),
+    )
+
+
+def parse_stats(raw: Dict, prev_cpu: Tuple[float, float] = None) -> Tuple[Tuple[float, ...], Tuple[float, float]]:
+    """
+    把Docker stats JSON转换为一行采样
+
+    Args:
+        raw: stats接口返回的一个采样
+        prev_cpu: 上一个采样的 (容器CPU累计, 系统CPU累计)，为空时使用 precpu_stats
+
+    Returns:
+        (按FIELDS排列的采样, 本次的CPU累计值)
+    """
+    now, cpu_total, system_total, cpu_count, *rest = stats_counters(raw)
+    if prev_cpu is None:
+        precpu = raw.get("precpu_stats", {})
+        prev_cpu = (precpu.get("cpu_usage", {}).get("total_usage", 0), precpu.get("system_cpu_usage", 0))
+
+    cpu_delta = cpu_total - prev_cpu[0]
+    system_delta = system_total - prev_cpu[1]
+    if system_delta > 0 and cpu_delta > 0:
+        cpu_percent = (cpu_delta / system_delta) * cpu_count * 100.0
+    else:
+        cpu_percent = 0.0
+    return (now, cpu_percent, *rest), (cpu_total, system_total)
+
+
+def _blkio_bytes(entries: Iterable[Dict], op: str) -> int:
+    return sum(e.get("value", 0) for e in entries if e.get("op", "").lower() == op)
+
+
+class StatsRing:
+    """
+    一个容器的定长采样缓冲区
+
+    每列是一个 array('d')，写满后覆盖最旧的采样，内存占用固定为
+    capacity * len(FIELDS) * 8 字节。
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._columns = [array("d", bytes(8 * capacity)) for _ in FIELDS]
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, row: Tuple[float, ...]):
+        with self._lock:
+            i = self._next
+            for column, value in zip(self._columns, row):
+                column[i] = value
+            self._next = (i + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def _row(self, i: int) -> Dict[str, float]:
+        return {field: column[i] for field, column in zip(FIELDS, self._columns)}
+
+    def _indices(self, since: float = None) -> list:
+        """时间不早于since的采样下标，从旧到新"""
+        start = (self._next - self._count) % self.capacity
+        indices = [(start + k) % self.capacity for k in range(self._count)]
+        if since is not None:
+            times = self._columns[0]
+            indices = [i for i in indices if times[i] >= since]
+        return indices
+
+    def summary(self, window: float = 0) -> Optional[Dict[str, float]]:
+        """
+        最新采样，window>0时为最近window秒的平均值
+
+        Returns:
+            FIELDS中的各项、memory_percent、各项IO速率（字节/秒）和采样数；没有采样时返回None
+        """
+        with self._lock:
+            if not self._count:
+                return None
+            latest = (self._next - 1) % self.capacity
+            if window > 0:
+                indices = self._indices(self._columns[0][latest] - window)
+            else:
+                indices = self._indices()[-2:]
+            result = self._row(latest)
+            if window > 0:
+                n = len(indices)
+                result["cpu_percent"] = sum(self._columns[1][i] for i in indices) / n
+                result["memory_usage"] = sum(self._columns[2][i] for i in indices) / n
+            first = self._row(indices[0])
+
+        elapsed = result["time"] - first["time"]
+        for field, rate_field in RATE_FIELDS.items():
+            result[rate_field] = (result[field] - first[field]) / elapsed if elapsed > 0 else 0.0
+        limit = result["memory_limit"]
+        result["memory_percent"] = result["memory_usage"] / limit * 100.0 if limit else 0.0
+        result["samples"] = len(indices) if window > 0 else 1
+        return result
+
+
+class StatsCollector:
+    """
+    后台统计采集
+
+    每个运行中的容器保持一条stats订阅（stream=True，守护进程约每秒推送一次），
+    采样写入该容器的StatsRing；查询只读缓冲区，不等待守护进程采样。
+    订阅使用独立的连接池，不占用工具调用的连接；定期列出运行中的容器，
+    为新容器建立订阅、清理已删除容器的缓冲区。
+    """
+
+    def __init__(self, base_url: str = None, capacity: int = None):
+        """
+        Args:
+            base_url: 守护进程地址（默认读取环境变量）
+            capacity: 每个容器保留的采样数（默认 DOCKER_MCP_STATS_BUFFER_SIZE）
+        """
+        self.max_containers = config.stats_max_containers
+        self._connection = DockerConnection(base_url, pool_size=self.max_containers)
+        self.capacity = capacity or config.stats_buffer_size
+        self._rings: Dict[str, StatsRing] = {}
+        self._ready: Dict[str, threading.Event] = {}
+        self._streams: Dict[str, threading.Thread] = {}
+        self._wanted = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._discovery: Optional[threading.Thread] = None
+        self._stopping = False
+
+    # ============ 查询 ============
+
+    def get(self, container_id: str, window: float = 0) -> Optional[Dict[str, float]]:
+        """容器的最新采样或窗口平均（完整容器ID），尚无采样时返回None"""
+        ring = self._rings.get(container_id)
+        return ring.summary(window) if ring else None
+
+    def containers(self) -> List[str]:
+        """有采样缓冲区的容器ID"""
+        return list(self._rings)
+
+    def sample_count(self, container_id: str) -> int:
+        """容器缓冲区中的采样数"""
+        ring = self._rings.get(container_id)
+        return len(ring) if ring else 0
+
+    def wait(self, container_id: str, timeout: float) -> bool:
+        """等待容器的第一个采样"""
+        event = self._ready.get(container_id)
+        return bool(event and event.wait(timeout))
+
+    def __contains__(self, container_id: str) -> bool:
+        return container_id in self._rings
+
+    # ============ 订阅 ============
+
+    def watch(self, container_id: str) -> bool:
+        """为容器建立订阅（已订阅时忽略），超过 DOCKER_MCP_STATS_MAX_CONTAINERS 时返回False"""
+        with self._lock:
+            self._wanted.add(container_id)
+            if container_id in self._streams:
+                return True
+            if len(self._streams) >= self.max_containers:
+                return False
+            if container_id not in self._rings:
+                self._rings[container_id] = StatsRing(self.capacity)
+                self._ready[container_id] = threading.Event()
+            thread = self._streams[container_id] = threading.Thread(
+                target=self._stream, args=(container_id,), name=f"docker-stats-{container_id[:12]}", daemon=True
+            )
+        thread.start()
+        return True
+
+    def _stream(self, container_id: str):
+        ring = self._rings[container_id]
+        prev_cpu = None
+        try:
+            stream = self._connection.call(
+                lambda client: client.api.stats(container_id, decode=True, stream=True)
+            )
+            for raw in stream:
+                if self._stopping or container_id not in self._wanted or raw.get("read") == _ZERO_TIME:
+                    break
+                row, prev_cpu = parse_stats(raw, prev_cpu)
+                ring.append(row)
+                self._ready[container_id].set()
+        except Exception as e:
+            if not self._stopping:
+                print(f"容器 {container_id[:12]} 统计订阅中断: {e}")
+        finally:
+            with self._lock:
+                self._streams.pop(container_id, None)
+
+    def start(self):
+        """启动后台发现线程"""
+        if self._discovery is None or not self._discovery.is_alive():
+            self._stopping = False
+            self._discovery = threading.Thread(target=self._discover_loop, name="docker-stats-discovery", daemon=True)
+            self._discovery.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    def _discover_loop(self):
+        while not self._stopping:
+            try:
+                running = {c["Id"] for c in self._connection.call(lambda client: client.api.containers(quiet=True))}
+            except Exception as e:
+                print(f"获取运行中的容器失败: {e}")
+                running = None
+
+            if running is not None:
+                with self._lock:
+                    self._wanted = running
+                    for container_id in set(self._rings) - running:
+                        if container_id not in self._streams:
+                            del self._rings[container_id]
+                            del self._ready[container_id]
+                for container_id in running:
+                    if not self.watch(container_id):
+                        break
+
+            self._wakeup.wait(config.stats_discovery_interval)
+            self._wakeup.clear()
+
+
+# 全局采集器
+_collector: Optional[StatsCollector] = None
+_collector_guard = threading.Lock()
+
+
+def get_stats_collector() -> StatsCollector:
+    """获取全局StatsCollector实例，首次调用时开始采集"""
+    global _collector
+    with _collector_guard:
+        if _collector is None:
+            _collector = StatsCollector(config.docker_host or None)
+            _collector.start()
+        return _collector
@@ -0,0 +1,149 @@
+"""容器资源排行模块 - 并发采样，用NumPy批量计算并排序"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .client import DockerConnection
+from .config import config
+from .stats import COUNTERS, stats_counters, get_stats_collector
+
+# 排序依据 -> 说明
+METRICS = {
+    "cpu": "CPU使用率",
+    "memory": "内存使用率",
+    "net": "网络吞吐",
+    "block": "磁盘IO",
+}
+
+# compute_metrics 输出的列
+COLUMNS = (
+    "cpu_percent", "memory_usage", "memory_limit", "memory_percent",
+    "net_rx_rate", "net_tx_rate", "block_read_rate", "block_write_rate",
+)
+
+# 后台采集的最新采样在该秒数内视为新鲜，直接使用
+FRESH_SECONDS = 5
+
+_C = {name: i for i, name in enumerate(COUNTERS)}
+
+_sampling_connection: Optional[DockerConnection] = None
+_sampling_guard = threading.Lock()
+
+
+def _get_sampling_connection() -> DockerConnection:
+    """并发采样使用的连接，连接池与工作线程数一致，不占用工具调用的连接"""
+    global _sampling_connection
+    with _sampling_guard:
+        if _sampling_connection is None:
+            _sampling_connection = DockerConnection(config.docker_host or None, pool_size=config.top_workers)
+        return _sampling_connection
+
+
+def sample_pairs(container_ids: List[str], max_workers: int = None) -> Dict[str, Tuple[tuple, tuple]]:
+    """
+    并发订阅每个容器的stats流，各取相邻两个采样的累计计数
+
+    Returns:
+        容器ID -> (第一个采样, 第二个采样)，采样失败的容器不在结果中
+    """
+    connection = _get_sampling_connection()
+
+    def two_samples(container_id: str) -> Optional[Tuple[tuple, tuple]]:
+        try:
+            stream = connection.call(lambda client: client.api.stats(container_id, decode=True, stream=True))
+            try:
+                return stats_counters(next(stream)), stats_counters(next(stream))
+            finally:
+                stream.close()
+        except Exception:
+            return None
+
+    workers = min(max_workers or config.top_workers, len(container_ids)) or 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="docker-top") as pool:
+        results = pool.map(two_samples, container_ids)
+        return {cid: pair for cid, pair in zip(container_ids, results) if pair}
+
+
+def compute_metrics(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    由两组累计计数批量计算资源指标
+
+    Args:
+        first, second: 形状为 (容器数, len(COUNTERS)) 的相邻两次采样
+
+    Returns:
+        形状为 (容器数, len(COLUMNS)) 的指标，速率单位为字节/秒
+    """
+    elapsed = second[:, _C["time"]] - first[:, _C["time"]]
+    cpu_delta = second[:, _C["cpu_total"]] - first[:, _C["cpu_total"]]
+    system_delta = second[:, _C["system_total"]] - first[:, _C["system_total"]]
+    usage = second[:, _C["memory_usage"]]
+    limit = second[:, _C["memory_limit"]]
+
+    valid_cpu = (system_delta > 0) & (cpu_delta > 0)
+    cpu_percent = np.divide(cpu_delta, system_delta, out=np.zeros_like(cpu_delta), where=valid_cpu)
+    cpu_percent *= second[:, _C["cpu_count"]] * 100.0
+    memory_percent = np.divide(usage, limit, out=np.zeros_like(usage), where=limit > 0) * 100.0
+
+    io = slice(_C["net_rx"], _C["block_write"] + 1)
+    deltas = second[:, io] - first[:, io]
+    rates = np.divide(
+        deltas, elapsed[:, None], out=np.zeros_like(deltas), where=(elapsed > 0)[:, None]
+    )
+    return np.column_stack((cpu_percent, usage, limit, memory_percent, rates))
+
+
+def rank(metrics: np.ndarray, by: str, limit: int) -> np.ndarray:
+    """按指标从高到低排序，返回前limit行的下标"""
+    col = {name: i for i, name in enumerate(COLUMNS)}
+    if by == "cpu":
+        key = metrics[:, col["cpu_percent"]]
+    elif by == "memory":
+        key = metrics[:, col["memory_percent"]]
+    elif by == "net":
+        key = metrics[:, col["net_rx_rate"]] + metrics[:, col["net_tx_rate"]]
+    else:
+        key = metrics[:, col["block_read_rate"]] + metrics[:, col["block_write_rate"]]
+    return np.argsort(-key, kind="stable")[:limit]
+
+
+def top_containers(container_ids: List[str], by: str = "cpu", limit: int = 10) -> Tuple[List[str], np.ndarray]:
+    """
+    计算容器资源指标并排序
+
+    后台采集有新鲜数据的容器直接取缓冲区，其余容器并发采样两次。
+
+    Returns:
+        (排序后的容器ID, 对应的指标矩阵)
+    """
+    ids: List[str] = []
+    rows: List[np.ndarray] = []
+
+    pending = list(container_ids)
+    if config.stats_collector:
+        collector = get_stats_collector()
+        pending = []
+        for container_id in container_ids:
+            stats = collector.get(container_id) if collector.sample_count(container_id) >= 2 else None
+            if stats and stats["time"] >= time.time() - FRESH_SECONDS:
+                ids.append(container_id)
+                rows.append(np.array([stats[c] for c in COLUMNS]))
+            else:
+                pending.append(container_id)
+
+    if pending:
+        pairs = sample_pairs(pending)
+        if pairs:
+            first = np.array([pair[0] for pair in pairs.values()])
+            second = np.array([pair[1] for pair in pairs.values()])
+            ids.extend(pairs)
+            rows.extend(compute_metrics(first, second))
+
+    if not rows:
+        return [], np.empty((0, len(COLUMNS)))
+    metrics = np.vstack(rows)
+    order = rank(metrics, by, limit)
+    return [ids[i] for i in order], metrics[order]
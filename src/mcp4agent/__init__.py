@@ -1,36 +1,68 @@
 """MCP4Agent - Multi-package MCP server"""
 __version__ = "0.3.0"
 
-# WeChat MCP
-from wechat_mcp import (
-    app as wechat_app,
-    create_draft,
-    upload_image,
-    list_drafts,
-    publish_draft,
-)
-
-# Docker Status MCP
-from docker_status import (
-    docker_app,
-    list_containers,
-    get_container_stats,
-    get_container_logs,
-    restart_container,
-)
+import importlib
+
+# 导出名称 -> (所在包, 包内名称)；只有访问到的应用才会被导入，
+# 只运行Docker监控时不会加载微信的依赖，反之亦然
+_EXPORTS = {
+    # WeChat MCP
+    "wechat_app": ("wechat_mcp", "app"),
+    "create_draft": ("wechat_mcp", "create_draft"),
+    "create_drafts_bulk": ("wechat_mcp", "create_drafts_bulk"),
+    "upload_image": ("wechat_mcp", "upload_image"),
+    "list_drafts": ("wechat_mcp", "list_drafts"),
+    "search_drafts": ("wechat_mcp", "search_drafts"),
+    "publish_draft": ("wechat_mcp", "publish_draft"),
+    "publish_status": ("wechat_mcp", "publish_status"),
+    "wait_for_publish": ("wechat_mcp", "wait_for_publish"),
+    # Docker Status MCP
+    "docker_app": ("docker_status", "docker_app"),
+    "list_containers": ("docker_status", "list_containers"),
+    "get_container_stats": ("docker_status", "get_container_stats"),
+    "top_containers": ("docker_status", "top_containers"),
+    "container_history": ("docker_status", "container_history"),
+    "get_container_logs": ("docker_status", "get_container_logs"),
+    "search_logs": ("docker_status", "search_logs"),
+    "restart_container": ("docker_status", "restart_container"),
+    "restart_containers": ("docker_status", "restart_containers"),
+}
+
+
+def __getattr__(name: str):
+    target = _EXPORTS.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    package, attr = target
+    value = getattr(importlib.import_module(package), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     "__version__",
     # WeChat
     "wechat_app",
     "create_draft",
+    "create_drafts_bulk",
     "upload_image",
     "list_drafts",
+    "search_drafts",
     "publish_draft",
+    "publish_status",
+    "wait_for_publish",
     # Docker
     "docker_app",
     "list_containers",
     "get_container_stats",
+    "top_containers",
+    "container_history",
     "get_container_logs",
+    "search_logs",
     "restart_container",
+    "restart_containers",
 ]
@@ -1,25 +1,42 @@
 """MCP4Agent - Multi-package MCP server entry point"""
+import os
 import sys
 import argparse
 from multiprocessing import Process
 
-# Import both apps
-from wechat_mcp import app as wechat_app
-from docker_status import docker_app
-
 
 def run_wechat(port: int = 8080):
     """启动微信 MCP 服务"""
+    from wechat_mcp import app as wechat_app
     print(f"🚀 启动 WeChat MCP Server (端口: {port})...")
     wechat_app.run(transport="http", host="0.0.0.0", port=port, path="/mcp")
 
 
 def run_docker(port: int = 8081):
     """启动 Docker 监控服务"""
+    from docker_status import docker_app
     print(f"🐳 启动 Docker Status MCP Server (端口: {port})...")
     docker_app.run(transport="http", host="0.0.0.0", port=port, path="/mcp")
 
 
+def run_combined(host: str = "0.0.0.0", port: int = 8080, workers: int = 1, graceful_timeout: int = 30):
+    """在一个端口上同时提供两个服务（/wechat/mcp 和 /docker/mcp），可启动多个worker"""
+    import uvicorn
+    os.environ.setdefault("MCP4AGENT_APPS", "wechat,docker")
+    print(f"🚀🚀 启动组合 MCP 服务 (端口: {port}, worker: {workers})...")
+    print(f"✅ WeChat MCP: http://{host}:{port}/wechat/mcp")
+    print(f"✅ Docker MCP: http://{host}:{port}/docker/mcp")
+    # 多worker时uvicorn需要导入路径，每个worker各自创建应用
+    uvicorn.run(
+        "mcp4agent.asgi:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=graceful_timeout,
+    )
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="MCP4Agent Server")
     parser.add_argument("--app", choices=["wechat", "docker", "all"], default="all",
@@ -28,10 +45,26 @@ if __name__ == "__main__":
                         help="Port for WeChat MCP (default: 8080)")
     parser.add_argument("--docker-port", type=int, default=8081,
                         help="Port for Docker Status MCP (default: 8081)")
+    parser.add_argument("--combined", action="store_true",
+                        help="With --app all, serve both apps from one process on one port "
+                             "at /wechat/mcp and /docker/mcp")
+    parser.add_argument("--host", default="0.0.0.0",
+                        help="Bind address for the combined server (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=8080,
+                        help="Port for the combined server (default: 8080)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for the combined server (default: 1)")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="Seconds to wait for in-flight requests on shutdown (default: 30)")
     
     args = parser.parse_args()
+    if args.combined and args.app != "all":
+        parser.error("--combined 只能与 --app all 一起使用")
+    
+    if args.combined:
+        run_combined(args.host, args.port, max(1, args.workers), args.graceful_timeout)
     
-    if args.app == "all":
+    elif args.app == "all":
         print("🚀🚀 启动全部 MCP 服务...")
         p_wechat = Process(target=run_wechat, args=(args.wechat_port,))
         p_docker = Process(target=run_docker, args=(args.docker_port,))
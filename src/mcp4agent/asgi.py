@@ -0,0 +1,66 @@
+"""组合ASGI应用 - 在同一个进程、同一个事件循环中提供微信和Docker两个MCP服务
+
+两个FastMCP应用分别挂载在 /wechat/mcp 和 /docker/mcp，共用进程内的token缓存、
+连接池和后台线程。可以直接交给uvicorn运行（多worker时每个worker各自创建一份）：
+
+    uvicorn mcp4agent.asgi:create_app --factory --workers 4 --port 8080
+"""
+import os
+import contextlib
+from typing import Callable, List, Sequence
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+# 可挂载的应用
+APPS = ("wechat", "docker")
+
+
+def _load(name: str):
+    """只导入选中的应用，返回 (FastMCP应用, 退出时的清理函数)"""
+    if name == "wechat":
+        from wechat_mcp.server import app, shutdown
+        return app, shutdown
+    from docker_status.server import docker_app, shutdown
+    return docker_app, shutdown
+
+
+def selected_apps() -> List[str]:
+    """MCP4AGENT_APPS 指定的应用，逗号分隔，默认全部"""
+    names = [n.strip() for n in os.getenv("MCP4AGENT_APPS", ",".join(APPS)).split(",") if n.strip()]
+    unknown = [n for n in names if n not in APPS]
+    if unknown:
+        raise ValueError(f"未知的应用: {', '.join(unknown)}（可选: {', '.join(APPS)}）")
+    return names
+
+
+def create_app(apps: Sequence[str] = None) -> Starlette:
+    """
+    创建组合ASGI应用
+
+    Args:
+        apps: 要挂载的应用（默认 MCP4AGENT_APPS，未设置时为全部）
+
+    Returns:
+        Starlette应用，各MCP端点为 /<应用名>/mcp
+    """
+    mounts, subapps = [], []
+    shutdowns: List[Callable[[], None]] = []
+    for name in apps or selected_apps():
+        mcp, shutdown = _load(name)
+        http_app = mcp.http_app(path="/mcp")
+        mounts.append(Mount(f"/{name}", app=http_app))
+        subapps.append(http_app)
+        shutdowns.append(shutdown)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette):
+        # 各应用的会话管理器先退出（等待进行中的请求结束），再停止后台线程、关闭连接池
+        async with contextlib.AsyncExitStack() as stack:
+            for shutdown in shutdowns:
+                stack.callback(shutdown)
+            for http_app in subapps:
+                await stack.enter_async_context(http_app.lifespan(http_app))
+            yield
+
+    return Starlette(routes=mounts, lifespan=lifespan)
@@ -0,0 +1,143 @@
+"""工具并发限制 - 每个工具单独限制同时执行数和排队时长，慢工具不会拖住其他工具
+
+微信和Docker两个应用共用这里的实现，各自只提供默认的并发表（见各包的 concurrency.DEFAULT_LIMITS）。
+本模块只依赖标准库，导入它不会加载任何一个应用。
+"""
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+# 工具名 -> (并发数, 最长排队秒数)
+Limits = Dict[str, Tuple[int, float]]
+
+
+def parse_tool_limits(value: str, defaults: Mapping[str, int], max_wait: float) -> Limits:
+    """
+    解析工具并发配置
+
+    Args:
+        value: 形如 "upload_image=4:30,create_draft=4"（并发数:排队秒数），覆盖默认值
+        defaults: 工具名 -> 默认并发数
+        max_wait: 未写排队秒数时的默认值
+
+    Returns:
+        工具名 -> (并发数, 最长排队秒数)；并发数为0表示不限制
+    """
+    limits = {tool: (concurrency, max_wait) for tool, concurrency in defaults.items()}
+    for item in value.split(","):
+        if "=" in item:
+            tool, setting = item.split("=", 1)
+            concurrency, _, wait = setting.partition(":")
+            limits[tool.strip()] = (int(concurrency), float(wait) if wait else max_wait)
+    return limits
+
+
+class ToolBusy(Exception):
+    """排队超过上限仍未轮到执行"""
+
+
+class ToolLimiter:
+    """
+    一个工具的并发闸门
+
+    同时执行的调用不超过 max_concurrency 个，其余调用排队；排队超过 max_wait 秒的
+    调用不再执行，抛出ToolBusy。max_concurrency 为0时不限制。
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_wait: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 信号量绑定事件循环，换了事件循环（如多次 asyncio.run）时重建
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """等到空位后执行 func(*args, **kwargs)"""
+        if self.max_concurrency <= 0:
+            return await func(*args, **kwargs)
+
+        semaphore = self._get_semaphore()
+        if semaphore.locked():
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), self.max_wait)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise ToolBusy(
+                    f"{self.name} 繁忙（{self.active}个调用执行中，排队超过{self.max_wait:g}秒），请稍后重试"
+                ) from None
+            finally:
+                self.waiting -= 1
+        else:
+            await semaphore.acquire()
+
+        self.active += 1
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self.active -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_wait": self.max_wait,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+class LimiterRegistry:
+    """
+    一个应用的全部工具闸门
+
+    闸门在工具首次调用时按 limits() 创建，之后不再读取配置。
+
+    Args:
+        limits: 返回 工具名 -> (并发数, 最长排队秒数)，通常由 parse_tool_limits 生成
+        max_wait: 返回未列出工具的默认排队秒数
+    """
+
+    def __init__(self, limits: Callable[[], Limits], max_wait: Callable[[], float]):
+        self._limits = limits
+        self._max_wait = max_wait
+        self._limiters: Dict[str, ToolLimiter] = {}
+
+    def get(self, tool: str) -> ToolLimiter:
+        """获取工具的并发闸门"""
+        limiter = self._limiters.get(tool)
+        if limiter is None:
+            max_concurrency, max_wait = self._limits().get(tool, (0, self._max_wait()))
+            limiter = self._limiters[tool] = ToolLimiter(tool, max_concurrency, max_wait)
+        return limiter
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各工具当前执行数、排队数和被拒绝的调用数"""
+        return {tool: limiter.stats() for tool, limiter in self._limiters.items()}
+
+    def limited(self, func: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+        """
+        工具装饰器，放在 @app.tool() 之下
+
+        按工具名限制并发，排队超时时返回错误信息而不是执行。
+        """
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> str:
+            try:
+                return await self.get(func.__name__).run(func, *args, **kwargs)
+            except ToolBusy as e:
+                return f"❌ {e}"
+
+        return wrapper
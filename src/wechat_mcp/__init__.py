@@ -1,11 +1,64 @@
 """微信公众号MCP服务器 - 支持Docker容器监控"""
 __version__ = "0.2.0"
 
-# 微信相关
-from .server import app, create_draft, upload_image, list_drafts, publish_draft
-from .api import WeChatAPI, get_wechat_api
+import importlib
+
 from .config import Config, config
-from .token_cache import TokenCache, get_token_cache
+
+# 导出名称 -> 所在模块，首次访问时才导入（fastmcp、requests、diskcache等依赖随之加载）
+_EXPORTS = {
+    "app": ".server",
+    "create_draft": ".server",
+    "create_drafts_bulk": ".server",
+    "upload_image": ".server",
+    "list_drafts": ".server",
+    "search_drafts": ".server",
+    "publish_draft": ".server",
+    "publish_status": ".server",
+    "wait_for_publish": ".server",
+    "WeChatAPI": ".api",
+    "AsyncWeChatAPI": ".api",
+    "get_wechat_api": ".api",
+    "get_async_wechat_api": ".api",
+    "AccountPool": ".accounts",
+    "get_account_pool": ".accounts",
+    "HTTPTransport": ".transport",
+    "Timeouts": ".transport",
+    "get_http_transport": ".transport",
+    "RateLimiter": ".ratelimit",
+    "RequestMetrics": ".ratelimit",
+    "TokenBucket": ".ratelimit",
+    "TokenCache": ".token_cache",
+    "get_token_cache": ".token_cache",
+    "MediaCache": ".media_cache",
+    "get_media_cache": ".media_cache",
+    "DraftCatalog": ".draft_catalog",
+    "get_draft_catalog": ".draft_catalog",
+    "PublishQueue": ".publish_queue",
+    "ToolLimiter": ".concurrency",
+    "get_limiter": ".concurrency",
+    "limiter_stats": ".concurrency",
+    "get_publish_queue": ".publish_queue",
+    "rewrite_inline_images": ".content",
+    "Base64Stream": ".multipart",
+    "BufferStream": ".multipart",
+    "MediaFile": ".multipart",
+    "MultipartStream": ".multipart",
+}
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     # 版本
@@ -14,16 +67,52 @@ __all__ = [
     "app",
     # 微信工具
     "create_draft",
+    "create_drafts_bulk",
     "upload_image",
     "list_drafts",
+    "search_drafts",
     "publish_draft",
+    "publish_status",
+    "wait_for_publish",
     # API
     "WeChatAPI",
+    "AsyncWeChatAPI",
     "get_wechat_api",
+    "get_async_wechat_api",
+    # 多公众号
+    "AccountPool",
+    "get_account_pool",
+    # HTTP
+    "HTTPTransport",
+    "Timeouts",
+    "get_http_transport",
+    # 限流
+    "RateLimiter",
+    "RequestMetrics",
+    "TokenBucket",
     # 配置
     "Config",
     "config",
     # 缓存
     "TokenCache",
     "get_token_cache",
+    "MediaCache",
+    "get_media_cache",
+    # 草稿索引
+    "DraftCatalog",
+    "get_draft_catalog",
+    # 发布队列
+    "PublishQueue",
+    "get_publish_queue",
+    # 工具并发限制
+    "ToolLimiter",
+    "get_limiter",
+    "limiter_stats",
+    # 正文图片
+    "rewrite_inline_images",
+    # 流式上传
+    "Base64Stream",
+    "BufferStream",
+    "MediaFile",
+    "MultipartStream",
 ]
@@ -0,0 +1,104 @@
+"""多公众号模块 - 按公众号缓存API客户端，LRU淘汰"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .api import WeChatAPI, AsyncWeChatAPI, get_wechat_api, get_async_wechat_api
+from .config import config
+
+
+class UnknownAccount(ValueError):
+    """工具参数指定了未配置的公众号"""
+
+
+class AccountPool:
+    """
+    公众号客户端池
+
+    默认公众号（WECHAT_APP_ID）使用全局客户端且不会被淘汰；WECHAT_ACCOUNTS 中的
+    公众号按需创建，最多保留 max_size 个，超出时淘汰最久未使用的。所有客户端共用
+    默认客户端的连接池和同一个线程池，token的single-flight和限流桶由TokenCache
+    按app_id维护，客户端被淘汰后重建不会重置。
+    """
+
+    def __init__(self, max_size: int = None):
+        """
+        Args:
+            max_size: 最多保留的客户端数（默认 WECHAT_ACCOUNT_POOL_SIZE）
+        """
+        self.max_size = max_size or config.account_pool_size
+        self._clients: "OrderedDict[str, Tuple[WeChatAPI, AsyncWeChatAPI]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, account: str = None) -> Tuple[str, str]:
+        """
+        把公众号名称或AppID解析为 (app_id, app_secret)
+
+        Raises:
+            UnknownAccount: 未配置该公众号
+        """
+        if not account or account == config.app_id:
+            return config.app_id, config.app_secret
+        accounts = config.accounts
+        if account in accounts:
+            return accounts[account]
+        for app_id, app_secret in accounts.values():
+            if app_id == account:
+                return app_id, app_secret
+        raise UnknownAccount(f"未配置的公众号: {account}（请在 WECHAT_ACCOUNTS 中添加）")
+
+    def get(self, account: str = None) -> WeChatAPI:
+        """获取公众号的同步客户端"""
+        return self._entry(account)[0]
+
+    def get_async(self, account: str = None) -> AsyncWeChatAPI:
+        """获取公众号的异步客户端"""
+        return self._entry(account)[1]
+
+    def _entry(self, account: str = None) -> Tuple[WeChatAPI, AsyncWeChatAPI]:
+        app_id, app_secret = self.resolve(account)
+        if app_id == config.app_id:
+            return get_wechat_api(), get_async_wechat_api()
+
+        with self._lock:
+            entry = self._clients.get(app_id)
+            if entry is not None:
+                self._clients.move_to_end(app_id)
+                return entry
+
+            default = get_async_wechat_api()
+            api = WeChatAPI(app_id, app_secret, transport=default._api._http)
+            entry = self._clients[app_id] = (api, AsyncWeChatAPI(api, executor=default._executor))
+            while len(self._clients) > self.max_size:
+                _, (evicted, _) = self._clients.popitem(last=False)
+                evicted.release()
+            return entry
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def metrics(self) -> Dict[str, Dict]:
+        """各公众号的调用统计"""
+        with self._lock:
+            clients = {app_id: api for app_id, (api, _) in self._clients.items()}
+        clients[config.app_id] = get_wechat_api()
+        return {app_id: api.metrics() for app_id, api in clients.items()}
+
+    def clear(self):
+        """释放所有额外公众号的客户端（共用的连接池不关闭）"""
+        with self._lock:
+            while self._clients:
+                _, (api, _) = self._clients.popitem()
+                api.release()
+
+
+# 全局客户端池
+_account_pool: Optional[AccountPool] = None
+
+
+def get_account_pool() -> AccountPool:
+    """获取全局AccountPool实例"""
+    global _account_pool
+    if _account_pool is None:
+        _account_pool = AccountPool()
+    return _account_pool
@@ -1,91 +1,272 @@
 """微信公众号API模块"""
-import requests
-from typing import Optional, Dict, Any
+import asyncio
+import functools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
 from pathlib import Path
 
 from .token_cache import get_token_cache
+from .media_cache import get_media_cache
+from .multipart import MediaSource, MediaFile
+from .content import rewrite_inline_images
+from .draft_catalog import get_draft_catalog, release_draft_catalog
+from .ratelimit import (
+    RequestMetrics,
+    RETRYABLE_ERRCODES,
+    TOKEN_INVALID_ERRCODES,
+    backoff_delay,
+    endpoint_family,
+)
+from .transport import HTTPTransport, Timeouts, TRANSPORT_ERRORS
 from .config import config
 
+# draft/add 文章支持的可选字段
+ARTICLE_FIELDS = ("author", "digest", "content_source_url", "need_open_comment", "only_fans_can_comment")
+
+
+def _decode_escaped(text: str) -> str:
+    """个别接口返回的文本是二次转义的 \\uXXXX，入库时解码一次"""
+    if "\\u" in text and text.isascii():
+        return text.encode().decode("unicode-escape")
+    return text
+
 
 class WeChatAPI:
     """微信公众号API封装"""
     
-    def __init__(self, app_id: str = None, app_secret: str = None):
+    def __init__(
+        self,
+        app_id: str = None,
+        app_secret: str = None,
+        pool_size: int = None,
+        timeouts: Timeouts = None,
+        transport: HTTPTransport = None
+    ):
+        """
+        Args:
+            app_id: 微信公众号AppID（默认读取配置）
+            app_secret: 微信公众号AppSecret（默认读取配置）
+            pool_size: keep-alive连接池大小（默认 WECHAT_HTTP_POOL_SIZE）
+            timeouts: 分阶段超时设置（默认读取配置）
+            transport: 复用已有的连接池（可选，传入时忽略pool_size/timeouts）
+        """
         self.app_id = app_id or config.app_id
         self.app_secret = app_secret or config.app_secret
         self._token_cache = get_token_cache()
+        self._media_cache = get_media_cache()
+        self._http = transport or HTTPTransport(pool_size=pool_size, timeouts=timeouts)
+        self._limiter = self._token_cache.rate_limiter(self.app_id)
+        self._metrics = RequestMetrics()
+        self.drafts = get_draft_catalog(self.app_id)
+        if config.token_auto_refresh and self.app_id and self.app_secret:
+            self._token_cache.start_refresher(self.app_id, self.app_secret, self._http)
     
     def _get_token(self) -> Optional[str]:
         """获取access_token"""
-        return self._token_cache.get_access_token(self.app_id, self.app_secret)
-    
-    def _request(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
-        """发起请求"""
-        resp = requests.request(method, url, **kwargs)
-        return resp.json()
-    
-    # ============ 素材管理 ============
+        return self._token_cache.get_access_token(self.app_id, self.app_secret, self._http)
     
-    def upload_image(self, image_path: str) -> Optional[str]:
+    def _request(self, method: str, path: str, params: Dict[str, Any] = None, **kwargs) -> Dict[str, Any]:
         """
-        上传图片获取永久素材media_id
+        调用微信接口，所有接口统一经过这里
+        
+        - 按接口族的令牌桶限流
+        - 系统繁忙、频率超限等错误码和网络异常按指数退避（带抖动）重试
+        - access_token失效时清除缓存并用新token重试一次
         
         Args:
-            image_path: 图片文件路径
+            method: HTTP方法
+            path: cgi-bin下的接口路径，如 draft/add
+            params: 额外的查询参数，access_token自动附加
+            **kwargs: json/data/headers/timeout，data为可回绕的流时每次重试前回到开头
             
         Returns:
-            media_id，失败返回None
+            响应JSON；无法获取token时返回 {"errcode": -2, "errmsg": ...}
+            
+        Raises:
+            重试耗尽后仍失败的网络异常
         """
-        token = self._get_token()
-        if not token:
-            return None
+        family = endpoint_family(path)
+        url = f"{config.api_base}/cgi-bin/{path}"
+        body = kwargs.get("data")
+        token_retried = False
+        attempt = 0
         
-        url = f"https://api.weixin.qq.com/cgi-bin/material/add_material?access_token={token}&type=image"
+        while True:
+            token = self._get_token()
+            if not token:
+                return {"errcode": -2, "errmsg": "获取access_token失败"}
+            
+            self._metrics.add(family, "throttled_seconds", self._limiter.acquire(family))
+            self._metrics.add(family, "requests")
+            if hasattr(body, "seek"):
+                body.seek(0)
+            
+            try:
+                resp = self._http.request(
+                    method, url, params={"access_token": token, **(params or {})}, **kwargs
+                )
+                # 手动解析JSON以正确处理Unicode
+                data = json.loads(resp.content.decode("utf-8"))
+            except TRANSPORT_ERRORS + (ValueError,):
+                if attempt >= config.max_retries:
+                    self._metrics.add(family, "errors")
+                    raise
+            else:
+                errcode = data.get("errcode", 0)
+                if errcode in TOKEN_INVALID_ERRCODES and not token_retried:
+                    token_retried = True
+                    self._metrics.add(family, "token_invalidations")
+                    self._token_cache.clear_cache(self.app_id, token)
+                    continue
+                if errcode not in RETRYABLE_ERRCODES or attempt >= config.max_retries:
+                    if errcode:
+                        self._metrics.add(family, "errors")
+                    return data
+            
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            self._metrics.add(family, "retries")
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        调用统计
         
+        Returns:
+            {"total": {...}, "<接口族>": {...}, "token_cache": {...}}，接口族计数包括
+            requests、retries、token_invalidations、errors、throttled_seconds
+        """
+        return {**self._metrics.snapshot(), "token_cache": self._token_cache.stats()}
+    
+    def release(self):
+        """停止后台刷新并释放草稿索引，连接池由其他客户端共用时使用（不关闭连接池）"""
+        self._token_cache.stop_refresher(self.app_id)
+        release_draft_catalog(self.app_id)
+    
+    def close(self):
+        """关闭连接池"""
+        self._http.close()
+    
+    # ============ 素材管理 ============
+    
+    def _upload_media(
+        self,
+        endpoint: str,
+        source: MediaSource,
+        filename: str,
+        kind: str,
+        action: str,
+        result_key: str = "media_id",
+        params: Dict[str, str] = None
+    ) -> Optional[str]:
+        """流式上传图片，内容相同且已上传过时直接复用上次的结果（media_id或url）"""
         try:
-            with open(image_path, "rb") as f:
-                resp = requests.post(url, files={"media": f}, timeout=30)
-                data = resp.json()
+            with MediaFile(source, filename) as media:
+                digest = media.digest()
+                cached = self._media_cache.get(self.app_id, digest, kind)
+                if cached:
+                    return cached
+                
+                body = media.multipart("media")
+                data = self._request("POST", endpoint, params=params, data=body, headers=body.headers())
                 
-                if "media_id" in data:
-                    return data["media_id"]
+                if result_key in data:
+                    self._media_cache.set(self.app_id, digest, data[result_key], kind)
+                    return data[result_key]
                 else:
-                    print(f"上传图片失败: {data}")
+                    print(f"{action}失败: {data}")
                     return None
         except Exception as e:
-            print(f"上传图片异常: {e}")
+            print(f"{action}异常: {e}")
             return None
     
-    def upload_temp_image(self, image_path: str) -> Optional[str]:
-        """上传临时素材"""
-        token = self._get_token()
-        if not token:
-            return None
+    def upload_image(self, image: MediaSource, filename: str = None) -> Optional[str]:
+        """
+        上传图片获取永久素材media_id
         
-        url = f"https://api.weixin.qq.com/cgi-bin/media/upload?access_token={token}&type=image"
+        Args:
+            image: 图片文件路径，或bytes/文件对象（如Base64Stream），内存数据不落盘直接流式上传
+            filename: 上传使用的文件名（可选，默认取路径文件名或按图片类型生成）
+            
+        Returns:
+            media_id，失败返回None
+        """
+        return self._upload_media(
+            "material/add_material", image, filename, "image", "上传图片", params={"type": "image"}
+        )
+    
+    def upload_temp_image(self, image: MediaSource, filename: str = None) -> Optional[str]:
+        """上传临时素材，参数同upload_image"""
+        return self._upload_media(
+            "media/upload", image, filename, "temp", "上传临时素材", params={"type": "image"}
+        )
+    
+    def upload_content_image(self, image: MediaSource, filename: str = None) -> Optional[str]:
+        """
+        上传图文消息内的图片（media/uploadimg），不占用素材库配额
         
-        try:
-            with open(image_path, "rb") as f:
-                resp = requests.post(url, files={"media": f}, timeout=30)
-                data = resp.json()
-                
-                if "media_id" in data:
-                    return data["media_id"]
-                else:
-                    print(f"上传临时素材失败: {data}")
-                    return None
-        except Exception as e:
-            print(f"上传临时素材异常: {e}")
-            return None
+        Args:
+            image: 同upload_image
+            filename: 同upload_image
+            
+        Returns:
+            可在正文中引用的图片URL，失败返回None
+        """
+        return self._upload_media(
+            "media/uploadimg", image, filename, "url", "上传正文图片", result_key="url"
+        )
+    
+    def upload_inline_images(self, content: str, base_dir: str = None) -> str:
+        """
+        并发上传正文中的本地/data URL图片，返回替换src后的HTML
+        
+        Args:
+            content: 文章HTML
+            base_dir: 图片相对路径的基准目录（可选）
+        """
+        return rewrite_inline_images(content, self.upload_content_image, base_dir)
     
     # ============ 草稿管理 ============
     
+    @staticmethod
+    def build_article(
+        title: str,
+        content: str,
+        thumb_media_id: str = None,
+        show_cover_pic: int = 0,
+        **fields
+    ) -> Dict[str, Any]:
+        """
+        组装draft/add的单篇文章
+        
+        Args:
+            fields: 其他微信支持的字段（author、digest、content_source_url等），值为None时忽略
+        """
+        article = {
+            "title": title,
+            "content": content,
+            "show_cover_pic": show_cover_pic,
+            "need_open_comment": 1,
+            "only_fans_can_comment": 0
+        }
+        
+        if thumb_media_id:
+            article["thumb_media_id"] = thumb_media_id
+        
+        for key in ARTICLE_FIELDS:
+            if fields.get(key) is not None:
+                article[key] = fields[key]
+        return article
+    
     def create_draft(
         self,
         title: str,
         content: str,
         thumb_media_id: str = None,
-        show_cover_pic: int = 0
+        show_cover_pic: int = 0,
+        upload_inline_images: bool = True,
+        base_dir: str = None
     ) -> Optional[str]:
         """
         创建草稿
@@ -95,32 +276,32 @@ class WeChatAPI:
             content: 内容 (HTML格式)
             thumb_media_id: 封面media_id
             show_cover_pic: 是否显示封面 (0/1)
+            upload_inline_images: 是否先并发上传正文中的本地/data URL图片并替换src
+            base_dir: 正文图片相对路径的基准目录（可选）
             
         Returns:
             media_id，失败返回None
         """
-        token = self._get_token()
-        if not token:
-            return None
-        
-        url = f"https://api.weixin.qq.com/cgi-bin/draft/add?access_token={token}"
+        if upload_inline_images:
+            content = self.upload_inline_images(content, base_dir)
         
-        article = {
-            "title": title,
-            "content": content,
-            "show_cover_pic": show_cover_pic,
-            "need_open_comment": 1,
-            "only_fans_can_comment": 0
-        }
-        
-        if thumb_media_id:
-            article["thumb_media_id"] = thumb_media_id
+        return self.create_multi_draft([self.build_article(title, content, thumb_media_id, show_cover_pic)])
+    
+    def create_multi_draft(self, articles: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        创建包含多篇文章的草稿（多图文）
         
+        Args:
+            articles: build_article组装好的文章列表，按顺序排列
+            
+        Returns:
+            media_id，失败返回None
+        """
         try:
-            resp = requests.post(url, json={"articles": [article]}, timeout=30)
-            data = resp.json()
+            data = self._request("POST", "draft/add", json={"articles": articles})
             
             if "media_id" in data:
+                self.drafts.upsert(data["media_id"], articles[0]["title"], articles[0].get("digest", ""))
                 return data["media_id"]
             else:
                 print(f"创建草稿失败: {data}")
@@ -129,75 +310,191 @@ class WeChatAPI:
             print(f"创建草稿异常: {e}")
             return None
     
-    def list_drafts(self, offset: int = 0, count: int = 20) -> list:
-        """列出草稿"""
-        token = self._get_token()
-        if not token:
-            return []
+    def create_drafts_bulk(
+        self,
+        articles: List[Dict[str, Any]],
+        max_concurrency: int = None,
+        base_dir: str = None
+    ) -> List[Dict[str, Any]]:
+        """
+        批量创建草稿，单篇失败不影响其他草稿
         
-        url = f"https://api.weixin.qq.com/cgi-bin/draft/batchget?access_token={token}"
+        Args:
+            articles: 文章列表，每项包含 title、content，可选 cover_image_path、thumb_media_id、
+                show_cover_pic、group 以及 build_article 支持的其他字段。
+                group 相同的文章按出现顺序合并为一个多图文草稿，未指定 group 的各自成稿。
+            max_concurrency: 同时进行的上传/创建数（默认 WECHAT_BULK_CONCURRENCY）
+            base_dir: 正文图片相对路径的基准目录（可选）
+            
+        Returns:
+            每个草稿一项：{"indices": 文章下标列表, "titles": 标题列表, "media_id": ..., "error": ...}
+        """
+        groups: Dict[Any, List[int]] = {}
+        for i, item in enumerate(articles):
+            key = item.get("group")
+            groups.setdefault(("group", key) if key is not None else ("single", i), []).append(i)
         
+        workers = max(1, min(max_concurrency or config.bulk_concurrency, len(articles)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wechat-bulk") as pool:
+            # 封面去重后并行上传
+            cover_paths = list(dict.fromkeys(
+                item["cover_image_path"] for item in articles
+                if not item.get("thumb_media_id") and item.get("cover_image_path")
+            ))
+            covers = dict(zip(cover_paths, pool.map(self.upload_image, cover_paths)))
+            
+            def create_group(indices: List[int]) -> Dict[str, Any]:
+                result = {
+                    "indices": indices,
+                    "titles": [articles[i].get("title", "") for i in indices],
+                    "media_id": None,
+                    "error": None
+                }
+                try:
+                    group_articles = []
+                    for i in indices:
+                        item = dict(articles[i])
+                        thumb_media_id = item.pop("thumb_media_id", None)
+                        cover_path = item.pop("cover_image_path", None)
+                        if not thumb_media_id and cover_path:
+                            thumb_media_id = covers.get(cover_path)
+                            if not thumb_media_id:
+                                result["error"] = f"封面上传失败: {cover_path}"
+                                return result
+                        content = self.upload_inline_images(item.pop("content", ""), base_dir)
+                        group_articles.append(self.build_article(
+                            item.pop("title", ""),
+                            content,
+                            thumb_media_id,
+                            item.pop("show_cover_pic", 0),
+                            **item
+                        ))
+                    result["media_id"] = self.create_multi_draft(group_articles)
+                    if not result["media_id"]:
+                        result["error"] = "创建草稿失败"
+                except Exception as e:
+                    result["error"] = str(e)
+                return result
+            
+            return list(pool.map(create_group, groups.values()))
+    
+    def list_drafts(self, offset: int = 0, count: int = 20) -> list:
+        """从微信拉取一页草稿（不含正文）"""
+        return self._fetch_drafts(offset, count) or []
+    
+    def _fetch_drafts(self, offset: int, count: int) -> Optional[list]:
+        """拉取一页草稿，失败返回None以便与空列表区分"""
         try:
-            resp = requests.post(url, json={"offset": offset, "count": count}, timeout=30)
-            # 手动解析JSON以正确处理Unicode
-            import json
-            data = json.loads(resp.content.decode('utf-8'))
+            data = self._request(
+                "POST", "draft/batchget", json={"offset": offset, "count": count, "no_content": 1}
+            )
             
             if "item" in data:
                 result = []
                 for item in data["item"]:
-                    title = item.get("content", {}).get("news_item", [{}])[0].get("title", "")
-                    # 确保title是正常的unicode字符串
-                    if isinstance(title, str):
-                        title = title.encode().decode('unicode-escape')
+                    news = item.get("content", {}).get("news_item", [{}])[0]
                     result.append({
                         "media_id": item.get("media_id"),
-                        "title": title,
+                        "title": _decode_escaped(news.get("title", "")),
+                        "digest": _decode_escaped(news.get("digest", "")),
                         "update_time": item.get("update_time", 0)
                     })
                 return result
-            return []
+            print(f"获取草稿列表失败: {data}")
+            return None
         except Exception as e:
             print(f"获取草稿列表异常: {e}")
-            return []
+            return None
     
-    def delete_draft(self, media_id: str) -> bool:
-        """删除草稿"""
-        token = self._get_token()
-        if not token:
-            return False
+    # ============ 草稿索引 ============
+    
+    def sync_drafts(self, full: bool = False) -> int:
+        """
+        同步本地草稿索引
         
-        url = f"https://api.weixin.qq.com/cgi-bin/draft/delete?access_token={token}"
+        Args:
+            full: 是否全量同步（默认增量，遇到已索引的草稿即停止翻页）
+            
+        Returns:
+            新增或更新的草稿数
+        """
+        return self.drafts.sync(self._fetch_drafts, full)
+    
+    def _ensure_drafts(self, refresh: bool):
+        if refresh:
+            self.sync_drafts(full=True)
+        elif self.drafts.is_stale():
+            self.sync_drafts()
+    
+    def list_cached_drafts(self, offset: int = 0, count: int = 20, refresh: bool = False) -> list:
+        """
+        从本地索引列出草稿（按更新时间倒序）
         
+        Args:
+            offset: 分页偏移
+            count: 每页数量
+            refresh: 是否先全量同步（默认仅在索引超过 WECHAT_DRAFT_CATALOG_TTL 时增量同步）
+        """
+        self._ensure_drafts(refresh)
+        return self.drafts.list(offset, count)
+    
+    def search_drafts(self, query: str, limit: int = 20, refresh: bool = False) -> list:
+        """按标题/摘要搜索本地索引中的草稿，参数同list_cached_drafts"""
+        self._ensure_drafts(refresh)
+        return self.drafts.search(query, limit)
+    
+    def delete_draft(self, media_id: str) -> bool:
+        """删除草稿"""
         try:
-            resp = requests.post(url, json={"media_id": media_id}, timeout=30)
-            data = resp.json()
-            return data.get("errcode", -1) == 0
+            data = self._request("POST", "draft/delete", json={"media_id": media_id})
+            if data.get("errcode", -1) == 0:
+                self.drafts.remove(media_id)
+                return True
+            return False
         except Exception as e:
             print(f"删除草稿异常: {e}")
             return False
     
     # ============ 发布管理 ============
     
-    def publish_draft(self, media_id: str) -> bool:
+    def submit_publish(self, media_id: str) -> Dict[str, Any]:
         """
-        发布草稿
+        提交发布任务（freepublish/submit）
+        
+        提交成功只表示进入微信的发布流程，最终结果需用 publish_id 查询。
         
         Args:
             media_id: 草稿media_id
             
         Returns:
-            是否成功
+            接口返回，成功时包含 publish_id
         """
-        token = self._get_token()
-        if not token:
-            return False
+        data = self._request("POST", "freepublish/submit", json={"media_id": media_id})
+        if data.get("errcode", -1) == 0:
+            self.drafts.mark_published(media_id)
+        return data
+    
+    def get_publish_status(self, publish_id: str) -> Dict[str, Any]:
+        """
+        查询发布状态（freepublish/get）
         
-        url = f"https://api.weixin.qq.com/cgi-bin/freepublish/submit?access_token={token}"
+        Returns:
+            接口返回，publish_status 含义见 publish_queue.PUBLISH_STATUS
+        """
+        return self._request("POST", "freepublish/get", json={"publish_id": publish_id})
+    
+    def publish_draft(self, media_id: str) -> bool:
+        """
+        发布草稿
         
+        Args:
+            media_id: 草稿media_id
+            
+        Returns:
+            是否提交成功
+        """
         try:
-            resp = requests.post(url, json={"media_id": media_id}, timeout=30)
-            data = resp.json()
+            data = self.submit_publish(media_id)
             
             if data.get("errcode", -1) == 0:
                 return True
@@ -219,3 +516,121 @@ def get_wechat_api() -> WeChatAPI:
     if _api_instance is None:
         _api_instance = WeChatAPI()
     return _api_instance
+
+
+class AsyncWeChatAPI:
+    """
+    WeChatAPI的异步版本
+
+    阻塞调用放到独立线程池执行（线程数与连接池大小一致），
+    FastMCP工具可以直接await，不会阻塞服务器事件循环。
+    """
+    
+    def __init__(self, api: WeChatAPI = None, max_workers: int = None, executor: ThreadPoolExecutor = None):
+        """
+        Args:
+            api: 同步客户端（可选，默认读取配置新建）
+            max_workers: 线程数（默认与连接池大小一致）
+            executor: 多个客户端共用的线程池（可选，传入时close不会关闭它）
+        """
+        self._api = api or WeChatAPI()
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers or self._api._http.pool_size,
+            thread_name_prefix="wechat-api"
+        )
+    
+    @property
+    def app_id(self) -> str:
+        return self._api.app_id
+    
+    def metrics(self) -> Dict[str, Any]:
+        return self._api.metrics()
+    
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def upload_image(self, image: MediaSource, filename: str = None) -> Optional[str]:
+        return await self._run(self._api.upload_image, image, filename)
+    
+    async def upload_temp_image(self, image: MediaSource, filename: str = None) -> Optional[str]:
+        return await self._run(self._api.upload_temp_image, image, filename)
+    
+    async def upload_content_image(self, image: MediaSource, filename: str = None) -> Optional[str]:
+        return await self._run(self._api.upload_content_image, image, filename)
+    
+    async def upload_inline_images(self, content: str, base_dir: str = None) -> str:
+        return await self._run(self._api.upload_inline_images, content, base_dir)
+    
+    async def create_draft(
+        self,
+        title: str,
+        content: str,
+        thumb_media_id: str = None,
+        show_cover_pic: int = 0,
+        upload_inline_images: bool = True,
+        base_dir: str = None
+    ) -> Optional[str]:
+        return await self._run(
+            self._api.create_draft,
+            title,
+            content,
+            thumb_media_id,
+            show_cover_pic,
+            upload_inline_images,
+            base_dir
+        )
+    
+    async def create_multi_draft(self, articles: List[Dict[str, Any]]) -> Optional[str]:
+        return await self._run(self._api.create_multi_draft, articles)
+    
+    async def create_drafts_bulk(
+        self,
+        articles: List[Dict[str, Any]],
+        max_concurrency: int = None,
+        base_dir: str = None
+    ) -> List[Dict[str, Any]]:
+        return await self._run(self._api.create_drafts_bulk, articles, max_concurrency, base_dir)
+    
+    async def list_drafts(self, offset: int = 0, count: int = 20) -> list:
+        return await self._run(self._api.list_drafts, offset, count)
+    
+    async def sync_drafts(self, full: bool = False) -> int:
+        return await self._run(self._api.sync_drafts, full)
+    
+    async def list_cached_drafts(self, offset: int = 0, count: int = 20, refresh: bool = False) -> list:
+        return await self._run(self._api.list_cached_drafts, offset, count, refresh)
+    
+    async def search_drafts(self, query: str, limit: int = 20, refresh: bool = False) -> list:
+        return await self._run(self._api.search_drafts, query, limit, refresh)
+    
+    async def delete_draft(self, media_id: str) -> bool:
+        return await self._run(self._api.delete_draft, media_id)
+    
+    async def submit_publish(self, media_id: str) -> Dict[str, Any]:
+        return await self._run(self._api.submit_publish, media_id)
+    
+    async def get_publish_status(self, publish_id: str) -> Dict[str, Any]:
+        return await self._run(self._api.get_publish_status, publish_id)
+    
+    async def publish_draft(self, media_id: str) -> bool:
+        return await self._run(self._api.publish_draft, media_id)
+    
+    def close(self):
+        """关闭线程池和连接池"""
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+        self._api.close()
+
+
+# 全局异步API实例
+_async_api_instance: Optional[AsyncWeChatAPI] = None
+
+
+def get_async_wechat_api() -> AsyncWeChatAPI:
+    """获取全局AsyncWeChatAPI实例（与get_wechat_api共享连接池）"""
+    global _async_api_instance
+    if _async_api_instance is None:
+        _async_api_instance = AsyncWeChatAPI(get_wechat_api())
+    return _async_api_instance
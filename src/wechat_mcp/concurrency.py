@@ -0,0 +1,26 @@
+"""工具并发限制 - 按 WECHAT_TOOL_LIMITS 为每个工具创建并发闸门，实现见 mcp4agent.concurrency"""
+from mcp4agent.concurrency import LimiterRegistry, Limits, ToolBusy, ToolLimiter, parse_tool_limits
+
+from .config import config
+
+# 工具名 -> 默认并发数
+DEFAULT_LIMITS = {
+    "upload_image": 4,
+    "create_draft": 4,
+    "create_drafts_bulk": 1,
+    "publish_draft": 4,
+    "wait_for_publish": 8,
+}
+
+
+def _limits() -> Limits:
+    return parse_tool_limits(config.tool_limits, DEFAULT_LIMITS, config.tool_max_wait)
+
+
+_registry = LimiterRegistry(_limits, lambda: config.tool_max_wait)
+
+get_limiter = _registry.get
+limiter_stats = _registry.stats
+limited = _registry.limited
+
+__all__ = ["ToolBusy", "ToolLimiter", "get_limiter", "limiter_stats", "limited"]
@@ -16,11 +16,157 @@ class Config:
     def app_secret(self) -> str:
         return os.getenv("WECHAT_APP_SECRET", "")
     
+    @property
+    def accounts(self) -> dict:
+        """
+        额外的公众号，格式: name:app_id:app_secret,name2:app_id2:app_secret2
+
+        工具的 account 参数可以传名称或AppID；不传时使用 WECHAT_APP_ID。
+        """
+        accounts = {}
+        for item in os.getenv("WECHAT_ACCOUNTS", "").split(","):
+            parts = [part.strip() for part in item.split(":")]
+            if len(parts) == 3 and all(parts):
+                accounts[parts[0]] = (parts[1], parts[2])
+        return accounts
+
+    @property
+    def account_pool_size(self) -> int:
+        """同时保留的公众号客户端数，超出时淘汰最久未使用的"""
+        return int(os.getenv("WECHAT_ACCOUNT_POOL_SIZE", "128"))
+
+    @property
+    def api_base(self) -> str:
+        """微信API地址，可指向本地替身服务用于测试和压测"""
+        return os.getenv("WECHAT_API_BASE", "https://api.weixin.qq.com").rstrip("/")
+
     @property
     def token_cache_dir(self) -> str:
         default_cache = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".cache", "wechat-mcp")
         return os.getenv("WECHAT_TOKEN_CACHE_DIR", default_cache)
-    
+
+    @property
+    def token_auto_refresh(self) -> bool:
+        """是否在后台提前续期access_token"""
+        return os.getenv("WECHAT_TOKEN_AUTO_REFRESH", "1").lower() in ("1", "true", "yes")
+
+    @property
+    def token_refresh_ahead(self) -> float:
+        """距离过期多少秒时后台续期"""
+        return float(os.getenv("WECHAT_TOKEN_REFRESH_AHEAD", "300"))
+
+    @property
+    def token_l1_check_interval(self) -> float:
+        """进程内token缓存校验L2版本的间隔（秒）"""
+        return float(os.getenv("WECHAT_TOKEN_L1_CHECK_INTERVAL", "1"))
+
+    @property
+    def media_cache_size_mb(self) -> int:
+        """素材media_id缓存的容量上限（MB），超出后按LRU淘汰"""
+        return int(os.getenv("WECHAT_MEDIA_CACHE_SIZE_MB", "16"))
+
+    @property
+    def inline_image_workers(self) -> int:
+        """创建草稿时并发上传正文图片的线程数"""
+        return int(os.getenv("WECHAT_INLINE_IMAGE_WORKERS", "16"))
+
+    @property
+    def bulk_concurrency(self) -> int:
+        """批量创建草稿时同时进行的上传/创建数"""
+        return int(os.getenv("WECHAT_BULK_CONCURRENCY", "4"))
+
+    @property
+    def draft_catalog_ttl(self) -> float:
+        """本地草稿索引超过该秒数未同步时，查询前先增量同步"""
+        return float(os.getenv("WECHAT_DRAFT_CATALOG_TTL", "600"))
+
+    @property
+    def publish_poll_min_interval(self) -> float:
+        """提交发布后首次查询状态的等待秒数，之后每次翻倍"""
+        return float(os.getenv("WECHAT_PUBLISH_POLL_MIN_INTERVAL", "2"))
+
+    @property
+    def publish_poll_max_interval(self) -> float:
+        """发布状态查询间隔上限（秒）"""
+        return float(os.getenv("WECHAT_PUBLISH_POLL_MAX_INTERVAL", "60"))
+
+    @property
+    def publish_poll_workers(self) -> int:
+        """发布队列同时进行的提交/查询数"""
+        return int(os.getenv("WECHAT_PUBLISH_POLL_WORKERS", "4"))
+
+    @property
+    def max_retries(self) -> int:
+        """可重试错误（系统繁忙、频率超限、网络异常）的最大重试次数"""
+        return int(os.getenv("WECHAT_MAX_RETRIES", "3"))
+
+    @property
+    def retry_base_delay(self) -> float:
+        return float(os.getenv("WECHAT_RETRY_BASE_DELAY", "0.5"))
+
+    @property
+    def retry_max_delay(self) -> float:
+        return float(os.getenv("WECHAT_RETRY_MAX_DELAY", "8"))
+
+    @property
+    def rate_limits(self) -> dict:
+        """
+        覆盖接口族限流参数，格式: material=5:10,draft=10:20（每秒速率:突发容量）
+        """
+        limits = {}
+        for item in os.getenv("WECHAT_RATE_LIMITS", "").split(","):
+            if "=" in item:
+                family, value = item.split("=", 1)
+                rate, _, burst = value.partition(":")
+                limits[family.strip()] = (float(rate), int(burst or max(1, float(rate))))
+        return limits
+
+    @property
+    def http_pool_size(self) -> int:
+        """每个主机保持的keep-alive连接数"""
+        return int(os.getenv("WECHAT_HTTP_POOL_SIZE", "16"))
+
+    @property
+    def http_connect_timeout(self) -> float:
+        return float(os.getenv("WECHAT_HTTP_CONNECT_TIMEOUT", "5"))
+
+    @property
+    def http_read_timeout(self) -> float:
+        return float(os.getenv("WECHAT_HTTP_READ_TIMEOUT", "30"))
+
+    @property
+    def http_write_timeout(self) -> float:
+        return float(os.getenv("WECHAT_HTTP_WRITE_TIMEOUT", "30"))
+
+    @property
+    def http_pool_timeout(self) -> float:
+        """等待空闲连接的超时"""
+        return float(os.getenv("WECHAT_HTTP_POOL_TIMEOUT", "10"))
+
+    @property
+    def http2(self) -> bool:
+        """是否启用HTTP/2（需要安装 httpx[http2]）"""
+        return os.getenv("WECHAT_HTTP2", "1").lower() in ("1", "true", "yes")
+
+    @property
+    def tool_limits(self) -> str:
+        """
+        各工具同时执行的调用数和最长排队秒数，格式: upload_image=4:30,create_draft=4（并发数:排队秒数）
+
+        覆盖默认值（见 concurrency.DEFAULT_LIMITS）；并发数为0表示不限制，未列出的工具不限制。
+        """
+        return os.getenv("WECHAT_TOOL_LIMITS", "")
+
+    @property
+    def tool_max_wait(self) -> float:
+        """受限工具排队的默认最长秒数，超过后返回繁忙"""
+        return float(os.getenv("WECHAT_TOOL_MAX_WAIT", "30"))
+
+    @property
+    def local_workers(self) -> int:
+        """读写本地发布任务表、等待发布状态的线程数"""
+        return int(os.getenv("WECHAT_LOCAL_WORKERS", "16"))
+
     def validate(self) -> bool:
         """验证配置是否完整"""
         return bool(self.app_id and self.app_secret)
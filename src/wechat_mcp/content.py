@@ -0,0 +1,99 @@
+"""文章内容处理模块 - 上传正文中的本地/内嵌图片并改写src"""
+import html
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+from .config import config
+from .multipart import Base64Stream
+
+# <img ... src="..."> 中src属性值的位置，支持双引号、单引号和无引号写法
+_IMG_SRC = re.compile(
+    r"""<img\b[^>]*?\ssrc\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""",
+    re.IGNORECASE
+)
+
+
+def iter_image_srcs(content: str) -> Iterator[Tuple[int, int, str]]:
+    """
+    逐个扫描正文中的<img>标签
+
+    Yields:
+        (src值起始位置, src值结束位置, 反转义后的src)
+    """
+    for match in _IMG_SRC.finditer(content):
+        group = next(i for i in (1, 2, 3) if match.group(i) is not None)
+        yield match.start(group), match.end(group), html.unescape(match.group(group))
+
+
+def resolve_image_source(src: str, base_dir: str = None) -> Optional[Union[str, Base64Stream]]:
+    """
+    把src转换为可上传的图片来源
+
+    Args:
+        src: img标签的src
+        base_dir: 相对路径的基准目录（可选，默认当前目录）
+
+    Returns:
+        本地文件路径或Base64Stream；远程图片等无需上传时返回None
+    """
+    if src.startswith("data:"):
+        header = src[:src.find(",")]
+        return Base64Stream(src) if header.endswith(";base64") else None
+    if src.startswith("file://"):
+        src = unquote(urlparse(src).path)
+    elif not os.path.isabs(src) and (urlparse(src).scheme or src.startswith("//")):
+        return None
+
+    path = os.path.join(base_dir, src) if base_dir and not os.path.isabs(src) else src
+    return path if os.path.isfile(path) else None
+
+
+def rewrite_inline_images(
+    content: str,
+    upload: Callable[[Union[str, Base64Stream]], Optional[str]],
+    base_dir: str = None,
+    max_workers: int = None
+) -> str:
+    """
+    并发上传正文中的本地和data URL图片，一次拼接完成src替换
+
+    Args:
+        content: 文章HTML
+        upload: 上传函数，返回图片URL，失败返回None（如 WeChatAPI.upload_content_image）
+        base_dir: 相对路径的基准目录（可选）
+        max_workers: 并发上传数（默认 WECHAT_INLINE_IMAGE_WORKERS）
+
+    Returns:
+        替换后的HTML，上传失败的图片保留原src
+    """
+    spans = []
+    sources = {}  # 去重：相同src只上传一次
+    for start, end, src in iter_image_srcs(content):
+        if src not in sources:
+            sources[src] = resolve_image_source(src, base_dir)
+        if sources[src] is not None:
+            spans.append((start, end, src))
+
+    if not spans:
+        return content
+
+    pending = {src: source for src, source in sources.items() if source is not None}
+    workers = min(max_workers or config.inline_image_workers, len(pending))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wechat-inline-img") as pool:
+        urls = dict(zip(pending, pool.map(upload, pending.values())))
+
+    parts = []
+    last = 0
+    for start, end, src in spans:
+        url = urls.get(src)
+        if not url:
+            print(f"正文图片上传失败，保留原地址: {src[:80]}")
+            continue
+        parts.append(content[last:start])
+        parts.append(html.escape(url))
+        last = end
+    parts.append(content[last:])
+    return "".join(parts)
@@ -0,0 +1,236 @@
+"""草稿索引模块 - 本地保存草稿列表，增量同步"""
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import diskcache as dc
+
+from .config import config
+
+# draft/batchget 单页上限
+PAGE_SIZE = 20
+
+_store: Optional[dc.Cache] = None
+_catalogs: Dict[str, "DraftCatalog"] = {}
+_catalogs_guard = threading.Lock()
+
+
+def _get_store() -> dc.Cache:
+    """草稿索引与token共用缓存目录，存放在 drafts/ 子目录"""
+    global _store
+    if _store is None:
+        _store = dc.Cache(Path(config.token_cache_dir) / "drafts")
+    return _store
+
+
+class DraftCatalog:
+    """
+    单个公众号的草稿索引
+
+    条目为 {media_id, title, digest, update_time}，常驻内存并写回diskcache；
+    查询不访问网络和磁盘，create/delete/publish 时就地更新。每个草稿单独一个键，
+    创建、删除只写一条记录。
+    """
+
+    def __init__(self, app_id: str):
+        self.app_id = app_id
+        self._key = f"drafts_{app_id}"
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        # 同步期间在本地创建、删除或修改过的草稿，合并同步结果时以本地为准
+        self._touched: Optional[Set[str]] = None
+        self._sorted: Optional[List[Dict]] = None
+        self._items: Dict[str, Dict] = {}
+        self.synced_at: float = 0
+        self._load()
+
+    # ============ 存储 ============
+
+    def _entry_key(self, media_id: str) -> tuple:
+        return ("draft", self.app_id, media_id)
+
+    def _load(self):
+        store = _get_store()
+        meta = store.get(self._key) or {}
+        self.synced_at = meta.get("synced_at", 0)
+        for key in store.iterkeys():
+            if isinstance(key, tuple) and key[:2] == ("draft", self.app_id):
+                item = store.get(key)
+                if item:
+                    self._items[item["media_id"]] = item
+
+    def _write(self, items: Iterable[Dict] = (), removed: Iterable[str] = (), meta: bool = False):
+        """写入变更的条目、删除条目，meta=True 时同时写入同步时间，在一个事务中完成"""
+        self._sorted = None
+        store = _get_store()
+        with store.transact():
+            for item in items:
+                store.set(self._entry_key(item["media_id"]), item)
+            for media_id in removed:
+                store.delete(self._entry_key(media_id))
+            if meta:
+                store.set(self._key, {"synced_at": self.synced_at})
+
+    def _touch(self, media_id: str):
+        if self._touched is not None:
+            self._touched.add(media_id)
+
+    # ============ 查询 ============
+
+    def _ordered(self) -> List[Dict]:
+        """按update_time从新到旧排序的视图，变更后重建"""
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(self._items.values(), key=lambda d: d["update_time"], reverse=True)
+            return self._sorted
+
+    def list(self, offset: int = 0, count: int = 20) -> List[Dict]:
+        return self._ordered()[offset:offset + count]
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """标题/摘要包含query（不区分大小写）的草稿"""
+        query = query.lower()
+        result = []
+        for item in self._ordered():
+            if query in item["title"].lower() or query in item.get("digest", "").lower():
+                result.append(item)
+                if len(result) >= limit:
+                    break
+        return result
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def is_stale(self) -> bool:
+        return time.time() - self.synced_at > config.draft_catalog_ttl
+
+    # ============ 同步 ============
+
+    def sync(self, fetch_page: Callable[[int, int], Optional[List[Dict]]], full: bool = False) -> int:
+        """
+        从微信同步草稿列表
+
+        draft/batchget 按更新时间从新到旧返回。增量同步遇到 media_id 和 update_time
+        都已在索引中的草稿即停止；full=True 时遍历全部分页并剔除远端已删除的草稿。
+        翻页时不持有索引锁，查询不会等待网络；拉取完成后一次性合并。
+
+        Args:
+            fetch_page: (offset, count) -> 草稿列表，失败返回None（如 WeChatAPI.list_drafts）
+            full: 是否全量同步
+
+        Returns:
+            新增或更新的草稿数
+        """
+        with self._sync_lock:
+            with self._lock:
+                self._touched = set()
+            try:
+                fetched, complete = self._fetch(fetch_page, full)
+                with self._lock:
+                    return self._merge(fetched, full and complete, complete)
+            finally:
+                with self._lock:
+                    self._touched = None
+
+    def _fetch(self, fetch_page: Callable[[int, int], Optional[List[Dict]]], full: bool) -> Tuple[List[Dict], bool]:
+        """逐页拉取，返回 (拉取到的草稿, 是否完整)"""
+        fetched = []
+        offset = 0
+        while True:
+            page = fetch_page(offset, PAGE_SIZE)
+            if page is None:
+                # 请求失败时不标记为已同步，下次查询重试
+                return fetched, False
+            fetched.extend(page)
+            reached_known = False
+            for item in page:
+                known = self._items.get(item["media_id"])
+                if known and not known.get("provisional") and known["update_time"] == item["update_time"]:
+                    reached_known = True
+                    break
+            if len(page) < PAGE_SIZE or (reached_known and not full):
+                return fetched, True
+            offset += PAGE_SIZE
+
+    def _merge(self, fetched: List[Dict], prune: bool, complete: bool) -> int:
+        touched = self._touched or set()
+        changed = []
+        seen = set()
+        for item in fetched:
+            media_id = item["media_id"]
+            seen.add(media_id)
+            known = self._items.get(media_id)
+            if media_id in touched or (
+                known and not known.get("provisional") and known["update_time"] == item["update_time"]
+            ):
+                continue
+            entry = {**(known or {}), **item}
+            entry.pop("provisional", None)
+            self._items[media_id] = entry
+            changed.append(entry)
+
+        removed = []
+        if prune:
+            # 本地新建、尚未被微信列表确认的草稿不剔除
+            removed = [
+                media_id for media_id, item in self._items.items()
+                if media_id not in seen and media_id not in touched and not item.get("provisional")
+            ]
+            for media_id in removed:
+                del self._items[media_id]
+        if complete:
+            self.synced_at = time.time()
+        if changed or removed or complete:
+            self._write(changed, removed, complete)
+        return len(changed)
+
+    # ============ 就地更新 ============
+
+    def upsert(self, media_id: str, title: str, digest: str = "", update_time: int = None):
+        """
+        新建或更新草稿条目
+
+        不传 update_time 时用本地时间排序并标记为临时条目，下次同步以微信返回的
+        update_time 覆盖（本地时钟与微信的时间不可比较）。
+        """
+        with self._lock:
+            item = {
+                "media_id": media_id,
+                "title": title,
+                "digest": digest or "",
+                "update_time": update_time or int(time.time())
+            }
+            if update_time is None:
+                item["provisional"] = True
+            self._items[media_id] = item
+            self._touch(media_id)
+            self._write([item])
+
+    def mark_published(self, media_id: str):
+        """记录已提交发布，下次全量同步时按微信侧状态校正"""
+        with self._lock:
+            if media_id in self._items:
+                item = self._items[media_id] = {**self._items[media_id], "published_at": int(time.time())}
+                self._touch(media_id)
+                self._write([item])
+
+    def remove(self, media_id: str):
+        with self._lock:
+            self._touch(media_id)
+            if self._items.pop(media_id, None) is not None:
+                self._write(removed=[media_id])
+
+
+def get_draft_catalog(app_id: str) -> DraftCatalog:
+    """获取公众号对应的DraftCatalog实例"""
+    with _catalogs_guard:
+        catalog = _catalogs.get(app_id)
+        if catalog is None:
+            catalog = _catalogs[app_id] = DraftCatalog(app_id)
+        return catalog
+
+
+def release_draft_catalog(app_id: str):
+    """释放公众号的内存索引（已写回diskcache），下次使用时重新加载"""
+    with _catalogs_guard:
+        _catalogs.pop(app_id, None)
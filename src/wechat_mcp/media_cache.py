@@ -0,0 +1,106 @@
+"""素材缓存模块 - 按内容哈希复用已上传的media_id"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, BinaryIO
+import diskcache as dc
+
+from .config import config
+
+# 临时素材在微信侧保存3天，预留1小时余量
+TEMP_MEDIA_TTL = 3 * 24 * 3600 - 3600
+
+
+class MediaCache:
+    """
+    内容哈希 -> media_id 索引
+
+    与TokenCache共用缓存目录，存放在其下的 media/ 子目录：diskcache的淘汰策略和
+    容量上限是按目录生效的，单独的子目录可以按LRU淘汰素材而不影响token。
+    """
+
+    def __init__(self, directory: str = None):
+        self._cache_dir = Path(directory or config.token_cache_dir) / "media"
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache = dc.Cache(
+            self._cache_dir,
+            eviction_policy="least-recently-used",
+            size_limit=config.media_cache_size_mb * 1024 * 1024
+        )
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        """分块计算文件的sha256"""
+        with open(path, "rb") as f:
+            return MediaCache.hash_stream(f, size=os.fstat(f.fileno()).st_size)
+
+    @staticmethod
+    def hash_stream(stream: BinaryIO, size: int = None, chunk_size: int = 64 * 1024) -> str:
+        """
+        从当前位置读到结尾计算sha256，复用同一块缓冲区
+
+        Args:
+            size: 剩余字节数（可选），已知时缓冲区不超过它，小图片不会分配整块缓冲区
+            chunk_size: 缓冲区上限
+        """
+        h = hashlib.sha256()
+        if size is not None:
+            chunk_size = max(1, min(chunk_size, size))
+        view = memoryview(bytearray(chunk_size))
+        while True:
+            n = stream.readinto(view)
+            if not n:
+                break
+            h.update(view[:n])
+        return h.hexdigest()
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def _key(app_id: str, digest: str, kind: str) -> str:
+        # media_id只在所属公众号内有效
+        return f"{kind}_{app_id}_{digest}"
+
+    def get(self, app_id: str, digest: str, kind: str = "image") -> Optional[str]:
+        """
+        查询已上传的素材
+
+        Args:
+            app_id: 微信公众号AppID
+            digest: 内容sha256
+            kind: image（永久素材）/ temp（临时素材）
+
+        Returns:
+            media_id，未命中返回None
+        """
+        return self._cache.get(self._key(app_id, digest, kind))
+
+    def set(self, app_id: str, digest: str, media_id: str, kind: str = "image"):
+        """记录上传结果，临时素材按微信的有效期过期"""
+        expire = TEMP_MEDIA_TTL if kind == "temp" else None
+        self._cache.set(self._key(app_id, digest, kind), media_id, expire=expire)
+
+    def delete(self, app_id: str, digest: str, kind: str = "image"):
+        self._cache.delete(self._key(app_id, digest, kind))
+
+    def clear(self):
+        """清除缓存"""
+        self._cache.clear()
+
+    def close(self):
+        """关闭缓存"""
+        self._cache.close()
+
+
+# 全局缓存实例
+_media_cache: Optional[MediaCache] = None
+
+
+def get_media_cache() -> MediaCache:
+    """获取全局MediaCache实例"""
+    global _media_cache
+    if _media_cache is None:
+        _media_cache = MediaCache()
+    return _media_cache
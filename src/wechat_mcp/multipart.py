@@ -0,0 +1,283 @@
+"""流式multipart模块 - 图片不落盘、不整体复制，边读边发送"""
+import io
+import os
+import binascii
+import mimetypes
+import uuid
+from typing import Optional, Union, BinaryIO, Dict
+
+from .media_cache import MediaCache
+
+# 上传接口接受的图片来源：文件路径、内存数据或可读的文件对象
+MediaSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+_WHITESPACE = " \t\r\n"
+_STRIP_WHITESPACE = str.maketrans("", "", _WHITESPACE)
+
+# 文件头 -> (扩展名, MIME类型)
+_IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", ".jpg", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", ".png", "image/png"),
+    (b"GIF87a", ".gif", "image/gif"),
+    (b"GIF89a", ".gif", "image/gif"),
+    (b"BM", ".bmp", "image/bmp"),
+]
+
+
+class BufferStream(io.RawIOBase):
+    """基于memoryview的只读流，读取时不复制底层数据"""
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+        self.size = len(self._view)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        out = memoryview(b).cast("B")
+        n = min(len(out), self.size - self._pos)
+        out[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self.size}[whence]
+        self._pos = min(max(base + offset, 0), self.size)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+class Base64Stream(io.RawIOBase):
+    """
+    增量解码base64文本的只读流
+
+    每次只解码 chunk_size 个字符，内存占用与图片大小无关；
+    支持回到开头重新读取（计算哈希后再上传、失败重试）。
+    """
+
+    def __init__(self, text: str, start: int = 0, chunk_size: int = 64 * 1024):
+        """
+        Args:
+            text: base64文本，可以带 data URL 等前缀（data:image/png;base64,...）
+            start: 从该位置开始解码（可选，默认跳过第一个逗号及之前的前缀；base64字符中没有逗号）
+            chunk_size: 每次解码的字符数
+        """
+        if start == 0:
+            start = text.find(",") + 1
+        self._text = text
+        self._start = start
+        self._chunk_size = chunk_size - chunk_size % 4
+        self.size = self._decoded_size()
+        self.seek(0)
+
+    def _decoded_size(self) -> int:
+        """不复制文本，计算解码后的字节数"""
+        text, start = self._text, self._start
+        chars = len(text) - start - sum(text.count(c, start) for c in _WHITESPACE)
+        end = len(text)
+        while end > start and text[end - 1] in _WHITESPACE:
+            end -= 1
+        padding = 0
+        if end - start >= 2:
+            padding = (text[end - 1] == "=") + (text[end - 2] == "=")
+        return chars * 3 // 4 - padding
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR and offset == 0:
+            return self._pos
+        if whence == io.SEEK_END and offset == 0:
+            raise io.UnsupportedOperation("大小请读取 size 属性")
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("只支持回到开头")
+        self._src = self._start
+        self._carry = ""
+        self._buf = memoryview(b"")
+        self._pos = 0
+        return 0
+
+    def tell(self) -> int:
+        return self._pos
+
+    def _fill(self) -> bool:
+        """解码下一块到缓冲区，文本已全部解码时返回False"""
+        if self._src >= len(self._text) and not self._carry:
+            return False
+        chunk = self._carry + self._text[self._src:self._src + self._chunk_size]
+        self._src += self._chunk_size
+        chunk = chunk.translate(_STRIP_WHITESPACE)
+        if self._src < len(self._text):
+            # 只解码完整的4字符组，剩余部分留到下一块
+            cut = len(chunk) - len(chunk) % 4
+            chunk, self._carry = chunk[:cut], chunk[cut:]
+        else:
+            self._carry = ""
+        self._buf = memoryview(binascii.a2b_base64(chunk))
+        return True
+
+    def readinto(self, b) -> int:
+        out = memoryview(b).cast("B")
+        n = 0
+        while n < len(out):
+            if not self._buf and not self._fill():
+                break
+            k = min(len(self._buf), len(out) - n)
+            out[n:n + k] = self._buf[:k]
+            self._buf = self._buf[k:]
+            n += k
+        self._pos += n
+        return n
+
+
+class MultipartStream(io.RawIOBase):
+    """
+    multipart/form-data请求体
+
+    头部和结尾是小段bytes，文件内容按需从payload流读取；实现了 __len__，
+    requests据此发送Content-Length并分块读取，不会在内存中拼出完整请求体。
+    """
+
+    def __init__(self, field: str, filename: str, content_type: str, payload: BinaryIO, size: int):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+        self._parts = [BufferStream(head), payload, BufferStream(tail)]
+        self._payload_start = payload.tell()
+        self._size = len(head) + size + len(tail)
+        self._index = 0
+        self._pos = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def headers(self) -> Dict[str, str]:
+        return {"Content-Type": self.content_type, "Content-Length": str(self._size)}
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        out = memoryview(b).cast("B")
+        n = 0
+        while n < len(out) and self._index < len(self._parts):
+            k = self._parts[self._index].readinto(out[n:])
+            if not k:
+                self._index += 1
+            n += k or 0
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """只支持回到开头，用于失败重试"""
+        if whence == io.SEEK_CUR and offset == 0:
+            return self._pos
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("只支持回到开头")
+        self._parts[0].seek(0)
+        self._parts[1].seek(self._payload_start)
+        self._parts[2].seek(0)
+        self._index = 0
+        self._pos = 0
+        return 0
+
+    def tell(self) -> int:
+        return self._pos
+
+
+class MediaFile:
+    """
+    把文件路径、bytes或文件对象统一成可回绕的只读流
+
+    用法：
+        with MediaFile(source) as media:
+            digest = media.digest()
+            body = media.multipart("media")
+    """
+
+    def __init__(self, source: MediaSource, filename: str = None):
+        self._owned: Optional[BinaryIO] = None
+
+        if isinstance(source, (str, os.PathLike)):
+            self.stream = self._owned = open(source, "rb")
+            filename = filename or os.path.basename(source)
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            self.stream = BufferStream(source)
+        elif source.seekable():
+            self.stream = source
+        else:
+            # 无法回绕的流只能先读入内存
+            self.stream = BufferStream(source.read())
+
+        self._start = self.stream.tell()
+        self.size = getattr(self.stream, "size", None)
+        if self.size is None:
+            self.size = self.stream.seek(0, io.SEEK_END) - self._start
+
+        head = self._read_head()
+        ext, content_type = _sniff_image(head)
+        self.filename = filename or f"image{ext or '.jpg'}"
+        self.content_type = (
+            content_type
+            or mimetypes.guess_type(self.filename)[0]
+            or "application/octet-stream"
+        )
+
+    def _read_head(self) -> bytes:
+        self.rewind()
+        head = self.stream.read(16) or b""
+        self.rewind()
+        return head
+
+    def rewind(self):
+        self.stream.seek(self._start)
+
+    def digest(self) -> str:
+        """内容sha256，计算后回到开头"""
+        self.rewind()
+        digest = MediaCache.hash_stream(self.stream, self.size)
+        self.rewind()
+        return digest
+
+    def multipart(self, field: str = "media") -> MultipartStream:
+        self.rewind()
+        return MultipartStream(field, self.filename, self.content_type, self.stream, self.size)
+
+    def close(self):
+        if self._owned:
+            self._owned.close()
+
+    def __enter__(self) -> "MediaFile":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _sniff_image(head: bytes) -> tuple:
+    """根据文件头判断图片类型"""
+    for signature, ext, content_type in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext, content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp", "image/webp"
+    return None, None
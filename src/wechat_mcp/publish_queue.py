@@ -0,0 +1,293 @@
+"""发布任务队列模块 - 持久化的异步发布任务与状态轮询"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import diskcache as dc
+
+from .config import config
+from .ratelimit import RETRYABLE_ERRCODES, TOKEN_INVALID_ERRCODES
+
+# freepublish/get 返回的 publish_status
+PUBLISH_STATUS = {
+    0: "发布成功",
+    1: "发布中",
+    2: "原创声明失败",
+    3: "常规失败",
+    4: "平台审核不通过",
+    5: "成功后用户删除所有文章",
+    6: "成功后系统封禁所有文章",
+}
+
+# 任务状态：queued -> publishing -> succeeded / failed
+TERMINAL_STATES = ("succeeded", "failed")
+
+# 已结束的任务保留7天
+FINISHED_JOB_TTL = 7 * 24 * 3600
+
+# 提交任务的租约秒数：持有租约的进程崩溃后，租约到期即由其他进程重新提交
+CLAIM_LEASE = 300
+
+# 查询发布状态时可以稍后重试的错误码（-2 为获取access_token失败）
+_RETRYABLE_POLL_ERRCODES = RETRYABLE_ERRCODES | TOKEN_INVALID_ERRCODES | {-2}
+
+
+class PublishQueue:
+    """
+    持久化发布队列
+
+    任务保存在缓存目录的 publish_jobs/ 下，进程重启后继续提交和轮询。
+    一个后台线程负责所有任务：提交排队中的任务，并按共享的自适应间隔
+    轮询 freepublish/get——新提交的任务轮询较密，随后逐步放缓。
+    """
+
+    def __init__(self, api_resolver: Callable[[str], object], directory: str = None):
+        """
+        Args:
+            api_resolver: app_id -> WeChatAPI，用于提交和查询任务
+            directory: 缓存目录（可选，默认 WECHAT_TOKEN_CACHE_DIR）
+        """
+        self._resolve_api = api_resolver
+        self._store = dc.Cache(Path(directory or config.token_cache_dir) / "publish_jobs")
+        self._cond = threading.Condition()
+        self._active: Dict[str, Dict] = {}
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = False
+
+        now = time.time()
+        for key in self._store.iterkeys():
+            job = self._store.get(key)
+            if not key.startswith("job_") or not job or job["status"] in TERMINAL_STATES:
+                continue
+            claim = job.get("claim")
+            if job["status"] == "queued" and claim and (claim["expires_at"] <= now or claim["pid"] == os.getpid()):
+                # 提交中途崩溃的任务：租约已过期（或就是本进程号的上一次运行留下的），重新排队
+                with self._store.transact():
+                    stored = self._store.get(key)
+                    if stored and stored.get("claim") == claim:
+                        job = stored
+                        job["claim"] = None
+                        self._save(job)
+                claim = job.get("claim")
+            job["next_poll_at"] = claim["expires_at"] if claim else 0
+            self._active[job["job_id"]] = job
+
+    # ============ 任务 ============
+
+    def enqueue(self, app_id: str, media_id: str) -> Dict:
+        """加入发布队列，返回任务信息"""
+        now = time.time()
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "app_id": app_id,
+            "media_id": media_id,
+            "status": "queued",
+            "publish_id": None,
+            "publish_status": None,
+            "article_id": None,
+            "article_urls": [],
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "polls": 0,
+            "poll_interval": config.publish_poll_min_interval,
+            "next_poll_at": 0,
+            "claim": None,
+        }
+        self._save(job)
+        with self._cond:
+            self._active[job["job_id"]] = job
+            self._cond.notify_all()
+        self.start()
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """查询任务，优先读内存中的活动任务"""
+        job = self._active.get(job_id) or self._store.get(f"job_{job_id}")
+        return dict(job) if job else None
+
+    def recent(self, limit: int = 20, app_id: str = None) -> List[Dict]:
+        """最近创建的任务，可按公众号过滤"""
+        jobs = [self._store.get(key) for key in self._store.iterkeys() if key.startswith("job_")]
+        jobs = [job for job in jobs if job and (not app_id or job["app_id"] == app_id)]
+        jobs.sort(key=lambda job: job["created_at"], reverse=True)
+        return jobs[:limit]
+
+    def wait(self, job_id: str, timeout: float, states: tuple = TERMINAL_STATES) -> Optional[Dict]:
+        """
+        等待任务进入指定状态，超时返回当前状态
+
+        任务状态变化时由后台线程唤醒，不轮询存储。
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                job = self.get(job_id)
+                if job is None or job["status"] in states:
+                    return job
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return job
+                self._cond.wait(remaining)
+
+    def _save(self, job: Dict):
+        job["updated_at"] = time.time()
+        expire = FINISHED_JOB_TTL if job["status"] in TERMINAL_STATES else None
+        self._store.set(f"job_{job['job_id']}", job, expire=expire)
+
+    def _update(self, job: Dict, **changes):
+        with self._cond:
+            job.update(changes)
+            self._save(job)
+            if job["status"] in TERMINAL_STATES:
+                self._active.pop(job["job_id"], None)
+            self._cond.notify_all()
+
+    # ============ 后台线程 ============
+
+    def start(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._stopping = False
+            self._worker = threading.Thread(target=self._run, name="wechat-publish-queue", daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=config.publish_poll_workers,
+                                thread_name_prefix="wechat-publish-poll") as pool:
+            while not self._stopping:
+                now = time.time()
+                jobs = list(self._active.values())
+                queued = [job for job in jobs if job["status"] == "queued" and job["next_poll_at"] <= now]
+                due = [job for job in jobs if job["status"] == "publishing" and job["next_poll_at"] <= now]
+
+                try:
+                    list(pool.map(self._submit, queued))
+                    list(pool.map(self._poll, due))
+                except RuntimeError:
+                    # 解释器退出中，未完成的任务已落盘，下次启动继续
+                    return
+
+                with self._cond:
+                    pending = [job["next_poll_at"] for job in self._active.values()]
+                    timeout = max(0.0, min(pending) - time.time()) if pending else None
+                    if timeout != 0:
+                        self._cond.wait(timeout)
+
+    def _claim(self, job: Dict) -> bool:
+        """
+        在任务记录上登记本进程的提交租约
+
+        多个进程共用队列时只允许一个进程提交同一任务。任务已被其他进程提交时
+        改为跟踪存储中的状态；其他进程持有未过期的租约时，到期后再检查。
+        """
+        key = f"job_{job['job_id']}"
+        now = time.time()
+        with self._cond, self._store.transact():
+            stored = self._store.get(key) or job
+            claim = stored.get("claim")
+            if stored["status"] == "queued" and not (
+                claim and claim["pid"] != os.getpid() and claim["expires_at"] > now
+            ):
+                job["claim"] = {"pid": os.getpid(), "expires_at": now + CLAIM_LEASE}
+                self._save(job)
+                return True
+
+            job.update(stored)
+            if job["status"] in TERMINAL_STATES:
+                self._active.pop(job["job_id"], None)
+            elif job["status"] == "queued":
+                job["next_poll_at"] = claim["expires_at"]
+            self._cond.notify_all()
+            return False
+
+    def _submit(self, job: Dict):
+        if not self._claim(job):
+            return
+        try:
+            api = self._resolve_api(job["app_id"])
+            data = api.submit_publish(job["media_id"])
+        except Exception as e:
+            data = {"errcode": -1, "errmsg": str(e)}
+
+        if data.get("publish_id"):
+            self._update(
+                job,
+                status="publishing",
+                publish_id=data["publish_id"],
+                claim=None,
+                next_poll_at=time.time() + job["poll_interval"]
+            )
+        else:
+            self._update(job, status="failed", claim=None, error=f"提交失败: {data}")
+
+    def _poll(self, job: Dict):
+        try:
+            api = self._resolve_api(job["app_id"])
+            data = api.get_publish_status(job["publish_id"])
+        except Exception as e:
+            data = {"errcode": -1, "errmsg": str(e)}
+
+        interval = min(job["poll_interval"] * 2, config.publish_poll_max_interval)
+        status = data.get("publish_status")
+        errcode = data.get("errcode", 0)
+        if status is None and errcode and errcode not in _RETRYABLE_POLL_ERRCODES:
+            # publish_id无效等无法通过重试恢复的错误
+            self._update(
+                job,
+                status="failed",
+                polls=job["polls"] + 1,
+                error=f"查询失败: {data}"
+            )
+        elif status is None or status == 1:
+            # 查询暂时失败或仍在发布中：退避后再查
+            self._update(
+                job,
+                publish_status=status,
+                polls=job["polls"] + 1,
+                poll_interval=interval,
+                next_poll_at=time.time() + interval
+            )
+        elif status == 0:
+            items = data.get("article_detail", {}).get("item", [])
+            self._update(
+                job,
+                status="succeeded",
+                publish_status=status,
+                polls=job["polls"] + 1,
+                article_id=data.get("article_id"),
+                article_urls=[item.get("article_url") for item in items]
+            )
+        else:
+            self._update(
+                job,
+                status="failed",
+                publish_status=status,
+                polls=job["polls"] + 1,
+                error=PUBLISH_STATUS.get(status, f"publish_status={status}")
+            )
+
+    def close(self):
+        self.stop()
+        self._store.close()
+
+
+# 全局队列实例
+_publish_queue: Optional[PublishQueue] = None
+
+
+def get_publish_queue() -> PublishQueue:
+    """获取全局PublishQueue实例，首次调用时恢复未完成的任务"""
+    global _publish_queue
+    if _publish_queue is None:
+        from .accounts import get_account_pool
+        _publish_queue = PublishQueue(get_account_pool().get)
+        _publish_queue.start()
+    return _publish_queue
@@ -0,0 +1,110 @@
+"""限流与重试模块 - 按接口族的令牌桶、退避策略和调用统计"""
+import random
+import threading
+import time
+from typing import Dict
+
+from .config import config
+
+# 接口路径前缀 -> 接口族
+ENDPOINT_FAMILIES = {
+    "material/": "material",
+    "media/": "material",
+    "draft/": "draft",
+    "freepublish/": "publish",
+}
+
+# 每个接口族的默认 (每秒速率, 突发容量)
+# 微信公布的是按天计的调用额度，无法直接换算成速率；这里的取值用于平滑突发，
+# 超出分钟级频率时返回的45011等错误码由重试逻辑兜底。可用 WECHAT_RATE_LIMITS 覆盖。
+DEFAULT_RATE_LIMITS = {
+    "material": (5.0, 10),
+    "draft": (10.0, 20),
+    "publish": (2.0, 5),
+    "default": (10.0, 20),
+}
+
+# 系统繁忙、接口调用频率超限，稍后重试即可
+RETRYABLE_ERRCODES = {-1, 45009, 45011}
+# access_token 无效或过期，清除缓存后重试一次
+TOKEN_INVALID_ERRCODES = {40001, 40014, 42001}
+
+
+def endpoint_family(path: str) -> str:
+    """根据接口路径（如 draft/add）判断接口族"""
+    for prefix, family in ENDPOINT_FAMILIES.items():
+        if path.startswith(prefix):
+            return family
+    return "default"
+
+
+def backoff_delay(attempt: int) -> float:
+    """第attempt次重试前的等待秒数：指数退避 + full jitter"""
+    ceiling = min(config.retry_max_delay, config.retry_base_delay * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+class TokenBucket:
+    """线程安全的令牌桶"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """取一个令牌，不足时阻塞等待；返回等待的秒数"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimiter:
+    """一个公众号的各接口族令牌桶"""
+
+    def __init__(self):
+        limits = {**DEFAULT_RATE_LIMITS, **config.rate_limits}
+        self._buckets = {family: TokenBucket(rate, burst) for family, (rate, burst) in limits.items()}
+
+    def acquire(self, family: str) -> float:
+        bucket = self._buckets.get(family) or self._buckets["default"]
+        return bucket.acquire()
+
+
+class RequestMetrics:
+    """请求统计：请求数、重试数、token失效次数和限流等待时间，按接口族汇总"""
+
+    FIELDS = ("requests", "retries", "token_invalidations", "errors", "throttled_seconds")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families: Dict[str, Dict[str, float]] = {}
+
+    def add(self, family: str, field: str, value: float = 1):
+        with self._lock:
+            counters = self._families.get(family)
+            if counters is None:
+                counters = self._families[family] = dict.fromkeys(self.FIELDS, 0)
+            counters[field] += value
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """返回 {"total": {...}, "<接口族>": {...}}"""
+        with self._lock:
+            result = {family: dict(counters) for family, counters in self._families.items()}
+        total = dict.fromkeys(self.FIELDS, 0)
+        for counters in result.values():
+            for field, value in counters.items():
+                total[field] += value
+        result["total"] = total
+        return result
@@ -1,45 +1,105 @@
 """微信公众号MCP服务器 - FastMCP版本"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from fastmcp import FastMCP
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional
 
 from .config import config
-from .api import get_wechat_api
+from .accounts import UnknownAccount, get_account_pool
+from .multipart import Base64Stream
+from .publish_queue import get_publish_queue, PUBLISH_STATUS
+from .concurrency import limited
 
 app = FastMCP("wechat-mcp")
 
 
+def shutdown():
+    """停止发布队列和token后台刷新，关闭连接池和本地缓存（服务退出时调用）"""
+    from . import accounts, api, media_cache, publish_queue, token_cache
+    if publish_queue._publish_queue is not None:
+        publish_queue._publish_queue.close()
+    if accounts._account_pool is not None:
+        accounts._account_pool.clear()
+    if api._async_api_instance is not None:
+        api._async_api_instance.close()
+    elif api._api_instance is not None:
+        api._api_instance.close()
+    for cache in (token_cache._token_cache, media_cache._media_cache):
+        if cache is not None:
+            cache.close()
+    if _local_executor is not None:
+        _local_executor.shutdown(wait=False)
+
+
+# 读写本地发布任务表、等待发布状态的线程池
+_local_executor: Optional[ThreadPoolExecutor] = None
+
+
+async def _run_local(func: Callable[..., Any], *args) -> Any:
+    """在单独的线程池中执行本地任务表的阻塞操作，不占用事件循环和API线程池"""
+    global _local_executor
+    if _local_executor is None:
+        _local_executor = ThreadPoolExecutor(max_workers=config.local_workers, thread_name_prefix="wechat-local")
+    return await asyncio.get_running_loop().run_in_executor(_local_executor, functools.partial(func, *args))
+
+
+def _account_errors(func: Callable[..., Any]) -> Callable[..., Any]:
+    """工具装饰器，放在 @limited 之下：account 未配置时返回错误信息而不是抛出"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> str:
+        try:
+            return await func(*args, **kwargs)
+        except UnknownAccount as e:
+            return f"❌ {e}"
+
+    return wrapper
+
+
 @app.tool()
-def create_draft(
+@limited
+@_account_errors
+async def create_draft(
     title: str,
     content: str,
     cover_image_path: str = None,
-    thumb_media_id: str = None
+    thumb_media_id: str = None,
+    base_dir: str = None,
+    account: str = None
 ) -> str:
     """
     创建微信公众号草稿
     
+    正文中 <img> 的本地路径和 data URL 图片会自动上传并替换为微信图片地址。
+    
     Args:
         title: 文章标题
         content: 文章内容（HTML格式）
         cover_image_path: 封面图片路径（可选，本地路径）
         thumb_media_id: 封面media_id（可选，优先使用）
+        base_dir: 正文图片相对路径的基准目录（可选）
+        account: 公众号名称或AppID（可选，默认 WECHAT_APP_ID）
     
     Returns:
         操作结果消息
     """
-    api = get_wechat_api()
+    api = get_account_pool().get_async(account)
     
-    media_id = None
-    # 优先使用传入的 thumb_media_id
-    if thumb_media_id:
-        media_id = thumb_media_id
-    # 否则尝试上传本地图片
-    elif cover_image_path and cover_image_path != "None":
-        result = api.upload_image(cover_image_path)
-        if result:
-            media_id = result
+    async def upload_cover():
+        # 优先使用传入的 thumb_media_id，否则尝试上传本地图片
+        if thumb_media_id:
+            return thumb_media_id
+        if cover_image_path and cover_image_path != "None":
+            return await api.upload_image(cover_image_path)
+        return None
+    
+    # 封面和正文图片同时上传
+    media_id, content = await asyncio.gather(
+        upload_cover(),
+        api.upload_inline_images(content, base_dir)
+    )
     
-    draft_result = api.create_draft(title, content, media_id)
+    draft_result = await api.create_draft(title, content, media_id, upload_inline_images=False)
     
     if draft_result:
         return f"✅ 草稿创建成功！media_id: {draft_result}"
@@ -48,44 +108,71 @@ def create_draft(
 
 
 @app.tool()
-def upload_image(image_path: str = None, image_base64: str = None) -> str:
+@limited
+@_account_errors
+async def create_drafts_bulk(
+    articles: List[Dict[str, Any]],
+    max_concurrency: int = None,
+    base_dir: str = None,
+    account: str = None
+) -> str:
+    """
+    批量创建微信公众号草稿
+    
+    Args:
+        articles: 文章列表，每项包含 title、content，可选 cover_image_path、thumb_media_id、
+            author、digest、group；group 相同的文章合并为一个多图文草稿
+        max_concurrency: 同时进行的上传/创建数（可选）
+        base_dir: 正文图片相对路径的基准目录（可选）
+        account: 公众号名称或AppID（可选，默认 WECHAT_APP_ID）
+    
+    Returns:
+        每个草稿的创建结果
+    """
+    if not articles:
+        return "❌ 请提供 articles"
+    
+    api = get_account_pool().get_async(account)
+    results = await api.create_drafts_bulk(articles, max_concurrency, base_dir)
+    
+    succeeded = sum(1 for r in results if r["media_id"])
+    text = f"📝 批量创建草稿：成功 {succeeded}/{len(results)}\n\n"
+    for r in results:
+        titles = " + ".join(r["titles"])
+        indices = ",".join(str(i) for i in r["indices"])
+        if r["media_id"]:
+            text += f"✅ [{indices}] {titles}\n   media_id: {r['media_id']}\n"
+        else:
+            text += f"❌ [{indices}] {titles}\n   {r['error']}\n"
+    return text
+
+
+@app.tool()
+@limited
+@_account_errors
+async def upload_image(image_path: str = None, image_base64: str = None, account: str = None) -> str:
     """
     上传图片到微信公众号获取media_id
     
     Args:
         image_path: 图片文件路径（可选，与二选一）
         image_base64: Base64编码的图片数据（可选，与二选一）
+        account: 公众号名称或AppID（可选，默认 WECHAT_APP_ID）
     
     Returns:
         操作结果消息
     """
-    api = get_wechat_api()
-    
-    import tempfile
-    import base64
-    import os
+    api = get_account_pool().get_async(account)
     
-    temp_path = None
     try:
-        # 如果传入 base64，先保存到临时文件
+        # base64 边解码边上传，不落临时文件（逗号之前的前缀如 data URL 头由 Base64Stream 跳过）
         if image_base64:
-            # 检查是否是 data URL 格式
-            if "," in image_base64:
-                image_base64 = image_base64.split(",", 1)[1]
-            
-            image_data = base64.b64decode(image_base64)
-            
-            # 创建临时文件
-            temp_fd, temp_path = tempfile.mkstemp(suffix=".jpg")
-            os.write(temp_fd, image_data)
-            os.close(temp_fd)
-            image_path = temp_path
-        
-        if not image_path or image_path == "None":
+            result = await api.upload_image(Base64Stream(image_base64))
+        elif image_path and image_path != "None":
+            result = await api.upload_image(image_path)
+        else:
             return "❌ 请提供 image_path 或 image_base64"
         
-        result = api.upload_image(image_path)
-        
         if result:
             return f"✅ 图片上传成功！media_id: {result}"
         else:
@@ -93,33 +180,30 @@ def upload_image(image_path: str = None, image_base64: str = None) -> str:
             
     except Exception as e:
         return f"❌ 图片上传异常: {str(e)}"
-    finally:
-        # 清理临时文件
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except:
-                pass
 
 
 @app.tool()
-def list_drafts(offset: int = 0, count: int = 20) -> str:
+@limited
+@_account_errors
+async def list_drafts(offset: int = 0, count: int = 20, refresh: bool = False, account: str = None) -> str:
     """
     列出所有草稿
     
     Args:
         offset: 分页偏移，默认0
         count: 每页数量，默认20
+        refresh: 是否强制从微信全量同步，默认False（使用本地索引）
+        account: 公众号名称或AppID（可选，默认 WECHAT_APP_ID）
     
     Returns:
         草稿列表
     """
-    api = get_wechat_api()
-    drafts = api.list_drafts(offset, count)
+    api = get_account_pool().get_async(account)
+    drafts = await api.list_cached_drafts(offset, count, refresh)
     
     if drafts:
         text = "📋 草稿列表：\n\n"
-        for i, draft in enumerate(drafts, 1):
+        for i, draft in enumerate(drafts, offset + 1):
             text += f"{i}. {draft['title']}\n"
             text += f"   media_id: {draft['media_id']}\n\n"
         return text
@@ -128,20 +212,131 @@ def list_drafts(offset: int = 0, count: int = 20) -> str:
 
 
 @app.tool()
-def publish_draft(media_id: str) -> str:
+@limited
+@_account_errors
+async def search_drafts(query: str, limit: int = 20, refresh: bool = False, account: str = None) -> str:
+    """
+    按标题或摘要搜索草稿
+    
+    Args:
+        query: 关键词（不区分大小写）
+        limit: 最多返回数量，默认20
+        refresh: 是否强制从微信全量同步，默认False（使用本地索引）
+        account: 公众号名称或AppID（可选，默认 WECHAT_APP_ID）
+    
+    Returns:
+        匹配的草稿列表
+    """
+    api = get_account_pool().get_async(account)
+    drafts = await api.search_drafts(query, limit, refresh)
+    
+    if drafts:
+        text = f"🔍 标题包含「{query}」的草稿：\n\n"
+        for i, draft in enumerate(drafts, 1):
+            text += f"{i}. {draft['title']}\n"
+            text += f"   media_id: {draft['media_id']}\n\n"
+        return text
+    else:
+        return f"🔍 没有找到包含「{query}」的草稿"
+
+
+def _format_publish_job(job: Dict[str, Any]) -> str:
+    """发布任务的文字描述"""
+    icons = {"queued": "⏳", "publishing": "🔄", "succeeded": "✅", "failed": "❌"}
+    text = f"{icons.get(job['status'], '')} 任务 {job['job_id']}：{job['status']}\n"
+    text += f"   media_id: {job['media_id']}\n"
+    if job["publish_id"]:
+        text += f"   publish_id: {job['publish_id']}\n"
+    if job["publish_status"] is not None:
+        text += f"   微信状态: {PUBLISH_STATUS.get(job['publish_status'], job['publish_status'])}\n"
+    for url in job["article_urls"]:
+        text += f"   文章地址: {url}\n"
+    if job["error"]:
+        text += f"   原因: {job['error']}\n"
+    return text
+
+
+@app.tool()
+@limited
+@_account_errors
+async def publish_draft(media_id: str, account: str = None) -> str:
     """
     发布草稿（需要相应权限）
     
+    发布任务进入持久化队列，后台提交并跟踪结果；
+    用 publish_status 或 wait_for_publish 查询进度。
+    
     Args:
         media_id: 草稿media_id
+        account: 公众号名称或AppID（可选，默认 WECHAT_APP_ID）
     
     Returns:
-        操作结果消息
+        任务编号和当前状态
     """
-    api = get_wechat_api()
-    result = api.publish_draft(media_id)
+    api = get_account_pool().get_async(account)
+    queue = get_publish_queue()
+    job = await _run_local(queue.enqueue, api.app_id, media_id)
     
-    if result:
-        return "✅ 发布成功！"
-    else:
-        return "❌ 发布失败，可能权限不足"
+    # 等待提交完成，提交阶段的错误（如权限不足）直接返回
+    job = await _run_local(queue.wait, job["job_id"], 10, ("publishing", "succeeded", "failed"))
+    
+    if job["status"] == "failed":
+        return f"❌ 发布失败，可能权限不足\n\n{_format_publish_job(job)}"
+    return f"✅ 已提交发布，job_id: {job['job_id']}\n\n{_format_publish_job(job)}"
+
+
+@app.tool()
+@limited
+@_account_errors
+async def publish_status(job_id: str = None, limit: int = 10, account: str = None) -> str:
+    """
+    查询发布任务状态（读取本地任务表，不请求微信）
+    
+    Args:
+        job_id: 发布任务编号（可选，不传则列出最近的任务）
+        limit: 列出最近任务的数量，默认10
+        account: 公众号名称或AppID（可选，默认 WECHAT_APP_ID）
+    
+    Returns:
+        任务状态
+    """
+    queue = get_publish_queue()
+    app_id = get_account_pool().resolve(account)[0] if account else None
+    if job_id:
+        job = await _run_local(queue.get, job_id)
+        if not job or (app_id and job["app_id"] != app_id):
+            return f"❌ 未找到发布任务: {job_id}"
+        return _format_publish_job(job)
+    
+    jobs = await _run_local(queue.recent, limit, app_id)
+    if not jobs:
+        return "📋 暂无发布任务"
+    return "📋 最近的发布任务：\n\n" + "\n".join(_format_publish_job(job) for job in jobs)
+
+
+@app.tool()
+@limited
+@_account_errors
+async def wait_for_publish(job_id: str, timeout: float = 60, account: str = None) -> str:
+    """
+    等待发布任务结束
+    
+    Args:
+        job_id: 发布任务编号
+        timeout: 最长等待秒数，默认60，最多300
+        account: 公众号名称或AppID（可选，只等待该公众号的任务）
+    
+    Returns:
+        任务状态，超时则返回当前状态
+    """
+    queue = get_publish_queue()
+    if account:
+        app_id = get_account_pool().resolve(account)[0]
+        job = await _run_local(queue.get, job_id)
+        if not job or job["app_id"] != app_id:
+            return f"❌ 未找到发布任务: {job_id}"
+    job = await _run_local(queue.wait, job_id, min(max(timeout, 0), 300))
+    
+    if job is None:
+        return f"❌ 未找到发布任务: {job_id}"
+    return _format_publish_job(job)
@@ -1,80 +1,293 @@
 """Token缓存模块 - 使用diskcache实现本地缓存"""
 import os
 import time
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 import diskcache as dc
-from typing import Optional
+from typing import Optional, Dict, Tuple
 
 from .config import config
+from .ratelimit import RateLimiter
+from .transport import HTTPTransport, Timeouts, get_http_transport
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 
 class TokenCache:
-    """Access Token缓存管理"""
-    
+    """
+    Access Token缓存管理
+
+    两级缓存：进程内L1保存 (token, expire_at)，diskcache作为进程间共享的L2。
+    L2每次写入都会替换缓存目录下的版本文件，L1按 WECHAT_TOKEN_L1_CHECK_INTERVAL
+    周期stat该文件，发现版本变化即失效，从而感知兄弟进程的刷新。
+    """
+
     def __init__(self):
         self._cache_dir = Path(config.token_cache_dir)
         self._cache_dir.mkdir(parents=True, exist_ok=True)
         self._cache = dc.Cache(self._cache_dir, expire=7000)  # 微信token有效期2小时，缓存1小时50分
-    
-    def get_access_token(self, app_id: str, app_secret: str) -> Optional[str]:
+
+        # L1: app_id -> (token, expire_at, L2版本, 上次校验版本的时间)
+        self._l1: Dict[str, Tuple[str, float, tuple, float]] = {}
+        self._stats = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0, "fetches": 0}
+
+        # single-flight: 每个app_id一把线程锁，进程间用缓存目录下的文件锁
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+        # 每个app_id的接口限流桶，客户端被淘汰后重建时沿用，避免额度被重置
+        self._limiters: Dict[str, RateLimiter] = {}
+
+        # 后台刷新: app_id -> (app_secret, transport)
+        self._refresh_targets: Dict[str, Tuple[str, Optional[HTTPTransport]]] = {}
+        self._refresh_wakeup = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def get_access_token(
+        self,
+        app_id: str,
+        app_secret: str,
+        transport: HTTPTransport = None
+    ) -> Optional[str]:
         """
         获取access_token，优先从缓存读取
-        
+
+        缓存未命中时同一app_id只会有一个请求发往微信，其余调用方（包括其他进程）等待其结果。
+
         Args:
             app_id: 微信公众号AppID
             app_secret: 微信公众号AppSecret
-            
+            transport: 请求token使用的连接池（可选，默认全局实例）
+
         Returns:
             access_token字符串，失败返回None
         """
-        cache_key = f"access_token_{app_id}"
-        
-        # 检查缓存
-        cached = self._cache.get(cache_key)
+        token = self._l1_token(app_id)
+        if token:
+            self._stats["l1_hits"] += 1
+            return token
+        self._stats["l1_misses"] += 1
+
+        token = self._cached_token(app_id)
+        if token:
+            return token
+        return self._refresh(app_id, app_secret, transport)
+
+    def _l1_token(self, app_id: str) -> Optional[str]:
+        """读取进程内缓存，超过校验间隔时比对一次L2版本"""
+        entry = self._l1.get(app_id)
+        if not entry:
+            return None
+        token, expire_at, version, checked_at = entry
+        now = time.time()
+        if now >= expire_at:
+            return None
+        if now - checked_at >= config.token_l1_check_interval:
+            if self._read_version(app_id) != version:
+                self._l1.pop(app_id, None)
+                return None
+            self._l1[app_id] = (token, expire_at, version, now)
+        return token
+
+    def _cached_token(self, app_id: str, min_remaining: float = 0) -> Optional[str]:
+        """从L2读取剩余有效期大于min_remaining秒的token，并回填L1"""
+        # 先取版本再读值，避免并发写入被旧版本掩盖
+        version = self._read_version(app_id)
+        cached = self._cache.get(f"access_token_{app_id}")
         if cached:
             token, expire_at = cached
-            if time.time() < expire_at:
+            self._l1[app_id] = (token, expire_at, version, time.time())
+            if time.time() + min_remaining < expire_at:
+                self._stats["l2_hits"] += 1
                 return token
-        
-        # 请求新token
-        import requests
-        url = "https://api.weixin.qq.com/cgi-bin/token"
+        self._stats["l2_misses"] += 1
+        return None
+
+    def _version_path(self, app_id: str) -> Path:
+        return self._cache_dir / f"token_{app_id}.version"
+
+    def _read_version(self, app_id: str) -> tuple:
+        try:
+            st = os.stat(self._version_path(app_id))
+        except FileNotFoundError:
+            return ()
+        return (st.st_ino, st.st_mtime_ns)
+
+    def _bump_version(self, app_id: str) -> tuple:
+        """原子替换版本文件，inode变化保证版本号在低精度mtime的文件系统上也能区分"""
+        path = self._version_path(app_id)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}")
+        tmp.write_text(str(time.time_ns()))
+        os.replace(tmp, path)
+        return self._read_version(app_id)
+
+    def _refresh(
+        self,
+        app_id: str,
+        app_secret: str,
+        transport: HTTPTransport = None,
+        min_remaining: float = 0
+    ) -> Optional[str]:
+        """加锁后再检查一次缓存，仍然需要时才真正请求微信"""
+        with self._thread_lock(app_id):
+            token = self._cached_token(app_id, min_remaining)
+            if token:
+                return token
+            with self._process_lock(app_id):
+                # 其他进程可能已经刷新过
+                token = self._cached_token(app_id, min_remaining)
+                if token:
+                    return token
+                return self._fetch_token(app_id, app_secret, transport)
+
+    def _fetch_token(
+        self,
+        app_id: str,
+        app_secret: str,
+        transport: HTTPTransport = None
+    ) -> Optional[str]:
+        """请求新token并写入缓存"""
+        http = transport or get_http_transport()
+        url = f"{config.api_base}/cgi-bin/token"
         params = {
             "grant_type": "client_credential",
             "appid": app_id,
             "secret": app_secret
         }
-        
+
         try:
-            resp = requests.get(url, params=params, timeout=10)
+            resp = http.get(url, params=params, timeout=Timeouts(read=10))
             data = resp.json()
-            
+
             if "access_token" in data:
                 token = data["access_token"]
                 expires_in = data.get("expires_in", 7200)
                 expire_at = time.time() + expires_in - 200  # 提前200秒刷新
-                
+
                 # 写入缓存
-                self._cache.set(cache_key, (token, expire_at))
+                self._cache.set(f"access_token_{app_id}", (token, expire_at))
+                version = self._bump_version(app_id)
+                self._l1[app_id] = (token, expire_at, version, time.time())
+                self._stats["fetches"] += 1
                 return token
             else:
                 print(f"获取token失败: {data}")
                 return None
-                
+
         except Exception as e:
             print(f"请求token异常: {e}")
             return None
-    
-    def clear_cache(self, app_id: str = None):
-        """清除缓存"""
+
+    def _thread_lock(self, app_id: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(app_id)
+            if lock is None:
+                lock = self._locks[app_id] = threading.Lock()
+            return lock
+
+    def rate_limiter(self, app_id: str) -> RateLimiter:
+        """公众号的接口限流桶，同一app_id的所有客户端共用"""
+        with self._locks_guard:
+            limiter = self._limiters.get(app_id)
+            if limiter is None:
+                limiter = self._limiters[app_id] = RateLimiter()
+            return limiter
+
+    @contextmanager
+    def _process_lock(self, app_id: str):
+        """跨进程锁，不支持fcntl的平台退化为diskcache.Lock"""
+        if fcntl is None:
+            with dc.Lock(self._cache, f"token_lock_{app_id}", expire=60):
+                yield
+            return
+
+        with open(self._cache_dir / f"token_{app_id}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    # ============ 后台刷新 ============
+
+    def start_refresher(self, app_id: str, app_secret: str, transport: HTTPTransport = None):
+        """
+        注册后台刷新，在expire_at之前提前 WECHAT_TOKEN_REFRESH_AHEAD 秒续期
+
+        所有app_id共用一个守护线程，请求路径不再需要等待token请求。
+        """
+        self._refresh_targets[app_id] = (app_secret, transport)
+        if self._refresher is None or not self._refresher.is_alive():
+            self._stopping = False
+            self._refresher = threading.Thread(
+                target=self._refresh_loop, name="wechat-token-refresher", daemon=True
+            )
+            self._refresher.start()
+        self._refresh_wakeup.set()
+
+    def stop_refresher(self, app_id: str = None):
+        """取消后台刷新，不传app_id时停止刷新线程"""
+        if app_id:
+            self._refresh_targets.pop(app_id, None)
+        else:
+            self._refresh_targets.clear()
+            self._stopping = True
+        self._refresh_wakeup.set()
+
+    def _refresh_loop(self):
+        ahead = config.token_refresh_ahead
+        while not self._stopping:
+            self._refresh_wakeup.clear()
+            next_due = time.time() + 60
+
+            for app_id, (app_secret, transport) in list(self._refresh_targets.items()):
+                cached = self._cache.get(f"access_token_{app_id}")
+                due = cached[1] - ahead if cached else 0
+                if due <= time.time():
+                    if self._refresh(app_id, app_secret, transport, min_remaining=ahead):
+                        cached = self._cache.get(f"access_token_{app_id}")
+                        due = cached[1] - ahead if cached else 0
+                    # 刷新失败或token有效期过短时，稍后重试
+                    due = max(due, time.time() + 10)
+                next_due = min(next_due, due)
+
+            self._refresh_wakeup.wait(max(0.0, next_due - time.time()))
+
+    def clear_cache(self, app_id: str = None, token: str = None):
+        """
+        清除缓存
+        
+        Args:
+            app_id: 只清除该公众号的token（可选，默认全部）
+            token: 仅当缓存中仍是这个token时才清除，避免并发调用方删掉别人刚刷新的token
+        """
         if app_id:
             cache_key = f"access_token_{app_id}"
-            self._cache.delete(cache_key)
+            with self._thread_lock(app_id):
+                self._l1.pop(app_id, None)
+                cached = self._cache.get(cache_key)
+                if token and (not cached or cached[0] != token):
+                    return
+                self._cache.delete(cache_key)
+                self._bump_version(app_id)
         else:
             self._cache.clear()
-    
+            self._l1.clear()
+            for path in self._cache_dir.glob("token_*.version"):
+                self._bump_version(path.name[len("token_"):-len(".version")])
+
+    def stats(self) -> Dict[str, int]:
+        """各级缓存命中计数"""
+        return dict(self._stats)
+
     def close(self):
         """关闭缓存"""
+        self.stop_refresher()
         self._cache.close()
 
 
@@ -0,0 +1,121 @@
+"""HTTP传输模块 - 连接池化的keep-alive会话"""
+from typing import Optional, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import config
+
+try:
+    # 安装了 httpx[http2] 时启用HTTP/2，否则使用requests连接池
+    import httpx
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
+
+# 两种后端可重试的网络异常（连接失败、超时等）
+TRANSPORT_ERRORS = (requests.RequestException,) + ((httpx.TransportError,) if httpx else ())
+
+
+class Timeouts:
+    """分阶段超时设置（秒）"""
+
+    def __init__(
+        self,
+        connect: float = None,
+        read: float = None,
+        write: float = None,
+        pool: float = None
+    ):
+        self.connect = connect if connect is not None else config.http_connect_timeout
+        self.read = read if read is not None else config.http_read_timeout
+        self.write = write if write is not None else config.http_write_timeout
+        self.pool = pool if pool is not None else config.http_pool_timeout
+
+    def for_requests(self) -> tuple:
+        """requests只区分连接和读取两个阶段"""
+        return (self.connect, self.read)
+
+    def for_httpx(self):
+        return httpx.Timeout(connect=self.connect, read=self.read, write=self.write, pool=self.pool)
+
+
+class HTTPTransport:
+    """
+    连接池化的HTTP会话
+
+    同一个实例在多线程间共享，到 api.weixin.qq.com 的TCP+TLS连接会被复用。
+    """
+
+    def __init__(self, pool_size: int = None, timeouts: Timeouts = None, http2: bool = None):
+        self.pool_size = pool_size or config.http_pool_size
+        self.timeouts = timeouts or Timeouts()
+        if http2 is None:
+            http2 = config.http2
+        self.http2 = bool(http2 and httpx is not None)
+
+        if self.http2:
+            self._client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size
+                ),
+                timeout=self.timeouts.for_httpx()
+            )
+        else:
+            self._client = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+            self._client.mount("https://", adapter)
+            self._client.mount("http://", adapter)
+
+    def request(self, method: str, url: str, timeout: Timeouts = None, **kwargs) -> Any:
+        """
+        发起请求
+
+        Args:
+            method: HTTP方法
+            url: 完整URL
+            timeout: 本次请求的超时设置（可选，默认使用实例设置）
+            **kwargs: params/json/data/files/headers，两种后端通用
+
+        Returns:
+            响应对象，支持 .json() / .content / .status_code
+        """
+        timeout = timeout or self.timeouts
+        if self.http2:
+            if hasattr(kwargs.get("data"), "read"):
+                # httpx的流式请求体需要是可迭代的bytes
+                kwargs["content"] = _iter_stream(kwargs.pop("data"))
+            return self._client.request(method, url, timeout=timeout.for_httpx(), **kwargs)
+        return self._client.request(method, url, timeout=timeout.for_requests(), **kwargs)
+
+    def get(self, url: str, **kwargs) -> Any:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> Any:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """关闭连接池"""
+        self._client.close()
+
+
+def _iter_stream(stream, chunk_size: int = 64 * 1024):
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+# 全局传输实例
+_transport: Optional[HTTPTransport] = None
+
+
+def get_http_transport() -> HTTPTransport:
+    """获取全局HTTPTransport实例"""
+    global _transport
+    if _transport is None:
+        _transport = HTTPTransport()
+    return _transport
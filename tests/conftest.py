@@ -0,0 +1,42 @@
+"""测试夹具 - 本地Docker和微信接口替身"""
+import shutil
+import tempfile
+
+import pytest
+
+from fake_docker import FakeDocker
+from fake_wechat import FakeWeChat
+
+
+@pytest.fixture
+def socket_dir():
+    # unix socket路径有长度限制，不使用pytest的tmp_path
+    path = tempfile.mkdtemp(prefix="mcp-", dir="/tmp")
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def fake_docker(socket_dir):
+    with FakeDocker(f"{socket_dir}/docker.sock", containers=3) as fake:
+        yield fake
+
+
+@pytest.fixture
+def fake_wechat(monkeypatch, tmp_path):
+    """微信接口替身，配置指向它，全局单例在测试结束后还原"""
+    from wechat_mcp import draft_catalog, media_cache, token_cache, transport
+
+    with FakeWeChat() as fake:
+        monkeypatch.setenv("WECHAT_API_BASE", fake.base_url)
+        monkeypatch.setenv("WECHAT_TOKEN_CACHE_DIR", str(tmp_path))
+        monkeypatch.setenv("WECHAT_TOKEN_AUTO_REFRESH", "0")
+        monkeypatch.setenv("WECHAT_APP_ID", "test-app")
+        monkeypatch.setenv("WECHAT_APP_SECRET", "test-secret")
+        monkeypatch.setenv("WECHAT_RETRY_BASE_DELAY", "0.01")
+        monkeypatch.setattr(token_cache, "_token_cache", None)
+        monkeypatch.setattr(media_cache, "_media_cache", None)
+        monkeypatch.setattr(transport, "_transport", None)
+        monkeypatch.setattr(draft_catalog, "_store", None)
+        monkeypatch.setattr(draft_catalog, "_catalogs", {})
+        yield fake
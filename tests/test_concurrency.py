@@ -0,0 +1,34 @@
+"""工具并发闸门"""
+import asyncio
+
+from mcp4agent.concurrency import LimiterRegistry, parse_tool_limits
+
+
+def test_parse_tool_limits_overrides_defaults():
+    limits = parse_tool_limits("slow=2:5, other=0", {"slow": 1, "fast": 4}, 30)
+    assert limits == {"slow": (2, 5.0), "fast": (4, 30), "other": (0, 30)}
+
+
+def test_limited_rejects_after_max_wait():
+    registry = LimiterRegistry(lambda: {"slow": (1, 0.1)}, lambda: 30)
+
+    @registry.limited
+    async def slow(delay: float) -> str:
+        await asyncio.sleep(delay)
+        return "✅ done"
+
+    @registry.limited
+    async def fast() -> str:
+        return "✅ fast"
+
+    async def main():
+        return await asyncio.gather(slow(0.3), slow(0), fast())
+
+    results = asyncio.run(main())
+    assert results[0] == "✅ done"
+    assert results[1].startswith("❌ slow 繁忙")
+    assert results[2] == "✅ fast"
+    assert registry.stats()["slow"]["rejected"] == 1
+    assert registry.stats()["fast"]["max_concurrency"] == 0
+    # 换了事件循环后仍可使用
+    assert asyncio.run(slow(0)) == "✅ done"
@@ -0,0 +1,81 @@
+"""指标历史：分钟/小时汇总"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from docker_status import history as history_module
+from docker_status.history import METRICS, MetricsHistory, rollup
+
+T0 = 1_700_002_800.0  # 整点
+
+
+def _rows(values):
+    """每个点所有指标取同一个值，形状为 指标数 x 点数"""
+    return np.tile(np.asarray(values, dtype=np.float32), (len(METRICS), 1))
+
+
+def test_rollup_raw_points_into_minutes():
+    times = T0 + np.array([0, 10, 50, 60, 70, 130])
+    starts, result = rollup(times, _rows([1, 2, 6, 10, 20, 5]), 60)
+    n = len(METRICS)
+    assert list(starts) == [T0, T0 + 60, T0 + 120]
+    assert list(result[0]) == [1, 10, 5]          # min
+    assert list(result[n]) == [3, 15, 5]          # avg
+    assert list(result[2 * n]) == [6, 20, 5]      # max
+
+
+def test_rollup_of_rollups_keeps_extremes():
+    times = T0 + np.array([0, 10, 60, 70])
+    minutes, summary = rollup(times, _rows([1, 3, 10, 30]), 60)
+    hours, result = rollup(minutes, summary, 3600)
+    n = len(METRICS)
+    assert list(hours) == [T0]
+    assert result[0, 0] == 1 and result[2 * n, 0] == 30
+    # 小时平均为各分钟平均值的平均
+    assert result[n, 0] == pytest.approx((2 + 20) / 2)
+
+
+class FakeCollector:
+    """按设定的时间返回统计值的采集器替身"""
+
+    def __init__(self):
+        self.now = T0
+        self.value = 0.0
+
+    def containers(self):
+        return ["c1"]
+
+    def get(self, container_id, window):
+        return {"time": self.now, **{m: self.value for m in METRICS}}
+
+
+def test_record_rolls_up_finished_periods(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOCKER_MCP_HISTORY_INTERVAL", "10")
+    monkeypatch.setenv("DOCKER_MCP_HISTORY_RAW_HOURS", "1")
+    monkeypatch.setenv("DOCKER_MCP_HISTORY_MINUTE_DAYS", "1")
+    monkeypatch.setenv("DOCKER_MCP_HISTORY_HOUR_DAYS", "1")
+    collector = FakeCollector()
+    monkeypatch.setattr(history_module, "time", SimpleNamespace(time=lambda: collector.now))
+    history = MetricsHistory(str(tmp_path))
+
+    # 两个小时多一点，每10秒一个点，值为所在分钟数
+    for step in range(0, 7300, 10):
+        collector.now = T0 + step
+        collector.value = float(step // 60)
+        assert history.record(collector) == 1
+
+    resolution, points, stats = history.query("c1", 600, resolution="raw")
+    assert resolution == "raw" and points == 60
+    resolution, points, stats = history.query("c1", 7300, resolution="1m")
+    assert points == 121  # 当前分钟尚未结束，不汇总
+    assert stats["cpu_percent"]["min"] == 0 and stats["cpu_percent"]["max"] == 120
+    resolution, points, stats = history.query("c1", 7300, resolution="1h")
+    assert points == 2
+    assert stats["cpu_percent"]["max"] == 119
+    assert stats["cpu_percent"]["avg"] == pytest.approx((29.5 + 89.5) / 2)
+
+    # 重新打开后从磁盘读取，接着写入
+    reopened = MetricsHistory(str(tmp_path))
+    assert reopened.query("c1", 7300, resolution="1h")[1] == 2
+    assert reopened.resolution_for(600) == "raw" and reopened.resolution_for(7200) == "1m"
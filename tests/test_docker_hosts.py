@@ -0,0 +1,154 @@
+"""多主机并发查询与批量重启的目标选择"""
+import asyncio
+
+import pytest
+
+from docker_status import client as docker_client
+from docker_status.hosts import HostError, default_host, fan_out
+from docker_status.restart import select_targets
+from fake_docker import FakeDocker, make_container
+
+
+def _names(client):
+    return sorted(c["Names"][0] for c in client.api.containers())
+
+
+@pytest.fixture
+def hosts(socket_dir, monkeypatch):
+    fast = FakeDocker(f"{socket_dir}/fast.sock", containers=2).start()
+    slow = FakeDocker(f"{socket_dir}/slow.sock", containers=1, latency=1.0).start()
+    monkeypatch.delenv("DOCKER_MCP_HOST", raising=False)
+    monkeypatch.setenv("DOCKER_MCP_HOSTS", f"fast={fast.base_url},slow={slow.base_url}")
+    monkeypatch.setenv("DOCKER_MCP_HOST_TIMEOUT", "0.3")
+    yield fast, slow
+    docker_client.close_all()
+    fast.stop()
+    slow.stop()
+
+
+def test_fan_out_times_out_slow_host_only(hosts):
+    results = dict(asyncio.run(fan_out(_names)))
+    assert results["fast"] == ["/web0", "/web1"]
+    assert isinstance(results["slow"], HostError)
+    assert results["slow"].host == "slow"
+    assert results["slow"].error is None
+    assert "0.3秒内未响应" in str(results["slow"])
+
+
+def test_fan_out_single_host_and_explicit_timeout(hosts):
+    assert asyncio.run(fan_out(_names, host="fast")) == [("fast", ["/web0", "/web1"])]
+    assert asyncio.run(fan_out(_names, host="slow", timeout=5)) == [("slow", ["/web0"])]
+    with pytest.raises(ValueError):
+        asyncio.run(fan_out(_names, host="missing"))
+
+
+def test_fan_out_reports_host_errors(hosts):
+    def boom(client):
+        raise RuntimeError("daemon exploded")
+
+    results = dict(asyncio.run(fan_out(boom, host="fast")))
+    assert isinstance(results["fast"].error, RuntimeError)
+    assert str(results["fast"]) == "daemon exploded"
+
+
+def test_fan_out_single_host_has_no_timeout(fake_docker, monkeypatch):
+    fake_docker.latency = 0.3
+    monkeypatch.delenv("DOCKER_MCP_HOSTS", raising=False)
+    monkeypatch.setenv("DOCKER_MCP_HOST", fake_docker.base_url)
+    monkeypatch.setenv("DOCKER_MCP_HOST_TIMEOUT", "0.01")
+    try:
+        assert asyncio.run(fan_out(_names)) == [("local", ["/web0", "/web1", "/web2"])]
+    finally:
+        docker_client.close_all()
+
+
+def test_default_host(monkeypatch):
+    monkeypatch.delenv("DOCKER_MCP_HOSTS", raising=False)
+    monkeypatch.delenv("DOCKER_MCP_HOST", raising=False)
+    assert default_host() == "local"
+    monkeypatch.setenv("DOCKER_MCP_HOST", "tcp://10.0.0.1:2375")
+    assert default_host() == "local"
+    monkeypatch.setenv("DOCKER_MCP_HOSTS", "a=tcp://10.0.0.2:2375,b=tcp://10.0.0.1:2375")
+    assert default_host() == "b"
+    monkeypatch.delenv("DOCKER_MCP_HOST")
+    assert default_host() is None
+
+
+def test_select_targets():
+    containers = [make_container(i) for i in (2, 0, 1)]
+    containers.append(make_container(3, project="other"))
+    containers[0]["Labels"]["role"] = "canary"
+
+    assert [c["Names"][0] for c in select_targets(containers, project="demo")] == ["/web0", "/web1", "/web2"]
+    assert [c["Names"][0] for c in select_targets(containers, label="role")] == ["/web2"]
+    assert [c["Names"][0] for c in select_targets(containers, label="tier=web,role=canary")] == ["/web2"]
+    assert select_targets(containers, label="tier=db") == []
+    assert [c["Names"][0] for c in select_targets(containers, name="web[13]")] == ["/web1", "/web3"]
+    assert [c["Names"][0] for c in select_targets(containers, name="web*", project="other")] == ["/web3"]
+
+
+@pytest.fixture
+def two_hosts(socket_dir, monkeypatch):
+    """两个守护进程替身，本机没有默认守护进程，容器清单、后台统计和日志索引保持默认开启"""
+    from docker_status import inventory, log_index, server, stats
+
+    a = FakeDocker(f"{socket_dir}/a.sock", containers=2).start()
+    b = FakeDocker(f"{socket_dir}/b.sock", containers=3).start()
+    monkeypatch.delenv("DOCKER_MCP_HOST", raising=False)
+    monkeypatch.setenv("DOCKER_HOST", f"unix://{socket_dir}/missing.sock")
+    monkeypatch.setenv("DOCKER_MCP_HOSTS", f"a={a.base_url},b={b.base_url}")
+    monkeypatch.delenv("DOCKER_MCP_INVENTORY", raising=False)
+    monkeypatch.delenv("DOCKER_MCP_STATS_COLLECTOR", raising=False)
+    monkeypatch.setattr(server, "_inventory_waited", False)
+    monkeypatch.setattr(inventory, "_inventory", None)
+    monkeypatch.setattr(stats, "_collector", None)
+    monkeypatch.setattr(log_index, "_index", None)
+    yield a, b
+    # 后台服务不应为默认守护进程启动
+    assert inventory._inventory is None and stats._collector is None and log_index._index is None
+    docker_client.close_all()
+    a.stop()
+    b.stop()
+
+
+def test_tools_merge_hosts_without_default_daemon(two_hosts):
+    from docker_status.server import get_container_logs, get_container_stats, list_containers
+
+    listing = asyncio.run(list_containers())
+    assert "⚠️" not in listing and "❌" not in listing
+    rows = [line.split() for line in listing.splitlines() if "web" in line]
+    assert sorted((row[0], row[2]) for row in rows) == [
+        ("a", "web0"), ("a", "web1"), ("b", "web0"), ("b", "web1"), ("b", "web2"),
+    ]
+
+    stats = asyncio.run(get_container_stats("web1"))
+    assert "⚠️" not in stats
+    assert stats.count("📊 容器") == 2
+    assert "[主机 a] 📊 容器" in stats and "[主机 b] 📊 容器" in stats
+
+    # 只在b上存在的容器
+    logs = asyncio.run(get_container_logs("web2", lines=2))
+    assert logs.startswith("[主机 b] ") and "[主机 a]" not in logs
+    assert "line 199 of web2" in logs
+
+    only_a = asyncio.run(list_containers(host="a"))
+    assert "web2" not in only_a and "a " in only_a
+
+
+def test_inventory_first_sync_wait_is_paid_once(two_hosts, monkeypatch):
+    from docker_status import server
+
+    waits = []
+
+    class NeverSynced:
+        stale = True
+
+        def wait_synced(self, timeout):
+            waits.append(timeout)
+            return False
+
+    monkeypatch.setattr(server, "get_inventory", lambda: NeverSynced())
+    monkeypatch.setattr(server, "_is_default_host", lambda client: True)
+    for _ in range(3):
+        assert server._inventory(object()) is None
+    assert waits == [server._INVENTORY_FIRST_WAIT, 0, 0]
@@ -0,0 +1,129 @@
+"""容器日志读取与日志索引"""
+import asyncio
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import docker
+import pytest
+
+from docker_status.log_index import LogIndex
+from docker_status.logs import MAX_LINE_BYTES, iter_lines, parse_time, parse_timestamp, read_logs
+
+BASE = 1704067200.0  # 2024-01-01T00:00:00Z
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-01-01T00:00:00.123456789Z", BASE + 0.123456),
+    ("2024-01-01T00:00:00.12Z", BASE + 0.12),
+    ("2024-01-01T00:00:00.1Z", BASE + 0.1),
+    ("2024-01-01T00:00:00Z", BASE),
+    ("2024-01-01T08:00:00.5+08:00", BASE + 0.5),
+])
+def test_parse_timestamp_accepts_docker_precision(value, expected):
+    assert parse_timestamp(value) == pytest.approx(expected, abs=1e-6)
+
+
+def test_parse_time_relative_and_absolute():
+    assert parse_time("10m", now=BASE) == BASE - 600
+    assert parse_time("1704067200") == BASE
+    assert parse_time("2024-01-01T00:00:00.000000001Z") == BASE
+
+
+def test_iter_lines_joins_chunks_and_caps_long_lines():
+    long = b"x" * (MAX_LINE_BYTES + 10)
+    chunks = [b"first\nsec", b"ond\n" + long[:100], long[100:] + b"\nlast"]
+    lines = list(iter_lines(chunks))
+    assert lines[:2] == [b"first", b"second"]
+    assert len(lines[2]) == MAX_LINE_BYTES
+    assert lines[3:] == [b"last"]
+
+
+@pytest.fixture
+def client(fake_docker):
+    client = docker.DockerClient(base_url=fake_docker.base_url, version="1.43")
+    yield client
+    client.close()
+
+
+def test_read_logs_tail_head_and_grep(fake_docker, client):
+    container_id = fake_docker.find("web0")["Id"]
+
+    tail = read_logs(client, container_id, 3)
+    assert tail.lines == ["line 197 of web0", "line 198 of web0", "line 199 of web0"]
+
+    head = read_logs(client, container_id, 2, tail=False)
+    assert head.lines == ["line 0 of web0", "line 1 of web0"]
+
+    grep = read_logs(client, container_id, 2, pattern=re.compile(r"line 1\d of"))
+    assert grep.lines == ["line 18 of web0", "line 19 of web0"]
+    assert grep.scanned == 200
+
+
+def test_read_logs_byte_cap(fake_docker, client):
+    logs = read_logs(client, fake_docker.find("web0")["Id"], 100, max_bytes=50)
+    assert logs.truncated
+    assert sum(len(line.encode()) + 1 for line in logs.lines) <= 50
+
+
+def test_log_index_ingests_nanosecond_timestamps(fake_docker, tmp_path):
+    container = fake_docker.find("web1")
+    now = time.time()
+    fake_docker.logs[container["Id"]] = [
+        (1, "connection refused by db\n", int(now) - 5 + 0.123456789),
+        (2, "request ok\n", int(now) - 4 + 0.5),
+    ]
+    index = LogIndex(str(tmp_path), base_url=fake_docker.base_url)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert index.ingest(pool) >= 2
+        # 第二轮从检查点继续，不会重复索引
+        assert index.ingest(pool) == 0
+
+    found = index.search("refused")
+    assert [(e["name"], e["message"]) for e in found] == [("web1", "connection refused by db")]
+    assert found[0]["time"] == pytest.approx(int(now) - 5 + 0.123456, abs=1e-5)
+
+
+def test_log_index_keeps_lines_sharing_the_checkpoint_timestamp(fake_docker, tmp_path):
+    container = fake_docker.find("web0")
+    stamp = int(time.time()) - 5 + 0.25
+    entries = fake_docker.logs[container["Id"]] = [(1, "first tick\n", stamp), (1, "second tick\n", stamp)]
+    index = LogIndex(str(tmp_path), base_url=fake_docker.base_url)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        index.ingest(pool)
+        # 与检查点同一时间戳的新行在下一轮写入
+        entries.append((1, "third tick\n", stamp))
+        assert index.ingest(pool) == 1
+        assert index.ingest(pool) == 0
+
+        # 重新打开的索引从保存的检查点继续
+        entries.append((1, "fourth tick\n", stamp))
+        reopened = LogIndex(str(tmp_path), base_url=fake_docker.base_url)
+        assert reopened.ingest(pool) == 1
+
+    assert sorted(e["message"] for e in reopened.search("tick")) == [
+        "first tick", "fourth tick", "second tick", "third tick",
+    ]
+
+
+def test_first_tool_call_starts_log_index(fake_docker, tmp_path, monkeypatch):
+    from docker_status import client as docker_client, log_index
+    from docker_status.server import list_containers, search_logs
+
+    monkeypatch.setenv("DOCKER_MCP_HOST", fake_docker.base_url)
+    monkeypatch.delenv("DOCKER_MCP_HOSTS", raising=False)
+    monkeypatch.setenv("DOCKER_MCP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("DOCKER_MCP_STATS_COLLECTOR", "0")
+    monkeypatch.setenv("DOCKER_MCP_INVENTORY", "0")
+    monkeypatch.setattr(log_index, "_index", None)
+    try:
+        assert "web1" in asyncio.run(list_containers())
+        assert log_index._index is not None and log_index._index.wait_ready(5)
+        assert "line 7 of web1" in asyncio.run(search_logs('"line 7 of web1"', since="24h"))
+    finally:
+        if log_index._index is not None:
+            log_index._index.stop()
+        docker_client.close_all()
+
+    monkeypatch.setenv("DOCKER_MCP_LOG_INDEX", "0")
+    assert asyncio.run(search_logs("line")) == "❌ 日志索引未启用（DOCKER_MCP_LOG_INDEX=0）"
@@ -0,0 +1,40 @@
+"""分波重启与就绪判断"""
+import pytest
+
+from docker_status.client import DockerConnection
+from docker_status.restart import has_healthcheck, rolling_restart, select_targets
+from fake_docker import FakeDocker
+
+
+@pytest.mark.parametrize("healthcheck, expected", [
+    (None, False),
+    ({}, False),
+    ({"Test": None}, False),
+    ({"Test": []}, False),
+    ({"Test": ["NONE"]}, False),
+    ({"Test": ["CMD", "curl", "-f", "http://localhost"]}, True),
+    ({"Test": ["CMD-SHELL", "exit 0"], "Interval": 1000000000}, True),
+])
+def test_has_healthcheck(healthcheck, expected):
+    assert has_healthcheck({"Config": {"Healthcheck": healthcheck}}) is expected
+
+
+def test_disabled_healthcheck_waits_for_start_only(socket_dir):
+    with FakeDocker(f"{socket_dir}/docker.sock", containers=4, health_delay=0.1) as fake:
+        containers = sorted(fake.containers.values(), key=lambda c: c["Names"][0])
+        containers[0]["Healthcheck"] = {"Test": ["NONE"]}
+        containers[1]["Healthcheck"] = {"Test": []}
+        containers[2]["Healthcheck"] = {}
+        containers[3]["Labels"]["healthcheck"] = "healthy"
+
+        connection = DockerConnection(fake.base_url)
+        try:
+            targets = select_targets(connection.call(lambda client: client.api.containers()))
+            report = rolling_restart(connection, targets, wave_size=2, stop_timeout=1, health_timeout=3)
+        finally:
+            connection.close()
+
+    statuses = {r["name"]: r["status"] for r in report["results"]}
+    assert statuses == {"web0": "running", "web1": "running", "web2": "running", "web3": "healthy"}
+    assert report["waves"] == 2
+    assert report["elapsed"] < 3
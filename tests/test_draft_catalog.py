@@ -0,0 +1,122 @@
+"""草稿索引同步"""
+import threading
+
+import pytest
+
+from wechat_mcp.api import WeChatAPI
+from wechat_mcp.draft_catalog import DraftCatalog
+
+
+def _seed(fake, start, count):
+    """在替身中加入草稿，update_time 递增，最新的在最前"""
+    for i in range(start, start + count):
+        media_id = f"draft-{i}"
+        fake.drafts[media_id] = {
+            "media_id": media_id,
+            "content": {"news_item": [{"title": f"标题 {i}", "digest": f"摘要 {i}"}]},
+            "update_time": 1_700_000_000 + i,
+        }
+        fake.drafts.move_to_end(media_id, last=False)
+
+
+@pytest.fixture
+def api(fake_wechat):
+    api = WeChatAPI()
+    yield api
+    api.close()
+
+
+def test_draft_catalog_full_and_incremental_sync(fake_wechat, api):
+    _seed(fake_wechat, 0, 45)
+    assert api.sync_drafts(full=True) == 45
+    assert fake_wechat.requests["draft/batchget"] == 3
+    assert [d["media_id"] for d in api.drafts.list(0, 3)] == ["draft-44", "draft-43", "draft-42"]
+    assert [d["media_id"] for d in api.drafts.search("标题 1", limit=3)] == ["draft-19", "draft-18", "draft-17"]
+
+    # 增量同步读到已索引的草稿即停止翻页
+    _seed(fake_wechat, 45, 2)
+    fake_wechat.reset_stats()
+    assert api.sync_drafts() == 2
+    assert fake_wechat.requests["draft/batchget"] == 1
+    assert len(api.drafts) == 47
+
+    # 远端删除只有全量同步能发现
+    del fake_wechat.drafts["draft-3"]
+    assert api.sync_drafts() == 0
+    assert len(api.drafts) == 47
+    assert api.sync_drafts(full=True) == 0
+    assert len(api.drafts) == 46
+
+    # 新实例从磁盘加载
+    reloaded = DraftCatalog(api.app_id)
+    assert len(reloaded) == 46 and reloaded.list(0, 1)[0]["media_id"] == "draft-46"
+
+
+def test_draft_catalog_failed_page_keeps_stale(fake_wechat, api):
+    _seed(fake_wechat, 0, 30)
+    pages = []
+
+    def flaky(offset, count):
+        pages.append(offset)
+        return api.list_drafts(offset, count) if offset == 0 else None
+
+    assert api.drafts.sync(flaky, full=True) == 20
+    assert pages == [0, 20]
+    assert api.drafts.synced_at == 0 and api.drafts.is_stale()
+    # 第一页已写入，查询不受影响
+    assert len(api.drafts) == 20
+
+
+def test_created_draft_is_provisional_until_synced(fake_wechat, api):
+    _seed(fake_wechat, 0, 3)
+    api.sync_drafts(full=True)
+    media_id = api.create_multi_draft([{"title": "新草稿", "content": "<p>x</p>", "digest": "d"}])
+    entry = api.drafts.list(0, 1)[0]
+    assert entry["media_id"] == media_id and entry["provisional"]
+
+    # 本地时间与微信时间不可比较，以同步结果为准；全量同步不会剔除未确认的草稿
+    fake_wechat.drafts[media_id]["update_time"] = 42
+    assert api.sync_drafts(full=True) == 1
+    synced = {d["media_id"]: d for d in api.drafts.list(0, 10)}[media_id]
+    assert synced["update_time"] == 42 and "provisional" not in synced
+
+
+def test_draft_catalog_stores_one_key_per_draft(fake_wechat, api):
+    from wechat_mcp.draft_catalog import _get_store
+
+    _seed(fake_wechat, 0, 3)
+    api.sync_drafts(full=True)
+    store = _get_store()
+    assert store.get(("draft", api.app_id, "draft-1"))["title"] == "标题 1"
+    assert "items" not in store.get(f"drafts_{api.app_id}")
+
+    api.drafts.remove("draft-1")
+    assert store.get(("draft", api.app_id, "draft-1")) is None
+    assert len(DraftCatalog(api.app_id)) == 2
+
+
+def test_sync_does_not_block_queries(fake_wechat, api):
+    _seed(fake_wechat, 0, 5)
+    api.sync_drafts(full=True)
+    _seed(fake_wechat, 5, 2)
+    paging = threading.Event()
+    release = threading.Event()
+
+    def slow_page(offset, count):
+        paging.set()
+        assert release.wait(5)
+        return api.list_drafts(offset, count)
+
+    result = []
+    thread = threading.Thread(target=lambda: result.append(api.drafts.sync(slow_page, full=True)))
+    thread.start()
+    assert paging.wait(5)
+    # 翻页期间查询和本地修改不等待网络
+    assert len(api.drafts.list(0, 20)) == 5
+    api.drafts.remove("draft-6")
+    release.set()
+    thread.join()
+
+    assert result == [1]
+    ids = [d["media_id"] for d in api.drafts.list(0, 20)]
+    assert "draft-6" not in ids and ids[0] == "draft-5"
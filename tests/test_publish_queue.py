@@ -0,0 +1,133 @@
+"""发布队列：提交租约、崩溃恢复和状态轮询"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from wechat_mcp import publish_queue
+from wechat_mcp.api import WeChatAPI
+from wechat_mcp.publish_queue import PublishQueue
+
+
+@pytest.fixture
+def make_queue(fake_wechat, tmp_path, monkeypatch):
+    monkeypatch.setenv("WECHAT_PUBLISH_POLL_MIN_INTERVAL", "0.05")
+    fake_wechat.drafts["draft-1"] = {"media_id": "draft-1", "content": {"news_item": []}, "update_time": 1}
+    apis = {}
+    queues = []
+
+    def resolve(app_id):
+        if app_id not in apis:
+            apis[app_id] = WeChatAPI(app_id, "test-secret")
+        return apis[app_id]
+
+    def make():
+        queue = PublishQueue(resolve, str(tmp_path))
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+    for api in apis.values():
+        api.close()
+
+
+def _job(job_id, **changes):
+    now = time.time()
+    job = {
+        "job_id": job_id, "app_id": "test-app", "media_id": "draft-1", "status": "queued",
+        "publish_id": None, "publish_status": None, "article_id": None, "article_urls": [],
+        "error": None, "created_at": now, "updated_at": now, "polls": 0,
+        "poll_interval": 0.05, "next_poll_at": 0, "claim": None,
+    }
+    job.update(changes)
+    return job
+
+
+def test_enqueue_publishes(make_queue, fake_wechat):
+    queue = make_queue()
+    job = queue.enqueue("test-app", "draft-1")
+    done = queue.wait(job["job_id"], timeout=5)
+    assert done["status"] == "succeeded"
+    assert done["article_urls"] and done["claim"] is None
+    assert fake_wechat.requests["freepublish/submit"] == 1
+
+
+def test_expired_claim_is_requeued_on_restore(make_queue, fake_wechat):
+    # 上一个进程登记租约后、提交前崩溃
+    writer = make_queue()
+    writer._save(_job("crashed", claim={"pid": os.getpid() + 1, "expires_at": time.time() - 1}))
+    writer.close()
+
+    queue = make_queue()
+    assert queue.get("crashed")["claim"] is None
+    queue.start()
+    assert queue.wait("crashed", timeout=5)["status"] == "succeeded"
+    assert fake_wechat.requests["freepublish/submit"] == 1
+
+
+def test_live_claim_is_retried_after_lease(make_queue, fake_wechat):
+    writer = make_queue()
+    writer._save(_job("held", claim={"pid": os.getpid() + 1, "expires_at": time.time() + 0.5}))
+    writer.close()
+
+    queue = make_queue()
+    queue.start()
+    # 租约有效期内不重复提交，但任务仍在跟踪中
+    assert queue.wait("held", timeout=0.3)["status"] == "queued"
+    assert fake_wechat.requests["freepublish/submit"] == 0
+    assert queue.wait("held", timeout=5)["status"] == "succeeded"
+    assert fake_wechat.requests["freepublish/submit"] == 1
+
+
+def test_claim_holder_finishing_is_observed(make_queue, fake_wechat):
+    writer = make_queue()
+    job = _job("other", claim={"pid": os.getpid() + 1, "expires_at": time.time() + 0.3})
+    writer._save(job)
+
+    queue = make_queue()
+    queue.start()
+    # 持有租约的进程完成了发布
+    writer._save(dict(job, status="succeeded", claim=None))
+    assert queue.wait("other", timeout=5)["status"] == "succeeded"
+    assert fake_wechat.requests["freepublish/submit"] == 0
+
+
+def test_invalid_publish_id_fails(make_queue, fake_wechat):
+    writer = make_queue()
+    writer._save(_job("bogus", status="publishing", publish_id="no-such-publish"))
+    writer.close()
+
+    queue = make_queue()
+    queue.start()
+    done = queue.wait("bogus", timeout=5)
+    assert done["status"] == "failed"
+    assert "40007" in done["error"]
+    assert fake_wechat.requests["freepublish/get"] == 1
+
+
+def test_tools_scope_jobs_to_account(make_queue, monkeypatch):
+    from wechat_mcp.server import list_drafts, publish_status, wait_for_publish
+
+    monkeypatch.setenv("WECHAT_ACCOUNTS", "other:other-app:other-secret")
+    queue = make_queue()
+    monkeypatch.setattr(publish_queue, "_publish_queue", queue)
+    job_id = queue.enqueue("test-app", "draft-1")["job_id"]
+    assert queue.wait(job_id, timeout=5)["status"] == "succeeded"
+
+    # 未配置的公众号返回错误信息，不抛出
+    for result in (
+        asyncio.run(list_drafts(account="nope")),
+        asyncio.run(publish_status(account="nope")),
+        asyncio.run(wait_for_publish(job_id, account="nope")),
+    ):
+        assert result.startswith("❌ 未配置的公众号: nope")
+
+    # 其他公众号的任务视为不存在，不等待
+    assert asyncio.run(publish_status(job_id, account="other")) == f"❌ 未找到发布任务: {job_id}"
+    assert asyncio.run(wait_for_publish(job_id, timeout=30, account="other-app")) == f"❌ 未找到发布任务: {job_id}"
+    assert asyncio.run(publish_status(account="other")) == "📋 暂无发布任务"
+    assert asyncio.run(wait_for_publish(job_id, account="test-app")).startswith(f"✅ 任务 {job_id}：succeeded")
+    assert job_id in asyncio.run(publish_status(job_id))
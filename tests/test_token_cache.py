@@ -0,0 +1,52 @@
+"""access_token单飞刷新"""
+import threading
+
+from wechat_mcp.api import WeChatAPI
+from wechat_mcp.token_cache import TokenCache
+
+
+def _concurrently(func, n=16):
+    results = [None] * n
+    barrier = threading.Barrier(n)
+
+    def run(i):
+        barrier.wait()
+        results[i] = func()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_token_cache_single_flight(fake_wechat):
+    fake_wechat.latency = 0.2
+    # 两个实例共用缓存目录，相当于两个进程
+    caches = [TokenCache(), TokenCache()]
+    try:
+        tokens = _concurrently(lambda: caches[threading.get_ident() % 2].get_access_token("app", "secret"))
+        assert len(set(tokens)) == 1 and tokens[0]
+        assert fake_wechat.requests["token"] == 1
+
+        # 失效后同样只刷新一次
+        caches[0].clear_cache("app", tokens[0])
+        fresh = _concurrently(lambda: caches[0].get_access_token("app", "secret"))
+        assert set(fresh) != set(tokens) and len(set(fresh)) == 1
+        assert fake_wechat.requests["token"] == 2
+    finally:
+        for cache in caches:
+            cache.close()
+
+
+def test_expired_token_is_refreshed_once(fake_wechat):
+    api = WeChatAPI()
+    try:
+        assert api.list_drafts() == []
+        fake_wechat.expire_tokens()
+        _concurrently(api.list_drafts, n=8)
+        assert fake_wechat.requests["token"] == 2
+        assert api.list_drafts() == []
+    finally:
+        api.close()
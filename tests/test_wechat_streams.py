@@ -0,0 +1,90 @@
+"""流式上传：base64增量解码与multipart请求体"""
+import base64
+import io
+import os
+
+import pytest
+
+from wechat_mcp.multipart import Base64Stream, BufferStream, MediaFile, MultipartStream
+
+PNG = b"\x89PNG\r\n\x1a\n" + os.urandom(200_000)
+
+
+@pytest.mark.parametrize("data", [b"", b"a", b"ab", b"abc", PNG], ids=["0", "1", "2", "3", "png"])
+@pytest.mark.parametrize("chunk_size", [4, 7, 1024, 64 * 1024])
+def test_base64_stream_decodes_incrementally(data, chunk_size):
+    text = base64.b64encode(data).decode()
+    # 换行分隔的base64（如邮件格式）也要能解码
+    wrapped = "\n".join(text[i:i + 76] for i in range(0, len(text), 76)) + "\n"
+    # 第一个逗号之前的任意前缀都会跳过，不只是 data URL
+    for source in (text, wrapped, "data:image/png;base64," + text, "image/png;base64," + text, "," + wrapped):
+        stream = Base64Stream(source, chunk_size=chunk_size)
+        assert stream.size == len(data)
+        assert stream.read() == data
+        stream.seek(0)
+        assert stream.read(3) == data[:3]
+        assert stream.tell() == min(3, len(data))
+
+
+def test_base64_stream_only_rewinds():
+    stream = Base64Stream(base64.b64encode(b"abcdef").decode())
+    stream.read(2)
+    with pytest.raises(io.UnsupportedOperation):
+        stream.seek(1)
+    with pytest.raises(io.UnsupportedOperation):
+        stream.seek(0, io.SEEK_END)
+
+
+def test_multipart_stream_body_and_retry():
+    payload = BufferStream(PNG)
+    payload.seek(8)
+    body = MultipartStream("media", "a.png", "image/png", payload, len(PNG) - 8)
+    data = body.read()
+    assert len(data) == len(body) == int(body.headers()["Content-Length"])
+
+    boundary = body.content_type.split("boundary=")[1]
+    assert data.startswith(f"--{boundary}\r\n".encode())
+    assert b'name="media"; filename="a.png"\r\nContent-Type: image/png\r\n\r\n' in data
+    assert data.endswith(f"\r\n--{boundary}--\r\n".encode())
+    head, _, rest = data.partition(b"\r\n\r\n")
+    assert rest[:len(PNG) - 8] == PNG[8:]
+
+    # 重试前回到开头，payload从原来的起始位置重新读取
+    body.seek(0)
+    assert b"".join(iter(lambda: body.read(1000), b"")) == data
+    with pytest.raises(io.UnsupportedOperation):
+        body.seek(10)
+
+
+def test_media_file_from_base64_stream():
+    stream = Base64Stream(base64.b64encode(PNG).decode())
+    with MediaFile(stream) as media:
+        assert media.size == len(PNG)
+        assert media.content_type == "image/png" and media.filename == "image.png"
+        digest = media.digest()
+        assert digest == MediaFile(PNG).digest()
+        assert media.multipart().read().count(PNG) == 1
+
+
+@pytest.mark.parametrize("size", [0, 1, 100, 64 * 1024 + 1, 300_000])
+def test_hash_stream_buffer_is_capped(size, tmp_path):
+    import hashlib
+    from wechat_mcp.media_cache import MediaCache
+
+    data = os.urandom(size)
+    expected = hashlib.sha256(data).hexdigest()
+    reads = []
+
+    class Recording(BufferStream):
+        def readinto(self, b):
+            reads.append(len(b))
+            return super().readinto(b)
+
+    assert MediaCache.hash_stream(Recording(data), size) == expected
+    assert max(reads) <= max(1, min(size, 64 * 1024))
+    # 大小未知或给错时仍读到结尾
+    assert MediaCache.hash_stream(BufferStream(data)) == expected
+    assert MediaCache.hash_stream(BufferStream(data), size // 2) == expected
+    path = tmp_path / "image.bin"
+    path.write_bytes(data)
+    assert MediaCache.hash_file(str(path)) == expected